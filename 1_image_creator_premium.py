@@ -1,95 +1,89 @@
-from PIL import Image, ImageDraw, ImageFont
+"""Rich Menu 이미지 일괄 생성 (레이아웃/테마 스펙: rich_menus/*.json|yaml, 형식은 rich_menu_render.py)
 
-# 2x3 레이아웃
-width = 2500
-height = 1686
-img = Image.new('RGB', (width, height), color='white')
-draw = ImageDraw.Draw(img)
+    python 1_image_creator_premium.py                      # rich_menus/premium.json → rich_menu_premium.png
+    python 1_image_creator_premium.py rich_menus/ -j 4     # 폴더 안 스펙 전체를 프로세스 4개로
+    python 1_image_creator_premium.py rich_menus/christmas.yaml --force
 
-cell_width = width // 3
-cell_height = height // 2
+내용(스펙 + 폰트 파일) 해시가 지난번과 같고 이미지가 남아 있으면 건너뛴다 (--manifest 에 기록).
+이미지는 스펙의 encode 설정대로 1MB(LINE 제한) 안에 들도록 인코딩되며, JPEG 가 되면 확장자가 .jpg 로 바뀐다.
+output 상대 경로는 실행한 폴더 기준.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-# 프리미엄 색상 팔레트 (그라데이션 효과)
-colors = [
-    ['#667EEA', '#764BA2', '#F093FB'],  # 보라 → 핑크
-    ['#4FACFE', '#00F2FE', '#43E97B']  # 파랑 → 청록 → 초록
-]
+from rich_menu_render import load_manifest, load_spec, render_file, save_manifest, spec_hash
 
-# 메뉴 텍스트
-menus = [
-    [
-        {'emoji': '🎁', 'text': '이벤트'},
-        {'emoji': '🤝', 'text': '협력사'},
-        {'emoji': '📋', 'text': '상담하기'}
-    ],
-    [
-        {'emoji': '📱', 'text': 'App 설치'},
-        {'emoji': '🌐', 'text': '홈페이지'},
-        {'emoji': '💬', 'text': '문의하기'}
-    ]
-]
+SPEC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rich_menus")
+SPEC_EXTENSIONS = (".json", ".yaml", ".yml")
 
-# 폰트 설정
-try:
-    font_emoji = ImageFont.truetype("C:/Windows/Fonts/seguiemj.ttf", 180)  # 이모지
-    font_text = ImageFont.truetype("C:/Windows/Fonts/malgunbd.ttf", 100)  # 한글 (굵게)
-except:
-    try:
-        font_emoji = ImageFont.truetype("C:/Windows/Fonts/seguiemj.ttf", 180)
-        font_text = ImageFont.truetype("C:/Windows/Fonts/malgun.ttf", 100)
-    except:
-        font_emoji = ImageFont.load_default()
-        font_text = ImageFont.load_default()
 
-# 각 셀 그리기
-for row in range(2):
-    for col in range(3):
-        x_start = col * cell_width
-        y_start = row * cell_height
-        x_end = x_start + cell_width
-        y_end = y_start + cell_height
+def find_specs(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(p for p in glob.glob(os.path.join(path, "*")) if p.endswith(SPEC_EXTENSIONS)))
+        else:
+            files.append(path)
+    return files
 
-        # 배경색
-        color = colors[row][col]
-        draw.rectangle([x_start, y_start, x_end, y_end], fill=color)
 
-        # 경계선 (흰색)
-        if col < 2:
-            draw.line([x_end, y_start, x_end, y_end], fill='white', width=8)
-        if row < 1:
-            draw.line([x_start, y_end, x_end, y_end], fill='white', width=8)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rich Menu 이미지 일괄 생성")
+    parser.add_argument("specs", nargs="*", default=[os.path.join(SPEC_DIR, "premium.json")],
+                        help="스펙 파일 또는 폴더 (기본: rich_menus/premium.json)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="동시에 렌더링할 프로세스 수")
+    parser.add_argument("--force", action="store_true", help="해시가 같아도 다시 렌더링")
+    parser.add_argument("--manifest", default=".rich_menu_render.json", help="output → 스펙 해시 기록 파일")
+    args = parser.parse_args(argv)
 
-        # 메뉴 내용
-        menu = menus[row][col]
-        emoji = menu['emoji']
-        text = menu['text']
+    started = time.perf_counter()
+    manifest = load_manifest(args.manifest)
+    todo, skipped = [], []
+    for path in find_specs(args.specs):
+        spec = load_spec(path)
+        digest = spec_hash(spec)
+        entry = manifest.get(spec["output"])
+        if not args.force and isinstance(entry, dict) and entry["hash"] == digest and os.path.exists(entry["file"]):
+            skipped.append((spec, entry))
+        else:
+            todo.append((spec, digest))
 
-        # 이모지 (상단)
-        emoji_bbox = draw.textbbox((0, 0), emoji, font=font_emoji)
-        emoji_width = emoji_bbox[2] - emoji_bbox[0]
-        emoji_x = x_start + (cell_width - emoji_width) // 2
-        emoji_y = y_start + cell_height // 4
-        draw.text((emoji_x, emoji_y), emoji, font=font_emoji, embedded_color=True)
+    outputs = {}
+    for spec, _ in todo:
+        if spec["output"] in outputs:
+            raise ValueError(f"output 이 겹칩니다: {spec['output']} ({outputs[spec['output']]}, {spec['name']})")
+        outputs[spec["output"]] = spec["name"]
 
-        # 텍스트 (하단)
-        text_bbox = draw.textbbox((0, 0), text, font=font_text)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_x = x_start + (cell_width - text_width) // 2
-        text_y = y_start + cell_height * 3 // 5
+    print("=" * 60)
+    results = []
+    if len(todo) <= 1 or args.jobs <= 1:
+        # 한 장이면 프로세스를 띄우는 비용이 더 큼
+        results = [render_file(spec, digest) for spec, digest in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(todo))) as pool:
+            futures = [pool.submit(render_file, spec, digest) for spec, digest in todo]
+            for future in as_completed(futures):
+                results.append(future.result())
 
-        # 텍스트 그림자 효과
-        shadow_offset = 3
-        draw.text((text_x + shadow_offset, text_y + shadow_offset), text, fill='#00000040', font=font_text)
-        # 실제 텍스트
-        draw.text((text_x, text_y), text, fill='white', font=font_text)
+    for result in sorted(results, key=lambda r: r["name"]):
+        manifest[result["output"]] = {"hash": result["hash"], "file": result["file"]}
+        print(f"✅ {result['name']:<16} → {result['file']} ({result['bytes'] / 1024:.0f}KB {result['format']}, "
+              f"렌더링 {result['render_ms']:.0f}ms + 인코딩 {result['encode_ms']:.0f}ms)")
+    for spec, entry in skipped:
+        print(f"⏭️ {spec['name']:<16} 변경 없음 ({entry['file']})")
+    if results:
+        save_manifest(args.manifest, manifest)
 
-img.save('rich_menu_premium.png', 'PNG')
-print("=" * 60)
-print("✅ 프리미엄 Rich Menu 이미지 생성 완료!")
-print("=" * 60)
-print(f"📏 크기: {width}x{height} 픽셀")
-print(f"🎨 그라데이션 색상 적용")
-print(f"✨ 이모지 + 한글 텍스트")
-print(f"💎 그림자 효과 추가")
-print("=" * 60)
-print("\n다음 단계: python create_rich_menu_premium.py")
\ No newline at end of file
+    print("=" * 60)
+    print(f"🎨 렌더링 {len(results)}개 / 건너뜀 {len(skipped)}개, {time.perf_counter() - started:.1f}초")
+    print("=" * 60)
+    print("\n다음 단계: python 2_create_rich_menu_premium.py")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
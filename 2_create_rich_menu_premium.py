@@ -1,104 +1,75 @@
-import requests
-import json
+"""Rich Menu 배포 (스펙: rich_menus/*.json|yaml, 1_image_creator_premium.py 와 같은 형식)
+
+메뉴 정의(터치 영역 + 이미지 내용)의 해시를 메뉴 이름에 붙여 두고, 같은 해시의 메뉴가 이미 있으면
+다시 만들지 않는다. 바뀐 것만 올리고, 해시만 다른 이전 메뉴는 한 번에 삭제한다.
+--no-default(세그먼트용) 는 이전 버전에 연결된 사용자가 메뉴를 잃지 않도록 삭제하지 않는다 (--keep-stale).
+
+    python 2_create_rich_menu_premium.py                          # rich_menus/premium.json 을 기본 메뉴로
+    python 2_create_rich_menu_premium.py rich_menus/christmas.yaml
+    python 2_create_rich_menu_premium.py rich_menus/corporate.json --no-default   # 세그먼트용 (사용자별 연결)
+
+LINE_API_ENDPOINT / LINE_API_DATA_ENDPOINT 로 로컬 가짜 서버(benchmarks/fake_servers.py)에 배포할 수 있다.
+"""
+import argparse
 import os
+import sys
 from dotenv import load_dotenv
+from line_http import LineSession
+from rich_menu_deploy import RichMenuAPI, RichMenuError, deploy
+from rich_menu_encode import ImageTooLarge
+from rich_menu_render import load_spec
 
 load_dotenv()
 
 CHANNEL_ACCESS_TOKEN = os.getenv('LINE_CHANNEL_ACCESS_TOKEN')
+LINE_API_ENDPOINT = os.getenv('LINE_API_ENDPOINT', 'https://api.line.me')
+LINE_API_DATA_ENDPOINT = os.getenv('LINE_API_DATA_ENDPOINT', 'https://api-data.line.me')
 
 if not CHANNEL_ACCESS_TOKEN:
     print("❌ LINE_CHANNEL_ACCESS_TOKEN이 .env 파일에 없습니다!")
     exit()
 
-headers = {
-    'Authorization': f'Bearer {CHANNEL_ACCESS_TOKEN}',
-    'Content-Type': 'application/json'
-}
+parser = argparse.ArgumentParser(description="Rich Menu 배포 (같은 정의가 이미 있으면 재사용)")
+parser.add_argument('spec', nargs='?', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rich_menus', 'premium.json'),
+                    help="스펙 파일 (기본: rich_menus/premium.json)")
+parser.add_argument('--no-default', action='store_true', help="기본 메뉴로 설정하지 않음 (세그먼트용 메뉴, --keep-stale 포함)")
+parser.add_argument('--keep-stale', action='store_true', help="해시가 다른 이전 메뉴를 지우지 않음")
+args = parser.parse_args()
+# 세그먼트용 메뉴는 사용자별로 연결되어 있으므로 이전 버전을 지우면 그 사용자들의 메뉴가 사라짐
+keep_stale = args.keep_stale or args.no_default
 
-# Rich Menu 데이터 (2x3 레이아웃)
-rich_menu_data = {
-    "size": {"width": 2500, "height": 1686},
-    "selected": True,
-    "name": "Pet AI Premium Menu",
-    "chatBarText": "메뉴",
-    "areas": [
-        # 위쪽 줄 (왼쪽부터)
-        {
-            "bounds": {"x": 0, "y": 0, "width": 833, "height": 843},
-            "action": {"type": "postback", "data": "action=event", "displayText": "이벤트"}
-        },
-        {
-            "bounds": {"x": 833, "y": 0, "width": 834, "height": 843},
-            "action": {"type": "postback", "data": "action=partner", "displayText": "협력사"}
-        },
-        {
-            "bounds": {"x": 1667, "y": 0, "width": 833, "height": 843},
-            "action": {"type": "postback", "data": "action=consultation", "displayText": "상담하기"}
-        },
-        # 아래쪽 줄 (왼쪽부터)
-        {
-            "bounds": {"x": 0, "y": 843, "width": 833, "height": 843},
-            "action": {"type": "postback", "data": "action=app", "displayText": "App 설치"}
-        },
-        {
-            "bounds": {"x": 833, "y": 843, "width": 834, "height": 843},
-            "action": {"type": "uri", "uri": "https://example.com"}  # 홈페이지 URL (수정 필요)
-        },
-        {
-            "bounds": {"x": 1667, "y": 843, "width": 833, "height": 843},
-            "action": {"type": "postback", "data": "action=inquiry", "displayText": "문의하기"}
-        }
-    ]
-}
+# 연결 재사용 + 429/5xx 재시도 (이미지 업로드는 재시도 시 본문을 처음부터 다시 보냄)
+session = LineSession(read_timeout=30, deadline=60)
+api = RichMenuAPI(session, CHANNEL_ACCESS_TOKEN, LINE_API_ENDPOINT, LINE_API_DATA_ENDPOINT)
+spec = load_spec(args.spec)
 
 print("=" * 60)
-print("📋 Rich Menu 생성 시작...")
+print(f"📋 Rich Menu 배포: {spec['name']}")
 print("=" * 60)
 
-response = requests.post('https://api.line.me/v2/bot/richmenu', headers=headers, data=json.dumps(rich_menu_data))
+try:
+    report = deploy(api, spec, set_default=not args.no_default, delete_stale=not keep_stale)
+except ImageTooLarge as e:
+    print(f"❌ 이미지가 LINE 제한(1MB)을 넘습니다: {e}")
+    sys.exit(1)
+except RichMenuError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
 
-if response.status_code == 200:
-    rich_menu_id = response.json()['richMenuId']
-    print(f"✅ Rich Menu 생성 완료!")
-    print(f"   ID: {rich_menu_id}")
+if not (report["created"] or report["uploaded"] or report["default_changed"] or report["deleted"]):
+    print("✅ 변경 없음 - 이미 배포된 메뉴입니다")
 
-    print("\n🖼️ 이미지 업로드 중...")
-    try:
-        with open('rich_menu_premium.png', 'rb') as f:
-            image_headers = {'Authorization': f'Bearer {CHANNEL_ACCESS_TOKEN}', 'Content-Type': 'image/png'}
-            upload_response = requests.post(
-                f'https://api-data.line.me/v2/bot/richmenu/{rich_menu_id}/content',
-                headers=image_headers,
-                data=f
-            )
-
-            if upload_response.status_code == 200:
-                print("✅ 이미지 업로드 완료!")
-
-                print("\n⚙️ 기본 메뉴로 설정 중...")
-                default_response = requests.post(
-                    f'https://api.line.me/v2/bot/user/all/richmenu/{rich_menu_id}',
-                    headers={'Authorization': f'Bearer {CHANNEL_ACCESS_TOKEN}'}
-                )
+print("\n" + "=" * 60)
+print(f"🎉 {report['name']}")
+print(f"   ID: {report['menu_id']}")
+print("=" * 60)
+rows, cols = spec["grid"]
+print("\n메뉴 구성:")
+for row in range(rows):
+    cells = spec["cells"][row * cols:(row + 1) * cols]
+    print("  " + " | ".join(f"{cell.get('emoji', '')} {cell['text']}".strip() for cell in cells))
+if not args.no_default:
+    print("\n📱 LINE 앱을 열어서 확인해보세요!")
 
-                if default_response.status_code == 200:
-                    print("✅ 기본 Rich Menu 설정 완료!")
-                    print("\n" + "=" * 60)
-                    print("🎉 6개 버튼 프리미엄 메뉴 완성!")
-                    print("=" * 60)
-                    print("\n📱 LINE 앱을 열어서 확인해보세요!")
-                    print("\n메뉴 구성:")
-                    print("  위: 🎁 이벤트 | 🤝 협력사 | 📋 상담하기")
-                    print("  아래: 📱 App 설치 | 🌐 홈페이지 | 💬 문의하기")
-                    print("\n다음 단계: app.py 수정 후 python app.py 실행")
-                else:
-                    print(f"❌ 기본 메뉴 설정 실패: {default_response.text}")
-            else:
-                print(f"❌ 이미지 업로드 실패: {upload_response.text}")
-    except FileNotFoundError:
-        print("❌ rich_menu_premium.png 파일이 없습니다!")
-        print("   먼저 1_image_creator_premium.py를 실행하세요!")
-else:
-    print(f"❌ Rich Menu 생성 실패: {response.text}")
-    print(f"   Status Code: {response.status_code}")
\ No newline at end of file
+stats = session.stats()
+print(f"\n🌐 LINE API 호출 {stats['calls']}회 / 재시도 {stats['retries']}회 / 새 연결 {stats['connections_opened']}개")
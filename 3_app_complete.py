@@ -1,19 +1,41 @@
-from flask import Flask, request, abort, render_template, redirect, url_for, session, flash
+from flask import Flask, request, abort, render_template, redirect, url_for, session, flash, jsonify, Response, make_response
 from linebot import LineBotApi, WebhookHandler
 from linebot.exceptions import InvalidSignatureError
+from linebot.exceptions import LineBotApiError
 from linebot.models import (
-    MessageEvent, TextMessage, TextSendMessage,
-    PostbackEvent, FlexSendMessage, FollowEvent
+    MessageEvent, TextMessage,
+    PostbackEvent, FollowEvent
 )
-from openai import OpenAI
-import pandas as pd
-import re
+from linebot.models.error import Error
+from linebot.http_client import RequestsHttpClient, RequestsHttpResponse
 import os
 from datetime import datetime
 from dotenv import load_dotenv
 from urllib.parse import parse_qs
 from functools import wraps
-import mysql.connector
+import atexit
+import json
+import threading
+import time
+from db_pool import ConnectionPool
+from webhook_queue import WebhookDispatcher
+from gpt_cache import GPTCache, cache_key
+from singleflight import SingleFlight
+from message_writer import MessageWriter
+from state_store import make_state_store
+from identity_cache import IdentityCache
+from consultation_numbers import allocate_sequence, format_consultation_number
+from consultation_stats import ConsultationStats
+from consultation_queries import list_query, split_page, page_size_arg, export_query
+from export_stream import iter_export
+from flex_templates import MessageRegistry, text_message, reply_body, push_body
+from consult_flow import ConsultFlow
+from metrics import Metrics
+from line_http import LineSession
+from pattern_matcher import PatternStore
+from lazy import Lazy
+from deadline_runner import DeadlineRunner
+from gpt_context import ConversationContext, EMPTY_CONTEXT
 
 # ==================== ENV ====================
 load_dotenv()
@@ -21,6 +43,15 @@ load_dotenv()
 LINE_CHANNEL_ACCESS_TOKEN = os.getenv("LINE_CHANNEL_ACCESS_TOKEN")
 LINE_CHANNEL_SECRET = os.getenv("LINE_CHANNEL_SECRET")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# 부하 테스트/오프라인 실행 시 로컬 가짜 서버로 바꿀 수 있음 (benchmarks/loadtest.py)
+LINE_API_ENDPOINT = os.getenv("LINE_API_ENDPOINT", "https://api.line.me")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# LINE API 공용 HTTP 세션: keep-alive 커넥션 풀 + 429/5xx 재시도 (호출 1건당 LINE_HTTP_DEADLINE 초 안에서)
+LINE_HTTP_POOL_SIZE = int(os.getenv("LINE_HTTP_POOL_SIZE", "10"))
+LINE_HTTP_TIMEOUT = float(os.getenv("LINE_HTTP_TIMEOUT", "5"))  # 초, 시도 1번의 응답 대기
+LINE_HTTP_DEADLINE = float(os.getenv("LINE_HTTP_DEADLINE", "10"))  # 초, 재시도 대기 포함 전체
+LINE_HTTP_RETRIES = int(os.getenv("LINE_HTTP_RETRIES", "3"))
 
 # Admin 계정
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
@@ -31,6 +62,76 @@ DB_PORT = int(os.getenv("DB_PORT", "3306"))
 DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # 초
+DB_HEALTHCHECK_INTERVAL = float(os.getenv("DB_HEALTHCHECK_INTERVAL", "30"))  # 초
+
+# 메시지 write-behind: 응답 경로에서는 버퍼에만 넣고, N건 또는 T밀리초마다 다중 행 INSERT
+MESSAGE_WRITE_BEHIND = os.getenv("MESSAGE_WRITE_BEHIND", "1") == "1"
+MESSAGE_FLUSH_ROWS = int(os.getenv("MESSAGE_FLUSH_ROWS", "100"))
+MESSAGE_FLUSH_MS = int(os.getenv("MESSAGE_FLUSH_MS", "500"))
+# 빈 값이면 저널 사용 안 함. 여러 워커 프로세스가 같은 값을 받으면 프로세스마다 잠근 번호 파일(.1, .2, …)을 따로 씀
+MESSAGE_JOURNAL_PATH = os.getenv("MESSAGE_JOURNAL_PATH", "message_journal.jsonl")
+MESSAGE_JOURNAL_MAX_BYTES = int(os.getenv("MESSAGE_JOURNAL_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# 상담 플로우 상태 저장소: memory (프로세스 내) 또는 sqlite:///경로 (여러 워커가 공유)
+STATE_STORE = os.getenv("STATE_STORE", "memory")
+STATE_TTL = int(os.getenv("STATE_TTL", "1800"))  # 초, 입력이 없으면 상담 진행 상태 만료
+STATE_MAX_ENTRIES = int(os.getenv("STATE_MAX_ENTRIES", "10000"))
+
+# users.id / 열린 conversations.id 캐시, last_seen 은 주기적으로 일괄 UPDATE
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "10000"))
+IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", "300"))  # 초
+LAST_SEEN_FLUSH_INTERVAL = float(os.getenv("LAST_SEEN_FLUSH_INTERVAL", "30"))  # 초
+
+# 대시보드 통계: 증분 카운터를 쓰고 이 주기마다 한 번만 DB 집계로 대조
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", "300"))  # 초
+
+# 관리자 상담 목록: 1 이면 키셋 페이지 단위로 보여줌 (다음 페이지는 Link / X-Next-Cursor 헤더와 템플릿의 next_cursor).
+# 0 이면 기존처럼 전체 목록 - ?cursor= 나 ?size= 를 주면 플래그와 관계없이 페이지 단위
+ADMIN_PAGINATION = os.getenv("ADMIN_PAGINATION", "0") == "1"
+
+# 관리자 내보내기: 한 번에 메모리에 두는 행 수
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "500"))
+
+# 웹훅 비동기 처리: 서명만 검증하고 바로 200 응답, 이벤트는 워커 스레드에서 처리
+WEBHOOK_ASYNC = os.getenv("WEBHOOK_ASYNC", "0") == "1"
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "4"))
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000"))
+WEBHOOK_DRAIN_TIMEOUT = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "30"))  # 초
+
+# GPT 답변 캐시 (GPT_CACHE_PATH 를 지정하면 SQLite 파일에 저장되어 재시작 후에도 유지)
+GPT_CACHE_SIZE = int(os.getenv("GPT_CACHE_SIZE", "1000"))
+GPT_CACHE_TTL = int(os.getenv("GPT_CACHE_TTL", str(6 * 3600)))  # 초
+GPT_CACHE_PATH = os.getenv("GPT_CACHE_PATH", "")
+GPT_WAIT_TIMEOUT = float(os.getenv("GPT_WAIT_TIMEOUT", "30"))  # 초, 같은 질문의 진행 중 호출을 기다리는 최대 시간
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))  # 초, GPT 호출 1건의 최대 시간 (늦게 push 할 답변도 이 안에서 끝남)
+
+# GPT 답장 기한: 웹훅을 받은 뒤 이 시간(초) 안에 답변이 없으면 "준비 중" 으로 먼저 답장하고
+# 답변은 끝나는 대로 push 로 보냄 (push 는 월 발송 한도에 포함됨). 0이면 기존처럼 끝까지 기다린 뒤 답장
+GPT_REPLY_DEADLINE = float(os.getenv("GPT_REPLY_DEADLINE", "8"))
+GPT_WORKERS = int(os.getenv("GPT_WORKERS", "16"))  # GPT 호출 전용 스레드 수 (기한이 지나도 호출은 계속됨)
+
+# GPT 대화 문맥: 최근 메시지 N개 + 그 이전 대화의 누적 요약, 프롬프트 전체를 토큰 예산 안으로 (0개면 문맥 없이 질문만)
+# 기본은 0 (기존처럼 질문만): 문맥이 있으면 대화마다 키가 달라 GPT 캐시 / single-flight 가 거의 공유되지 않음
+GPT_CONTEXT_MESSAGES = int(os.getenv("GPT_CONTEXT_MESSAGES", "0"))
+GPT_CONTEXT_TOKENS = int(os.getenv("GPT_CONTEXT_TOKENS", "1200"))  # 답변(max_tokens) 제외 프롬프트 예산
+GPT_SUMMARY_TOKENS = int(os.getenv("GPT_SUMMARY_TOKENS", "200"))
+GPT_SUMMARY_EVERY = int(os.getenv("GPT_SUMMARY_EVERY", "3"))  # 창 밖으로 밀려난 메시지를 이 횟수의 질문마다 모아서 요약
+GPT_SUMMARY_CACHE_SIZE = int(os.getenv("GPT_SUMMARY_CACHE_SIZE", "10000"))
+
+# /metrics: 단계별 지연 히스토그램/카운터 (METRICS_TOKEN 을 지정하면 Authorization: Bearer 토큰 필요)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+SLOW_EVENT_MS = float(os.getenv("SLOW_EVENT_MS", "0"))  # 이벤트 처리 시간이 이 값(ms) 이상이면 단계별 시간 로그, 0이면 끔
+
+# 시작 방식 (OpenAI SDK / mysql.connector 는 import 가 무거워 첫 사용 때 불러옴)
+#   eager: import 시 DB 연결 + OpenAI 클라이언트 생성, 실패하면 바로 종료 (기존 동작)
+#   background: 요청은 바로 받고 준비는 백그라운드 스레드에서 (실패하면 성공할 때까지 간격을 늘려 다시 시도)
+#   lazy: 각 의존성을 처음 쓸 때 준비 (/ready?strict=1 도 준비 전인 DB/OpenAI 는 기다리지 않음)
+STARTUP_MODE = os.getenv("STARTUP_MODE", "eager")
+
+PATTERNS_PATH = os.getenv("PATTERNS_PATH", "patterns.csv")
+PATTERN_RELOAD_INTERVAL = float(os.getenv("PATTERN_RELOAD_INTERVAL", "5"))  # 초, 0이면 감시 안 함
 
 if not LINE_CHANNEL_ACCESS_TOKEN or not LINE_CHANNEL_SECRET:
     raise ValueError("LINE 환경변수가 없습니다")
@@ -41,87 +142,261 @@ if not OPENAI_API_KEY:
 if not all([DB_HOST, DB_NAME, DB_USER, DB_PASSWORD]):
     raise ValueError("DB 환경변수가 누락되었습니다")
 
+if STARTUP_MODE not in ("eager", "background", "lazy"):
+    raise ValueError(f"STARTUP_MODE 는 eager / background / lazy 중 하나여야 합니다: {STARTUP_MODE}")
+
 # ==================== INIT ====================
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
-line_bot_api = LineBotApi(LINE_CHANNEL_ACCESS_TOKEN)
+
+line_session = LineSession(
+    pool_size=LINE_HTTP_POOL_SIZE,
+    read_timeout=LINE_HTTP_TIMEOUT,
+    deadline=LINE_HTTP_DEADLINE,
+    max_retries=LINE_HTTP_RETRIES
+)
+
+
+class PooledHttpClient(RequestsHttpClient):
+    """linebot 기본 클라이언트는 호출마다 requests.get/post 를 새로 불러 커넥션을 재사용하지 않으므로 공용 세션으로 보냄"""
+
+    def get(self, url, headers=None, params=None, stream=False, timeout=None):
+        return RequestsHttpResponse(line_session.get(
+            url, headers=headers, params=params, stream=stream, timeout=timeout or self.timeout))
+
+    def post(self, url, headers=None, data=None, timeout=None):
+        return RequestsHttpResponse(line_session.post(url, headers=headers, data=data, timeout=timeout or self.timeout))
+
+    def put(self, url, headers=None, data=None, timeout=None):
+        return RequestsHttpResponse(line_session.put(url, headers=headers, data=data, timeout=timeout or self.timeout))
+
+    def delete(self, url, headers=None, data=None, timeout=None):
+        return RequestsHttpResponse(line_session.delete(url, headers=headers, data=data, timeout=timeout or self.timeout))
+
+
+line_bot_api = LineBotApi(
+    LINE_CHANNEL_ACCESS_TOKEN,
+    endpoint=LINE_API_ENDPOINT,
+    timeout=LINE_HTTP_TIMEOUT,
+    http_client=PooledHttpClient
+)
 handler = WebhookHandler(LINE_CHANNEL_SECRET)
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
 
-user_states = {}
+
+def make_openai_client():
+    from openai import OpenAI
+    return OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, timeout=OPENAI_TIMEOUT)
+
+
+openai_client = Lazy("openai", make_openai_client)
+
+state_store = make_state_store(STATE_STORE, ttl=STATE_TTL, max_entries=STATE_MAX_ENTRIES)
+
+metrics = Metrics(slow_event_ms=SLOW_EVENT_MS)
+text_reply_counter = metrics.counter("text_replies_total", "텍스트 메시지 답장 경로 (flow/pattern/gpt)", ("route",))
+gpt_answer_counter = metrics.counter("gpt_answers_total", "GPT 답변 출처 (live/cache/shared/error)", ("source",))
+gpt_reply_counter = metrics.counter("gpt_reply_paths_total", "GPT 답장 경로 (reply/ack/push/push_failed)", ("path",))
+postback_counter = metrics.counter("postbacks_total", "postback action 별 수 (알 수 없는 action 은 unknown)", ("action",))
+
+webhook_dispatcher = None
+if WEBHOOK_ASYNC:
+    webhook_dispatcher = WebhookDispatcher(workers=WEBHOOK_WORKERS, queue_size=WEBHOOK_QUEUE_SIZE)
 
 # ==================== DB ====================
-db = mysql.connector.connect(
-    host=DB_HOST,
-    port=DB_PORT,
-    user=DB_USER,
-    password=DB_PASSWORD,
-    database=DB_NAME,
-    autocommit=True
+def mysql_connect():
+    import mysql.connector
+    return mysql.connector.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME,
+        autocommit=True,
+        consume_results=True  # 스트리밍 도중 중단된 커서의 남은 결과는 다음 사용 전에 자동으로 비움
+    )
+
+
+def mysql_disconnect_errors():
+    import mysql.connector
+    return mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError
+
+
+# 요청마다 커넥션을 빌려 쓰는 풀 (스레드 간 커서 공유 없음, 끊긴 커넥션은 자동 재연결)
+db_pool = ConnectionPool(
+    mysql_connect,
+    size=DB_POOL_SIZE,
+    timeout=DB_POOL_TIMEOUT,
+    health_check_interval=DB_HEALTHCHECK_INTERVAL,
+    cursor_factory=lambda conn: conn.cursor(dictionary=True),
+    disconnect_errors=mysql_disconnect_errors
+)
+
+
+def warm_db():
+    with db_pool.connection():
+        pass
+    print(f"✅ MySQL 연결 성공 (pool size={DB_POOL_SIZE})")
+
+
+db_warm = Lazy("db", warm_db)
+
+
+def update_last_seen(line_user_ids):
+    placeholders = ", ".join(["%s"] * len(line_user_ids))
+    with db_pool.cursor() as cursor:
+        cursor.execute(f"UPDATE users SET last_seen = NOW() WHERE line_user_id IN ({placeholders})", line_user_ids)
+
+
+identity_cache = IdentityCache(
+    max_entries=IDENTITY_CACHE_SIZE,
+    ttl=IDENTITY_CACHE_TTL,
+    flush_last_seen=update_last_seen,
+    flush_interval=LAST_SEEN_FLUSH_INTERVAL
 )
-cursor = db.cursor(dictionary=True)
-print("✅ MySQL 연결 성공")
 
 
+def load_user_id(line_user_id: str) -> int:
+    with db_pool.cursor() as cursor:
+        # id = LAST_INSERT_ID(id): 이미 있는 행이어도 lastrowid 로 id 를 받아 SELECT 생략
+        cursor.execute(
+            "INSERT INTO users (line_user_id) VALUES (%s) "
+            "ON DUPLICATE KEY UPDATE last_seen = NOW(), id = LAST_INSERT_ID(id)",
+            (line_user_id,)
+        )
+        return int(cursor.lastrowid)  # BIGINT → Python int (자동 처리)
+
+
+@metrics.timed("upsert_user")
 def upsert_user(line_user_id: str) -> int:
     """users 테이블에 line_user_id 저장/갱신 후 users.id 반환 (BIGINT)"""
-    cursor.execute(
-        "INSERT INTO users (line_user_id) VALUES (%s) ON DUPLICATE KEY UPDATE last_seen = NOW()",
-        (line_user_id,)
-    )
-    cursor.execute("SELECT id FROM users WHERE line_user_id = %s", (line_user_id,))
-    return int(cursor.fetchone()["id"])  # BIGINT → Python int (자동 처리)
+    return identity_cache.user_id(line_user_id, load_user_id)
+
 
+def load_conversation_id(user_id: int) -> int:
+    with db_pool.cursor() as cursor:
+        cursor.execute(
+            "SELECT id FROM conversations WHERE user_id = %s AND status = 'open' ORDER BY started_at DESC LIMIT 1",
+            (user_id,)
+        )
+        row = cursor.fetchone()
+        if row:
+            return int(row["id"])
+        cursor.execute("INSERT INTO conversations (user_id) VALUES (%s)", (user_id,))
+        return int(cursor.lastrowid)
 
+
+@metrics.timed("get_or_create_conversation")
 def get_or_create_conversation(user_id: int) -> int:
-    cursor.execute(
-        "SELECT id FROM conversations WHERE user_id = %s AND status = 'open' ORDER BY started_at DESC LIMIT 1",
-        (user_id,)
+    return identity_cache.conversation_id(user_id, load_conversation_id)
+
+
+def close_conversation(conversation_id: int):
+    """대화 종료 + 캐시 무효화 (다음 메시지부터 새 대화 생성)"""
+    with db_pool.cursor() as cursor:
+        cursor.execute("UPDATE conversations SET status = 'closed' WHERE id = %s", (conversation_id,))
+    identity_cache.invalidate_conversation(conversation_id)
+    gpt_context.forget(conversation_id)
+
+
+@metrics.timed("insert_messages")
+def insert_messages(rows):
+    """messages 다중 행 INSERT (rows: [(conversation_id, sender, content, used_gpt, matched_pattern)])"""
+    placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(rows))
+    with db_pool.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO messages (conversation_id, sender, content, used_gpt, matched_pattern) VALUES {placeholders}",
+            [value for row in rows for value in row]
+        )
+
+
+message_writer = None
+if MESSAGE_WRITE_BEHIND:
+    message_writer = MessageWriter(
+        insert_messages,
+        flush_rows=MESSAGE_FLUSH_ROWS,
+        flush_interval_ms=MESSAGE_FLUSH_MS,
+        journal_path=MESSAGE_JOURNAL_PATH or None,
+        journal_max_bytes=MESSAGE_JOURNAL_MAX_BYTES
     )
-    row = cursor.fetchone()
-    if row:
-        return int(row["id"])
-    cursor.execute("INSERT INTO conversations (user_id) VALUES (%s)", (user_id,))
-    return int(cursor.lastrowid)
 
 
+@metrics.timed("save_message")
 def save_message(conversation_id: int, sender: str, content: str, used_gpt: int = 0, matched_pattern: str = None):
-    cursor.execute(
-        "INSERT INTO messages (conversation_id, sender, content, used_gpt, matched_pattern) VALUES (%s, %s, %s, %s, %s)",
-        (conversation_id, sender, content, used_gpt, matched_pattern)
-    )
+    row = (conversation_id, sender, content, used_gpt, matched_pattern)
+    if message_writer is not None:
+        if not message_writer.append(row):
+            print(f"⚠️ 메시지 버퍼가 가득 차 저장하지 못함 (conversation_id={conversation_id})")
+    else:
+        insert_messages([row])
 
 
-def generate_consultation_number() -> str:
-    """접수 번호 생성: C20260201-001"""
-    today = datetime.now().strftime("%Y%m%d")
-    cursor.execute(
-        "SELECT COUNT(*) as cnt FROM consultations WHERE DATE(created_at) = CURDATE()"
-    )
-    count = cursor.fetchone()["cnt"] + 1
-    return f"C{today}-{count:03d}"
+# GPT 문맥에 넣지 않는 메시지 (상담 신청 중 입력한 보호자 이름/연락처와 완료 요약)
+GPT_CONTEXT_SKIP_PATTERNS = ("consult_flow", "consult_complete")
+_SKIP_PATTERNS_SQL = (f"(matched_pattern IS NULL OR matched_pattern NOT IN "
+                      f"({', '.join(['%s'] * len(GPT_CONTEXT_SKIP_PATTERNS))}))")
+
+
+def load_recent_messages(conversation_id: int, limit: int):
+    """대화의 마지막 limit 개 메시지 [(id, sender, content)] 오래된 순 (idx_messages_conversation 역순 스캔, migrations/003)"""
+    with db_pool.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id, sender, content FROM messages WHERE conversation_id = %s AND {_SKIP_PATTERNS_SQL} "
+            "ORDER BY id DESC LIMIT %s",
+            (conversation_id, *GPT_CONTEXT_SKIP_PATTERNS, limit)
+        )
+        rows = cursor.fetchall()
+    return [(int(row["id"]), row["sender"], row["content"]) for row in reversed(rows)]
+
+
+def load_messages_between(conversation_id: int, after_id: int, before_id: int, limit: int):
+    """after_id < id < before_id 중 마지막 limit 개 [(id, sender, content)] 오래된 순 (요약할 메시지)"""
+    with db_pool.cursor() as cursor:
+        cursor.execute(
+            "SELECT id, sender, content FROM messages WHERE conversation_id = %s AND id > %s AND id < %s "
+            f"AND {_SKIP_PATTERNS_SQL} ORDER BY id DESC LIMIT %s",
+            (conversation_id, after_id, before_id, *GPT_CONTEXT_SKIP_PATTERNS, limit)
+        )
+        rows = cursor.fetchall()
+    return [(int(row["id"]), row["sender"], row["content"]) for row in reversed(rows)]
+
+
+def generate_consultation_number(cursor) -> str:
+    """접수 번호 생성: C20260201-001 (consultation_sequences 일별 카운터, migrations/001 참고)"""
+    today = datetime.now().date()
+    return format_consultation_number(today, allocate_sequence(cursor, today))
+
+
+def load_stats_row(query: str) -> dict:
+    with db_pool.cursor() as cursor:
+        cursor.execute(query)
+        return cursor.fetchone()
+
 
+consultation_stats = ConsultationStats(load_stats_row, reconcile_interval=STATS_RECONCILE_INTERVAL)
 
+
+@metrics.timed("save_consultation")
 def save_consultation(user_id: int, data: dict) -> str:
     """상담 정보 DB 저장 (user_id는 BIGINT)"""
-    consultation_number = generate_consultation_number()
-
-    cursor.execute(
-        """
-        INSERT INTO consultations (
-            user_id, consultation_number, member_type,
-            guardian_name, guardian_phone,
-            pet_type, pet_name, pet_age,
-            category, urgency, description, preferred_time
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """,
-        (
-            user_id, consultation_number, data["member_type"],
-            data["guardian_name"], data["guardian_phone"],
-            data["pet_type"], data["pet_name"], data.get("pet_age", ""),
-            data["category"], data["urgency"], data["description"], data["preferred_time"]
+    with db_pool.cursor() as cursor:
+        consultation_number = generate_consultation_number(cursor)
+        cursor.execute(
+            """
+            INSERT INTO consultations (
+                user_id, consultation_number, member_type,
+                guardian_name, guardian_phone,
+                pet_type, pet_name, pet_age,
+                category, urgency, description, preferred_time
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            (
+                user_id, consultation_number, data["member_type"],
+                data["guardian_name"], data["guardian_phone"],
+                data["pet_type"], data["pet_name"], data.get("pet_age", ""),
+                data["category"], data["urgency"], data["description"], data["preferred_time"]
+            )
         )
-    )
+    consultation_stats.on_created(data["urgency"])
     return consultation_number
 
 
@@ -137,181 +412,337 @@ def login_required(f):
 
 
 # ==================== 패턴 ====================
-try:
-    pattern_df = pd.read_csv("patterns.csv")
-    print("✅ patterns.csv 로드 완료")
-except FileNotFoundError:
-    print("⚠️ patterns.csv 없음")
-    pattern_df = pd.DataFrame(columns=["pattern", "response"])
+# 패턴은 한 번 컴파일해 두고, 파일이 바뀌면 바뀐 행만 다시 컴파일해 원자적으로 교체
+pattern_store = PatternStore(PATTERNS_PATH)
+pattern_store.reload()
+if PATTERN_RELOAD_INTERVAL > 0:
+    pattern_store.watch(PATTERN_RELOAD_INTERVAL)
 
 
-def get_pattern_response(text: str):
-    for _, row in pattern_df.iterrows():
-        if re.search(row["pattern"], text, re.IGNORECASE):
-            return row["response"], row["pattern"]
-    return None, None
+@metrics.timed("get_pattern_response")
+def get_pattern_response(text: str, matcher=None):
+    # 빈 PatternMatcher 도 len() 이 0 이라 거짓이므로 None 과 구분 (넘겨받은 스냅샷을 그대로 사용)
+    return (matcher if matcher is not None else pattern_store.current()).match(text)
 
 
 # ==================== GPT ====================
-def ask_gpt(prompt: str) -> str:
+GPT_SYSTEM_PROMPT = "너는 친절한 고객 상담 챗봇이야."
+GPT_ERROR_REPLY = "죄송합니다. 잠시 후 다시 시도해주세요."
+
+# messages.used_gpt 값
+USED_GPT_NONE = 0
+USED_GPT_LIVE = 1   # GPT 실제 호출
+USED_GPT_CACHE = 2  # 캐시 또는 진행 중이던 같은 질문의 GPT 답변 공유
+
+gpt_cache = GPTCache(max_entries=GPT_CACHE_SIZE, ttl=GPT_CACHE_TTL, path=GPT_CACHE_PATH or None)
+gpt_flight = SingleFlight()
+gpt_runner = DeadlineRunner(workers=GPT_WORKERS, name="gpt")
+GPT_ACK_REPLY = "답변을 준비하고 있어요. 잠시 후 보내드릴게요 🙏"
+
+
+GPT_SUMMARY_PROMPT = ("너는 고객 상담 대화를 요약하는 도우미야. 이전 요약과 새 대화를 합쳐 반려동물 정보, 증상, "
+                      "고객의 요청과 이미 안내한 내용 위주로 5문장 이내로 요약해.")
+
+
+def call_gpt(prompt: str, system_prompt: str = GPT_SYSTEM_PROMPT, context=EMPTY_CONTEXT) -> str:
+    if context.summary:
+        system_prompt = f"{system_prompt}\n\n[이전 대화 요약]\n{context.summary}"
+    response = openai_client.get().chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": system_prompt},
+            *({"role": role, "content": content} for role, content in context.turns),
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=300
+    )
+    return response.choices[0].message.content
+
+
+@metrics.timed("summarize_conversation")
+def summarize_conversation(previous: str, turns) -> str:
+    dialog = "\n".join(f"{'고객' if role == 'user' else '상담봇'}: {content}" for role, content in turns)
+    response = openai_client.get().chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": GPT_SUMMARY_PROMPT},
+            {"role": "user", "content": f"[이전 요약]\n{previous or '없음'}\n\n[새 대화]\n{dialog}"}
+        ],
+        max_tokens=GPT_SUMMARY_TOKENS
+    )
+    return response.choices[0].message.content
+
+
+gpt_context = ConversationContext(
+    load_recent_messages,
+    load_messages_between,
+    summarize_conversation,
+    writer=message_writer,
+    skip_patterns=GPT_CONTEXT_SKIP_PATTERNS,
+    recent_messages=GPT_CONTEXT_MESSAGES,
+    token_budget=GPT_CONTEXT_TOKENS,
+    summary_tokens=GPT_SUMMARY_TOKENS,
+    fold_every=GPT_SUMMARY_EVERY,
+    cache_size=GPT_SUMMARY_CACHE_SIZE
+)
+
+
+@metrics.timed("build_gpt_context")
+def build_gpt_context(conversation_id: int, prompt: str):
+    return gpt_context.build(conversation_id, prompt, GPT_SYSTEM_PROMPT)
+
+
+@metrics.timed("ask_gpt")
+def ask_gpt(prompt: str, context=EMPTY_CONTEXT):
+    """GPT 답변과 messages.used_gpt 값을 반환 (캐시 적중이면 USED_GPT_CACHE)
+
+    이전 대화 문맥이 있으면 문맥 해시까지 캐시 / single-flight 키에 넣어, 같은 문맥 + 같은 질문끼리만 공유한다.
+    """
+    scope = GPT_SYSTEM_PROMPT if context.key is None else f"{GPT_SYSTEM_PROMPT}\x00{context.key}"
+    cached = gpt_cache.get(prompt, scope)
+    if cached is not None:
+        gpt_answer_counter.inc("cache")
+        return cached, USED_GPT_CACHE
+
+    def fetch():
+        answer = call_gpt(prompt, context=context)
+        gpt_cache.put(prompt, scope, answer)  # 호출이 끝나기 전에 캐시에 넣어 빈틈을 없앰
+        return answer
+
+    # 같은 질문의 GPT 호출이 진행 중이면 새로 호출하지 않고 그 결과를 기다림
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "너는 친절한 고객 상담 챗봇이야."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=300
-        )
-        return response.choices[0].message.content
+        answer, shared = gpt_flight.do(cache_key(prompt, scope), fetch, timeout=GPT_WAIT_TIMEOUT)
     except Exception as e:
         print("❌ GPT 오류:", e)
-        return "죄송합니다. 잠시 후 다시 시도해주세요."
+        gpt_answer_counter.inc("error")
+        return GPT_ERROR_REPLY, USED_GPT_LIVE
+    gpt_answer_counter.inc("shared" if shared else "live")
+    return answer, USED_GPT_CACHE if shared else USED_GPT_LIVE
+
+
+# ==================== LINE 답장 ====================
+@metrics.timed("reply_message")
+def reply_message(reply_token: str, messages):
+    """미리 인코딩된 메시지 bytes 목록으로 답장 (SDK 의 메시지 객체 생성/직렬화를 건너뜀)"""
+    response = line_bot_api.http_client.post(
+        f"{line_bot_api.endpoint}/v2/bot/message/reply",
+        headers={**line_bot_api.headers, "Content-Type": "application/json"},
+        data=reply_body(reply_token, messages),
+        timeout=line_bot_api.timeout
+    )
+    if response.status_code != 200:
+        raise LineBotApiError(
+            status_code=response.status_code,
+            headers=dict(response.headers.items()),
+            request_id=response.headers.get("X-Line-Request-Id"),
+            error=Error.new_from_json_dict(response.json)
+        )
+
+
+@metrics.timed("push_message")
+def push_message(line_user_id: str, messages):
+    """답장 토큰 없이 보내기 (X-Line-Retry-Key 는 line_session 이 붙여 재시도해도 한 번만 발송)"""
+    response = line_bot_api.http_client.post(
+        f"{line_bot_api.endpoint}/v2/bot/message/push",
+        headers={**line_bot_api.headers, "Content-Type": "application/json"},
+        data=push_body(line_user_id, messages),
+        timeout=line_bot_api.timeout
+    )
+    if response.status_code != 200:
+        raise LineBotApiError(
+            status_code=response.status_code,
+            headers=dict(response.headers.items()),
+            request_id=response.headers.get("X-Line-Request-Id"),
+            error=Error.new_from_json_dict(response.json)
+        )
 
 
 # ==================== FLEX MESSAGES ====================
+# 정적 Flex 메시지는 시작 시 한 번만 만들고 JSON 으로 인코딩해 두었다가 답장마다 그 bytes 를 재사용
+flex_messages = MessageRegistry()
+
+flex_messages.register_flex("main_menu", "메인 메뉴", {
+    "type": "bubble",
+    "body": {
+        "type": "box",
+        "layout": "vertical",
+        "contents": [
+            {"type": "text", "text": "🤖 Pet AI 상담봇", "weight": "bold", "size": "xl", "align": "center"},
+            {"type": "separator", "margin": "lg"},
+            {"type": "button", "style": "primary",
+             "action": {"type": "postback", "label": "📋 상담 신청", "data": "action=consultation"}},
+            {"type": "button", "style": "primary",
+             "action": {"type": "postback", "label": "💬 일반 문의", "data": "action=inquiry"}},
+            {"type": "button", "style": "primary",
+             "action": {"type": "postback", "label": "📞 연락처 정보", "data": "action=contact"}}
+        ]
+    }
+})
+
+flex_messages.register_flex("consultation_type", "회원 유형 선택", {
+    "type": "bubble",
+    "body": {
+        "type": "box",
+        "layout": "vertical",
+        "contents": [
+            {"type": "text", "text": "회원 유형을 선택해주세요", "weight": "bold", "size": "lg", "align": "center"},
+            {"type": "separator", "margin": "lg"},
+            {"type": "button", "style": "primary", "color": "#4A90E2",
+             "action": {"type": "postback", "label": "👤 개인 회원", "data": "action=personal"}},
+            {"type": "button", "style": "primary", "color": "#FF6B6B",
+             "action": {"type": "postback", "label": "🏢 기업/단체 회원", "data": "action=corporate"}}
+        ]
+    }
+})
+
+flex_messages.register_flex("pet_type_selection", "반려동물 종류", {
+    "type": "bubble",
+    "body": {
+        "type": "box",
+        "layout": "vertical",
+        "contents": [
+            {"type": "text", "text": "반려동물 종류를 선택해주세요", "weight": "bold", "size": "lg", "align": "center"},
+            {"type": "separator", "margin": "lg"},
+            {"type": "button", "style": "primary", "color": "#F9A826",
+             "action": {"type": "postback", "label": "🐶 강아지", "data": "action=pet_dog"}},
+            {"type": "button", "style": "primary", "color": "#8E44AD",
+             "action": {"type": "postback", "label": "🐱 고양이", "data": "action=pet_cat"}},
+            {"type": "button", "style": "primary", "color": "#95A5A6",
+             "action": {"type": "postback", "label": "🐰 기타 (토끼, 햄스터 등)", "data": "action=pet_other"}}
+        ]
+    }
+})
+
+flex_messages.register_flex("category_selection", "상담 카테고리", {
+    "type": "bubble",
+    "body": {
+        "type": "box",
+        "layout": "vertical",
+        "contents": [
+            {"type": "text", "text": "상담 카테고리를 선택해주세요", "weight": "bold", "size": "lg", "align": "center"},
+            {"type": "separator", "margin": "lg"},
+            {"type": "button", "style": "primary", "color": "#E74C3C",
+             "action": {"type": "postback", "label": "🏥 질병/건강", "data": "action=cat_health"}},
+            {"type": "button", "style": "primary", "color": "#F39C12",
+             "action": {"type": "postback", "label": "🍖 영양/사료", "data": "action=cat_nutrition"}},
+            {"type": "button", "style": "primary", "color": "#9B59B6",
+             "action": {"type": "postback", "label": "😺 행동 교정", "data": "action=cat_behavior"}},
+            {"type": "button", "style": "primary", "color": "#3498DB",
+             "action": {"type": "postback", "label": "✂️ 미용/관리", "data": "action=cat_grooming"}},
+            {"type": "button", "style": "primary", "color": "#C0392B",
+             "action": {"type": "postback", "label": "💊 응급 상황", "data": "action=cat_emergency"}},
+            {"type": "button", "style": "primary", "color": "#7F8C8D",
+             "action": {"type": "postback", "label": "🏠 기타 문의", "data": "action=cat_other"}}
+        ]
+    }
+})
+
+flex_messages.register_flex("urgency_selection", "긴급도 선택", {
+    "type": "bubble",
+    "body": {
+        "type": "box",
+        "layout": "vertical",
+        "contents": [
+            {"type": "text", "text": "긴급도를 선택해주세요", "weight": "bold", "size": "lg", "align": "center"},
+            {"type": "separator", "margin": "lg"},
+            {"type": "button", "style": "primary", "color": "#E74C3C",
+             "action": {"type": "postback", "label": "🔴 긴급 (24시간 내 연락 필요)", "data": "action=urg_urgent"}},
+            {"type": "button", "style": "primary", "color": "#F39C12",
+             "action": {"type": "postback", "label": "🟡 보통 (2-3일 내)", "data": "action=urg_normal"}},
+            {"type": "button", "style": "primary", "color": "#27AE60",
+             "action": {"type": "postback", "label": "🟢 여유 (1주일 내)", "data": "action=urg_flexible"}}
+        ]
+    }
+})
+
+flex_messages.register_flex("time_selection", "선호 시간", {
+    "type": "bubble",
+    "body": {
+        "type": "box",
+        "layout": "vertical",
+        "contents": [
+            {"type": "text", "text": "선호하는 상담 시간대를 선택해주세요", "weight": "bold", "size": "lg", "align": "center"},
+            {"type": "separator", "margin": "lg"},
+            {"type": "button", "style": "primary", "color": "#F39C12",
+             "action": {"type": "postback", "label": "☀️ 오전 (9시-12시)", "data": "action=time_morning"}},
+            {"type": "button", "style": "primary", "color": "#3498DB",
+             "action": {"type": "postback", "label": "🌤️ 오후 (12시-18시)", "data": "action=time_afternoon"}},
+            {"type": "button", "style": "primary", "color": "#9B59B6",
+             "action": {"type": "postback", "label": "🌙 저녁 (18시-21시)", "data": "action=time_evening"}},
+            {"type": "button", "style": "primary", "color": "#95A5A6",
+             "action": {"type": "postback", "label": "⏰ 상관없음", "data": "action=time_anytime"}}
+        ]
+    }
+})
+
+
 def create_main_menu():
-    return FlexSendMessage(
-        alt_text="메인 메뉴",
-        contents={
-            "type": "bubble",
-            "body": {
-                "type": "box",
-                "layout": "vertical",
-                "contents": [
-                    {"type": "text", "text": "🤖 Pet AI 상담봇", "weight": "bold", "size": "xl", "align": "center"},
-                    {"type": "separator", "margin": "lg"},
-                    {"type": "button", "style": "primary",
-                     "action": {"type": "postback", "label": "📋 상담 신청", "data": "action=consultation"}},
-                    {"type": "button", "style": "primary",
-                     "action": {"type": "postback", "label": "💬 일반 문의", "data": "action=inquiry"}},
-                    {"type": "button", "style": "primary",
-                     "action": {"type": "postback", "label": "📞 연락처 정보", "data": "action=contact"}}
-                ]
-            }
-        }
-    )
+    return flex_messages.get("main_menu")
 
 
 def create_consultation_type():
-    return FlexSendMessage(
-        alt_text="회원 유형 선택",
-        contents={
-            "type": "bubble",
-            "body": {
-                "type": "box",
-                "layout": "vertical",
-                "contents": [
-                    {"type": "text", "text": "회원 유형을 선택해주세요", "weight": "bold", "size": "lg", "align": "center"},
-                    {"type": "separator", "margin": "lg"},
-                    {"type": "button", "style": "primary", "color": "#4A90E2",
-                     "action": {"type": "postback", "label": "👤 개인 회원", "data": "action=personal"}},
-                    {"type": "button", "style": "primary", "color": "#FF6B6B",
-                     "action": {"type": "postback", "label": "🏢 기업/단체 회원", "data": "action=corporate"}}
-                ]
-            }
-        }
-    )
+    return flex_messages.get("consultation_type")
 
 
 def create_pet_type_selection():
-    return FlexSendMessage(
-        alt_text="반려동물 종류",
-        contents={
-            "type": "bubble",
-            "body": {
-                "type": "box",
-                "layout": "vertical",
-                "contents": [
-                    {"type": "text", "text": "반려동물 종류를 선택해주세요", "weight": "bold", "size": "lg", "align": "center"},
-                    {"type": "separator", "margin": "lg"},
-                    {"type": "button", "style": "primary", "color": "#F9A826",
-                     "action": {"type": "postback", "label": "🐶 강아지", "data": "action=pet_dog"}},
-                    {"type": "button", "style": "primary", "color": "#8E44AD",
-                     "action": {"type": "postback", "label": "🐱 고양이", "data": "action=pet_cat"}},
-                    {"type": "button", "style": "primary", "color": "#95A5A6",
-                     "action": {"type": "postback", "label": "🐰 기타 (토끼, 햄스터 등)", "data": "action=pet_other"}}
-                ]
-            }
-        }
-    )
+    return flex_messages.get("pet_type_selection")
 
 
 def create_category_selection():
-    return FlexSendMessage(
-        alt_text="상담 카테고리",
-        contents={
-            "type": "bubble",
-            "body": {
-                "type": "box",
-                "layout": "vertical",
-                "contents": [
-                    {"type": "text", "text": "상담 카테고리를 선택해주세요", "weight": "bold", "size": "lg", "align": "center"},
-                    {"type": "separator", "margin": "lg"},
-                    {"type": "button", "style": "primary", "color": "#E74C3C",
-                     "action": {"type": "postback", "label": "🏥 질병/건강", "data": "action=cat_health"}},
-                    {"type": "button", "style": "primary", "color": "#F39C12",
-                     "action": {"type": "postback", "label": "🍖 영양/사료", "data": "action=cat_nutrition"}},
-                    {"type": "button", "style": "primary", "color": "#9B59B6",
-                     "action": {"type": "postback", "label": "😺 행동 교정", "data": "action=cat_behavior"}},
-                    {"type": "button", "style": "primary", "color": "#3498DB",
-                     "action": {"type": "postback", "label": "✂️ 미용/관리", "data": "action=cat_grooming"}},
-                    {"type": "button", "style": "primary", "color": "#C0392B",
-                     "action": {"type": "postback", "label": "💊 응급 상황", "data": "action=cat_emergency"}},
-                    {"type": "button", "style": "primary", "color": "#7F8C8D",
-                     "action": {"type": "postback", "label": "🏠 기타 문의", "data": "action=cat_other"}}
-                ]
-            }
-        }
-    )
+    return flex_messages.get("category_selection")
 
 
 def create_urgency_selection():
-    return FlexSendMessage(
-        alt_text="긴급도 선택",
-        contents={
-            "type": "bubble",
-            "body": {
-                "type": "box",
-                "layout": "vertical",
-                "contents": [
-                    {"type": "text", "text": "긴급도를 선택해주세요", "weight": "bold", "size": "lg", "align": "center"},
-                    {"type": "separator", "margin": "lg"},
-                    {"type": "button", "style": "primary", "color": "#E74C3C",
-                     "action": {"type": "postback", "label": "🔴 긴급 (24시간 내 연락 필요)", "data": "action=urg_urgent"}},
-                    {"type": "button", "style": "primary", "color": "#F39C12",
-                     "action": {"type": "postback", "label": "🟡 보통 (2-3일 내)", "data": "action=urg_normal"}},
-                    {"type": "button", "style": "primary", "color": "#27AE60",
-                     "action": {"type": "postback", "label": "🟢 여유 (1주일 내)", "data": "action=urg_flexible"}}
-                ]
-            }
-        }
-    )
+    return flex_messages.get("urgency_selection")
 
 
 def create_time_selection():
-    return FlexSendMessage(
-        alt_text="선호 시간",
-        contents={
-            "type": "bubble",
-            "body": {
-                "type": "box",
-                "layout": "vertical",
-                "contents": [
-                    {"type": "text", "text": "선호하는 상담 시간대를 선택해주세요", "weight": "bold", "size": "lg", "align": "center"},
-                    {"type": "separator", "margin": "lg"},
-                    {"type": "button", "style": "primary", "color": "#F39C12",
-                     "action": {"type": "postback", "label": "☀️ 오전 (9시-12시)", "data": "action=time_morning"}},
-                    {"type": "button", "style": "primary", "color": "#3498DB",
-                     "action": {"type": "postback", "label": "🌤️ 오후 (12시-18시)", "data": "action=time_afternoon"}},
-                    {"type": "button", "style": "primary", "color": "#9B59B6",
-                     "action": {"type": "postback", "label": "🌙 저녁 (18시-21시)", "data": "action=time_evening"}},
-                    {"type": "button", "style": "primary", "color": "#95A5A6",
-                     "action": {"type": "postback", "label": "⏰ 상관없음", "data": "action=time_anytime"}}
-                ]
-            }
-        }
-    )
+    return flex_messages.get("time_selection")
+
+
+# ==================== 상담 플로우 ====================
+# 단계/버튼/답장 문구는 consult_flow.FLOW 에 데이터로 정의되어 있고, 시작 시 dict 디스패치로 컴파일
+consult_flow = ConsultFlow()
+
+# ==================== METRICS ====================
+metrics.gauge("db_pool_in_use", "사용 중인 DB 커넥션 수", lambda: db_pool.stats()["in_use"])
+metrics.gauge("message_writer_pending", "아직 DB 에 쓰지 않은 메시지 수",
+              lambda: message_writer.stats()["pending"] if message_writer is not None else None)
+metrics.counter_func("line_http_calls_total", "LINE API 호출 수", lambda: line_session.stats()["calls"])
+metrics.counter_func("line_http_retries_total", "LINE API 재시도 수 (429/5xx/연결 오류)", lambda: line_session.stats()["retries"])
+metrics.counter_func("line_http_failures_total", "재시도 후에도 실패한 LINE API 호출 수", lambda: line_session.stats()["failures"])
+metrics.counter_func("line_http_connections_total", "LINE API 로 새로 맺은 연결 수",
+                     lambda: line_session.stats()["connections_opened"])
+metrics.gauge("webhook_queue_depth", "처리 대기 중인 웹훅 수",
+              lambda: webhook_dispatcher.stats()["depth"] if webhook_dispatcher is not None else None)
+metrics.gauge("gpt_late_in_flight", "답장 기한을 넘겨 push 를 기다리는 GPT 호출 수",
+              lambda: gpt_runner.stats()["in_flight_late"])
+
+
+# ==================== 시작 준비 ====================
+def warm_dependencies():
+    """DB 연결과 OpenAI 클라이언트를 미리 준비 (실패하면 예외, Lazy 가 다음 사용 때 다시 시도)"""
+    db_warm.get()
+    openai_client.get()
+
+
+def warm_in_background(max_delay=60.0):
+    """준비될 때까지 간격을 두 배씩 늘려 다시 시도 (성공하면 Lazy 의 error 가 지워져 /ready 가 회복됨)"""
+    delay = 1.0
+    while True:
+        try:
+            warm_dependencies()
+            return
+        except Exception as e:
+            print(f"⚠️ 시작 준비 실패 ({delay:.0f}초 뒤 다시 시도, 그 전에 첫 사용 때도 시도): {type(e).__name__}: {e}")
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+
+if STARTUP_MODE == "eager":
+    warm_dependencies()
+elif STARTUP_MODE == "background":
+    threading.Thread(target=warm_in_background, name="warmup", daemon=True).start()
 
 
 # ==================== 관리자 라우트 ====================
@@ -346,36 +777,33 @@ def admin_logout():
 @app.route("/admin/dashboard")
 @login_required
 def admin_dashboard():
-    # 통계 데이터
-    cursor.execute("SELECT COUNT(*) as total FROM consultations")
-    total_count = cursor.fetchone()['total']
-
-    cursor.execute("SELECT COUNT(*) as today FROM consultations WHERE DATE(created_at) = CURDATE()")
-    today_count = cursor.fetchone()['today']
-
-    cursor.execute("SELECT COUNT(*) as urgent FROM consultations WHERE urgency = 'urgent' AND status = 'pending'")
-    urgent_count = cursor.fetchone()['urgent']
-
-    cursor.execute("SELECT COUNT(*) as pending FROM consultations WHERE status = 'pending'")
-    pending_count = cursor.fetchone()['pending']
-
-    # 최근 상담 5건
-    cursor.execute("""
-        SELECT id, consultation_number, guardian_name, urgency, status, created_at 
-        FROM consultations 
-        ORDER BY created_at DESC 
-        LIMIT 5
-    """)
-    recent_consultations = cursor.fetchall()
+    # 통계 데이터 (증분 카운터, 주기적으로만 DB 집계)
+    counts = consultation_stats.snapshot()
+
+    with db_pool.cursor() as cursor:
+        # 최근 상담 5건
+        cursor.execute("""
+            SELECT id, consultation_number, guardian_name, urgency, status, created_at 
+            FROM consultations 
+            ORDER BY created_at DESC, id DESC 
+            LIMIT 5
+        """)
+        recent_consultations = cursor.fetchall()
 
     return render_template('admin_dashboard.html',
-                           total_count=total_count,
-                           today_count=today_count,
-                           urgent_count=urgent_count,
-                           pending_count=pending_count,
+                           total_count=counts["total"],
+                           today_count=counts["today"],
+                           urgent_count=counts["urgent"],
+                           pending_count=counts["pending"],
                            recent_consultations=recent_consultations)
 
 
+@app.route("/admin/dashboard/stats")
+@login_required
+def admin_dashboard_stats():
+    return jsonify(consultation_stats.metrics())
+
+
 @app.route("/admin/consultations")
 @login_required
 def admin_consultations():
@@ -383,40 +811,85 @@ def admin_consultations():
     search = request.args.get('search', '')
     status_filter = request.args.get('status', '')
     urgency_filter = request.args.get('urgency', '')
+    # ?contains=1: 기존 부분 일치 검색 (인덱스를 못 타서 전체 스캔)
+    contains = request.args.get('contains') == '1'
+    # 키셋 페이지네이션: cursor 는 이전 페이지 마지막 행의 (created_at, id)
+    page_cursor = request.args.get('cursor', '')
+    paginate = ADMIN_PAGINATION or 'cursor' in request.args or 'size' in request.args
+    page_size = page_size_arg(request.args.get('size')) if paginate else None
+
+    query, params = list_query(search, status_filter, urgency_filter, page_cursor, page_size, contains=contains)
+    with db_pool.cursor() as cursor:
+        cursor.execute(query, params)
+        consultations, next_cursor = split_page(cursor.fetchall(), page_size)
+
+    response = make_response(render_template('admin_consultations.html',
+                                             consultations=consultations,
+                                             search=search,
+                                             status_filter=status_filter,
+                                             urgency_filter=urgency_filter,
+                                             page_size=page_size,
+                                             next_cursor=next_cursor))
+    if next_cursor:
+        # 템플릿이 next_cursor 를 그리지 않아도 다음 페이지로 갈 수 있도록 헤더로도 알려줌
+        args = {key: value for key, value in request.args.items() if value and key not in ('cursor', 'size')}
+        next_url = url_for('admin_consultations', **args, cursor=next_cursor, size=page_size)
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+@app.route("/admin/consultations/export")
+@login_required
+def admin_consultations_export():
+    """상담 목록/대화 내역 CSV·JSONL 스트리밍 내보내기 (admin_consultations 와 같은 필터)
+
+    ?kind=consultations|transcripts &format=csv|jsonl &gzip=1
+    """
+    kind = request.args.get('kind', 'consultations')
+    fmt = request.args.get('format', 'csv')
+    compress = request.args.get('gzip') == '1'
+    if kind not in ('consultations', 'transcripts') or fmt not in ('csv', 'jsonl'):
+        abort(400)
 
-    query = "SELECT * FROM consultations WHERE 1=1"
-    params = []
-
-    if search:
-        query += " AND (consultation_number LIKE %s OR guardian_name LIKE %s OR guardian_phone LIKE %s)"
-        search_term = f"%{search}%"
-        params.extend([search_term, search_term, search_term])
-
-    if status_filter:
-        query += " AND status = %s"
-        params.append(status_filter)
-
-    if urgency_filter:
-        query += " AND urgency = %s"
-        params.append(urgency_filter)
-
-    query += " ORDER BY created_at DESC"
-
-    cursor.execute(query, params)
-    consultations = cursor.fetchall()
+    columns, query, params = export_query(
+        kind,
+        request.args.get('search', ''),
+        request.args.get('status', ''),
+        request.args.get('urgency', ''),
+        contains=request.args.get('contains') == '1'
+    )
 
-    return render_template('admin_consultations.html',
-                           consultations=consultations,
-                           search=search,
-                           status_filter=status_filter,
-                           urgency_filter=urgency_filter)
+    def batches():
+        # 버퍼링하지 않는 서버 측 커서로 EXPORT_BATCH_ROWS 씩 읽음 → 행 수와 무관하게 메모리 일정
+        with db_pool.cursor() as cursor:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(EXPORT_BATCH_ROWS)
+                if not rows:
+                    break
+                yield rows
+
+    filename = f"{kind}_{datetime.now():%Y%m%d_%H%M%S}.{fmt}" + (".gz" if compress else "")
+    if compress:
+        mimetype = "application/gzip"
+    elif fmt == "csv":
+        mimetype = "text/csv; charset=utf-8"
+    else:
+        mimetype = "application/x-ndjson; charset=utf-8"
+    return Response(
+        iter_export(batches(), columns, fmt, compress),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.route("/admin/consultations/<int:consultation_id>")
 @login_required
 def admin_consultation_detail(consultation_id):
-    cursor.execute("SELECT * FROM consultations WHERE id = %s", (consultation_id,))
-    consultation = cursor.fetchone()
+    with db_pool.cursor() as cursor:
+        cursor.execute("SELECT * FROM consultations WHERE id = %s", (consultation_id,))
+        consultation = cursor.fetchone()
 
     if not consultation:
         flash('상담 내역을 찾을 수 없습니다.', 'danger')
@@ -425,119 +898,229 @@ def admin_consultation_detail(consultation_id):
     return render_template('admin_detail.html', consultation=consultation)
 
 
+@app.route("/admin/patterns")
+@login_required
+def admin_patterns():
+    return jsonify(pattern_store.status())
+
+
+@app.route("/admin/patterns/reload", methods=["POST"])
+@login_required
+def admin_patterns_reload():
+    reloaded = pattern_store.reload(force=True)
+    return jsonify({"reloaded": reloaded, **pattern_store.status()})
+
+
+@app.route("/admin/db")
+@login_required
+def admin_db_stats():
+    stats = {"pool": db_pool.stats()}
+    if message_writer is not None:
+        stats["message_writer"] = message_writer.stats()
+    stats["identity_cache"] = identity_cache.stats()
+    return jsonify(stats)
+
+
+@app.route("/admin/webhook")
+@login_required
+def admin_webhook_stats():
+    if webhook_dispatcher is None:
+        return jsonify({"async": False})
+    return jsonify({"async": True, **webhook_dispatcher.stats()})
+
+
+@app.route("/admin/line-http")
+@login_required
+def admin_line_http_stats():
+    return jsonify(line_session.stats())
+
+
+@app.route("/admin/gpt-cache")
+@login_required
+def admin_gpt_cache_stats():
+    return jsonify({**gpt_cache.stats(), "single_flight": gpt_flight.stats(), "deadline": gpt_runner.stats(),
+                    "context": gpt_context.stats()})
+
+
+@app.route("/admin/states")
+@login_required
+def admin_state_stats():
+    return jsonify(state_store.stats())
+
+
+@app.route("/admin/conversations/<int:conversation_id>/close", methods=["POST"])
+@login_required
+def admin_close_conversation(conversation_id):
+    close_conversation(conversation_id)
+    return jsonify({"closed": conversation_id})
+
+
 @app.route("/admin/consultations/<int:consultation_id>/update_status", methods=["POST"])
 @login_required
 def update_status(consultation_id):
     new_status = request.form.get('status')
-    cursor.execute("UPDATE consultations SET status = %s WHERE id = %s", (new_status, consultation_id))
+    with db_pool.cursor() as cursor:
+        cursor.execute("SELECT status, urgency FROM consultations WHERE id = %s", (consultation_id,))
+        current = cursor.fetchone()
+        cursor.execute("UPDATE consultations SET status = %s WHERE id = %s", (new_status, consultation_id))
+    if current:
+        consultation_stats.on_status_changed(current["status"], new_status, current["urgency"])
     flash('상태가 업데이트되었습니다!', 'success')
     return redirect(url_for('admin_consultation_detail', consultation_id=consultation_id))
 
 
 # ==================== WEBHOOK ====================
+def webhook_key(body: str) -> str:
+    """같은 사용자의 이벤트가 같은 워커에서 순서대로 처리되도록 첫 이벤트의 userId 로 분배"""
+    try:
+        events = json.loads(body).get("events") or []
+        return events[0]["source"].get("userId", "") if events else ""
+    except (ValueError, KeyError, AttributeError, TypeError):
+        return ""
+
+
+# 이벤트 핸들러가 웹훅을 받은 시각(time.monotonic)을 알 수 있도록 처리 중인 스레드에 남김 (GPT 답장 기한 계산)
+webhook_context = threading.local()
+
+
+def handle_webhook(body: str, signature: str, received: float):
+    webhook_context.received = received
+    try:
+        handler.handle(body, signature)
+    finally:
+        webhook_context.received = None
+
+
+def event_received_at() -> float:
+    return getattr(webhook_context, "received", None) or time.monotonic()
+
+
+def handle_webhook_async(body: str, signature: str, received: float):
+    try:
+        handle_webhook(body, signature, received)
+    except InvalidSignatureError:
+        print("❌ 웹훅 서명 오류 (비동기)")
+
+
 @app.route("/webhook", methods=["POST"])
 def webhook():
+    received = time.monotonic()  # 큐에서 기다린 시간도 답장 기한에 포함
     signature = request.headers.get("X-Line-Signature")
     body = request.get_data(as_text=True)
+
+    if webhook_dispatcher is not None:
+        if not handler.parser.signature_validator.validate(body, signature or ""):
+            abort(400)
+        if not webhook_dispatcher.submit(webhook_key(body), handle_webhook_async, body, signature, received):
+            # 큐가 가득 찼으면 이 요청 스레드에서 직접 처리 (backpressure)
+            handle_webhook_async(body, signature, received)
+        return "OK"
+
     try:
-        handler.handle(body, signature)
+        handle_webhook(body, signature, received)
     except InvalidSignatureError:
         abort(400)
     return "OK"
 
 
 # ==================== EVENTS ====================
+def apply_flow_outcome(event, user_id, line_user_id, conversation_id, outcome):
+    """consult_flow 처리 결과 반영: 상태 저장/삭제, 상담 저장, 봇 메시지 기록, 답장"""
+    reply_text = outcome.text
+    if outcome.complete:
+        consultation_number = save_consultation(user_id, outcome.state)
+        reply_text = consult_flow.completion_text(outcome.state, consultation_number)
+        state_store.delete(line_user_id)
+    elif outcome.state is not None:
+        state_store.set(line_user_id, outcome.state)
+
+    save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern=outcome.pattern)
+    messages = [text_message(reply_text)]
+    if outcome.flex:
+        messages.append(flex_messages.get(outcome.flex))
+    reply_message(event.reply_token, messages)
+
+
+def reply_with_gpt(event, line_user_id, conversation_id, text):
+    """GPT 답변이 기한 안에 오면 답장, 아니면 임시 답장 후 답변이 끝나는 대로 push"""
+    def answer():
+        return ask_gpt(text, build_gpt_context(conversation_id, text))
+
+    if GPT_REPLY_DEADLINE <= 0:
+        on_time, result = True, answer()
+    else:
+        def acknowledge():
+            gpt_reply_counter.inc("ack")
+            reply_message(event.reply_token, [text_message(GPT_ACK_REPLY)])
+
+        def deliver_late(result, error):
+            # ask_gpt 는 GPT 오류를 GPT_ERROR_REPLY 로 바꿔 돌려주므로 error 는 그 밖의 예외뿐
+            answer, used_gpt = result if error is None else (GPT_ERROR_REPLY, USED_GPT_LIVE)
+            # 사용자가 받은 답변만 그대로 저장하고, push 가 실패한 답변은 표시를 남겨 관리자 화면에서 구분
+            try:
+                push_message(line_user_id, [text_message(answer)])
+            except Exception:
+                gpt_reply_counter.inc("push_failed")
+                save_message(conversation_id, "bot", answer, used_gpt=used_gpt, matched_pattern="push_failed")
+                raise
+            gpt_reply_counter.inc("push")
+            save_message(conversation_id, "bot", answer, used_gpt=used_gpt, matched_pattern=None)
+
+        deadline = event_received_at() + GPT_REPLY_DEADLINE
+        on_time, result = gpt_runner.run(answer, deadline, acknowledge, deliver_late)
+
+    if on_time:
+        answer, used_gpt = result
+        gpt_reply_counter.inc("reply")
+        save_message(conversation_id, "bot", answer, used_gpt=used_gpt, matched_pattern=None)
+        reply_message(event.reply_token, [text_message(answer)])
+
+
 @handler.add(FollowEvent)
+@metrics.event("follow")
 def handle_follow(event):
-    line_bot_api.reply_message(
+    reply_message(
         event.reply_token,
         [
-            TextSendMessage(text="안녕하세요 😊\nPet AI 상담봇입니다!\n\n반려동물 건강 상담을 도와드립니다.\n아래 메뉴를 선택해주세요!"),
+            text_message("안녕하세요 😊\nPet AI 상담봇입니다!\n\n반려동물 건강 상담을 도와드립니다.\n아래 메뉴를 선택해주세요!"),
             create_main_menu()
         ]
     )
 
 
 @handler.add(MessageEvent, message=TextMessage)
+@metrics.event("message")
 def handle_message(event):
     line_user_id = event.source.user_id
     text = event.message.text.strip()
+    matcher = pattern_store.current()  # 이 이벤트가 끝날 때까지 같은 패턴 버전 사용
 
     user_id = upsert_user(line_user_id)
     conversation_id = get_or_create_conversation(user_id)
-    save_message(conversation_id, "user", text, used_gpt=0, matched_pattern=None)
-
-    state = user_states.get(line_user_id, {"step": "none"})
-    step = state.get("step", "none")
-
-    # 메뉴 요청
-    if text in ["메뉴", "시작", "처음", "help"]:
-        reply_text = "메인 메뉴를 띄워드릴게요 😊"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="system_menu")
-        line_bot_api.reply_message(event.reply_token, [TextSendMessage(text=reply_text), create_main_menu()])
-        return
-
-    # 상담 플로우
-    if step == "waiting_guardian_name":
-        state["guardian_name"] = text
-        state["step"] = "waiting_guardian_phone"
-        user_states[line_user_id] = state
-        reply_text = "📞 연락처를 입력해주세요\n\n예시: 010-1234-5678"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="consult_flow")
-        line_bot_api.reply_message(event.reply_token, TextSendMessage(text=reply_text))
-        return
-
-    elif step == "waiting_guardian_phone":
-        state["guardian_phone"] = text
-        state["step"] = "waiting_pet_type"
-        user_states[line_user_id] = state
-        reply_text = "반려동물 종류를 선택해주세요 🐾"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="consult_flow")
-        line_bot_api.reply_message(event.reply_token, [TextSendMessage(text=reply_text), create_pet_type_selection()])
-        return
-
-    elif step == "waiting_pet_name":
-        state["pet_name"] = text
-        state["step"] = "waiting_pet_age"
-        user_states[line_user_id] = state
-        reply_text = "🎂 반려동물의 나이를 입력해주세요\n\n예시: 3살 또는 3"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="consult_flow")
-        line_bot_api.reply_message(event.reply_token, TextSendMessage(text=reply_text))
-        return
-
-    elif step == "waiting_pet_age":
-        state["pet_age"] = text
-        state["step"] = "waiting_category"
-        user_states[line_user_id] = state
-        reply_text = "상담 카테고리를 선택해주세요 📋"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="consult_flow")
-        line_bot_api.reply_message(event.reply_token, [TextSendMessage(text=reply_text), create_category_selection()])
-        return
-
-    elif step == "waiting_description":
-        state["description"] = text
-        state["step"] = "waiting_preferred_time"
-        user_states[line_user_id] = state
-        reply_text = "선호하는 상담 시간대를 선택해주세요 🕐"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="consult_flow")
-        line_bot_api.reply_message(event.reply_token, [TextSendMessage(text=reply_text), create_time_selection()])
+    state = state_store.get(line_user_id)
+
+    # 메뉴 요청 / 상담 플로우 - 플로우 입력(보호자 이름/연락처 등)은 봇 답장과 같은 matched_pattern 으로 남겨 GPT 문맥에서 뺌
+    outcome = consult_flow.on_text(state, text)
+    save_message(conversation_id, "user", text, used_gpt=0, matched_pattern=outcome.pattern if outcome else None)
+    if outcome:
+        text_reply_counter.inc("flow")
+        apply_flow_outcome(event, user_id, line_user_id, conversation_id, outcome)
         return
 
     # 일반 대화
-    pattern_reply, matched_pattern = get_pattern_response(text)
-    if pattern_reply:
-        reply = pattern_reply
-        used_gpt = 0
-    else:
-        reply = ask_gpt(text)
-        used_gpt = 1
-        matched_pattern = None
+    pattern_reply, matched_pattern = get_pattern_response(text, matcher)
+    if not pattern_reply:
+        text_reply_counter.inc("gpt")
+        reply_with_gpt(event, line_user_id, conversation_id, text)
+        return
 
-    save_message(conversation_id, "bot", reply, used_gpt=used_gpt, matched_pattern=matched_pattern)
-    line_bot_api.reply_message(event.reply_token, TextSendMessage(text=reply))
+    text_reply_counter.inc("pattern")
+    save_message(conversation_id, "bot", pattern_reply, used_gpt=USED_GPT_NONE, matched_pattern=matched_pattern)
+    reply_message(event.reply_token, [text_message(pattern_reply)])
 
 
 @handler.add(PostbackEvent)
+@metrics.event("postback")
 def handle_postback(event):
     line_user_id = event.source.user_id
     user_id = upsert_user(line_user_id)
@@ -547,135 +1130,55 @@ def handle_postback(event):
     action = params.get("action")
 
     save_message(conversation_id, "user", f"[POSTBACK]{action}", used_gpt=0, matched_pattern="postback")
+    # 라벨 값이 무한히 늘지 않도록 플로우에 정의된 action 만 그대로 기록
+    postback_counter.inc(action if action in consult_flow.actions else "unknown")
 
-    state = user_states.get(line_user_id, {"step": "none"})
-
-    # 기존 핸들러
-    if action == "consultation":
-        reply_text = "상담 신청을 시작합니다! 😊"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="postback")
-        line_bot_api.reply_message(event.reply_token, [TextSendMessage(text=reply_text), create_consultation_type()])
-
-    elif action == "personal":
-        user_states[line_user_id] = {"step": "waiting_guardian_name", "member_type": "personal"}
-        reply_text = "👤 개인 회원 상담 신청\n\n보호자님의 성함을 입력해주세요"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="consult_flow")
-        line_bot_api.reply_message(event.reply_token, TextSendMessage(text=reply_text))
-
-    elif action == "corporate":
-        user_states[line_user_id] = {"step": "waiting_guardian_name", "member_type": "corporate"}
-        reply_text = "🏢 기업/단체 회원 상담 신청\n\n담당자님의 성함을 입력해주세요"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="consult_flow")
-        line_bot_api.reply_message(event.reply_token, TextSendMessage(text=reply_text))
-
-    elif action == "inquiry":
-        reply_text = "궁금한 내용을 입력해주세요 😊"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="postback")
-        line_bot_api.reply_message(event.reply_token, TextSendMessage(text=reply_text))
-
-    elif action == "contact":
-        reply_text = "📞 연락처 정보\n\n━━━━━━━━━━━━━━━━━━━\n📱 전화: 02-1234-5678\n✉️ 이메일: contact@example.com\n🕐 운영: 평일 9:00-18:00\n━━━━━━━━━━━━━━━━━━━"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="postback")
-        line_bot_api.reply_message(event.reply_token, TextSendMessage(text=reply_text))
-
-    # 신규 핸들러 (6개 메뉴)
-    elif action == "event":
-        reply_text = "🎁 현재 진행 중인 이벤트\n\n━━━━━━━━━━━━━━━━━━━\n1️⃣ 신규 회원 가입 이벤트\n2️⃣ 친구 추천 이벤트\n3️⃣ 월간 행운의 룰렛\n━━━━━━━━━━━━━━━━━━━"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="event")
-        line_bot_api.reply_message(event.reply_token, TextSendMessage(text=reply_text))
-
-    elif action == "partner":
-        reply_text = "🤝 협력사 안내\n\n━━━━━━━━━━━━━━━━━━━\n🏥 ABC 동물병원\n🏪 XYZ 펫샵\n🎓 123 애견훈련소\n━━━━━━━━━━━━━━━━━━━"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="partner")
-        line_bot_api.reply_message(event.reply_token, TextSendMessage(text=reply_text))
-
-    elif action == "app":
-        reply_text = "📱 Pet AI App 설치 안내\n\n━━━━━━━━━━━━━━━━━━━\n🍎 iOS: App Store\n🤖 Android: Play Store\n━━━━━━━━━━━━━━━━━━━\n\n(현재 개발 중)"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="app")
-        line_bot_api.reply_message(event.reply_token, TextSendMessage(text=reply_text))
-
-    # 반려동물 종류
-    elif action.startswith("pet_"):
-        pet_types = {"pet_dog": "dog", "pet_cat": "cat", "pet_other": "other"}
-        pet_names = {"dog": "강아지", "cat": "고양이", "other": "기타"}
-        state["pet_type"] = pet_types[action]
-        state["step"] = "waiting_pet_name"
-        user_states[line_user_id] = state
-        reply_text = f"🐾 {pet_names[state['pet_type']]}를 선택하셨습니다!\n\n반려동물의 이름을 입력해주세요"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="consult_flow")
-        line_bot_api.reply_message(event.reply_token, TextSendMessage(text=reply_text))
-
-    # 카테고리
-    elif action.startswith("cat_"):
-        categories = {
-            "cat_health": "health", "cat_nutrition": "nutrition", "cat_behavior": "behavior",
-            "cat_grooming": "grooming", "cat_emergency": "emergency", "cat_other": "other"
-        }
-        cat_names = {
-            "health": "질병/건강", "nutrition": "영양/사료", "behavior": "행동 교정",
-            "grooming": "미용/관리", "emergency": "응급 상황", "other": "기타 문의"
-        }
-        state["category"] = categories[action]
-        state["step"] = "waiting_urgency"
-        user_states[line_user_id] = state
-        reply_text = f"📋 {cat_names[state['category']]}를 선택하셨습니다!\n\n긴급도를 선택해주세요"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="consult_flow")
-        line_bot_api.reply_message(event.reply_token, [TextSendMessage(text=reply_text), create_urgency_selection()])
-
-    # 긴급도
-    elif action.startswith("urg_"):
-        urgencies = {"urg_urgent": "urgent", "urg_normal": "normal", "urg_flexible": "flexible"}
-        urg_names = {"urgent": "긴급", "normal": "보통", "flexible": "여유"}
-        state["urgency"] = urgencies[action]
-        state["step"] = "waiting_description"
-        user_states[line_user_id] = state
-        reply_text = f"🔔 {urg_names[state['urgency']]}로 설정되었습니다!\n\n상세한 문의 내용을 입력해주세요\n\n예시:\n• 증상이 언제부터 시작되었나요?\n• 어떤 증상이 있나요?\n• 기타 특이사항"
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="consult_flow")
-        line_bot_api.reply_message(event.reply_token, TextSendMessage(text=reply_text))
-
-    # 선호 시간
-    elif action.startswith("time_"):
-        times = {"time_morning": "morning", "time_afternoon": "afternoon", "time_evening": "evening",
-                 "time_anytime": "anytime"}
-        time_names = {"morning": "오전 (9-12시)", "afternoon": "오후 (12-18시)", "evening": "저녁 (18-21시)", "anytime": "상관없음"}
-        state["preferred_time"] = times[action]
-
-        # 상담 정보 DB 저장
-        consultation_number = save_consultation(user_id, state)
-
-        # 완료 메시지
-        pet_types_kr = {"dog": "강아지", "cat": "고양이", "other": "기타"}
-        cat_names_kr = {
-            "health": "질병/건강", "nutrition": "영양/사료", "behavior": "행동 교정",
-            "grooming": "미용/관리", "emergency": "응급 상황", "other": "기타"
-        }
-        urg_emoji = {"urgent": "🔴", "normal": "🟡", "flexible": "🟢"}
-        urg_names_kr = {"urgent": "긴급", "normal": "보통", "flexible": "여유"}
-
-        reply_text = (
-            f"✅ 상담 신청이 완료되었습니다!\n\n"
-            f"━━━━━━━━━━━━━━━━━━━\n"
-            f"📋 접수 번호: {consultation_number}\n"
-            f"━━━━━━━━━━━━━━━━━━━\n\n"
-            f"👤 보호자: {state['guardian_name']}\n"
-            f"📞 연락처: {state['guardian_phone']}\n\n"
-            f"🐾 반려동물: {state['pet_name']} ({pet_types_kr[state['pet_type']]}, {state.get('pet_age', '나이 미입력')})\n"
-            f"📋 카테고리: {cat_names_kr[state['category']]}\n"
-            f"{urg_emoji[state['urgency']]} 긴급도: {urg_names_kr[state['urgency']]}\n"
-            f"💬 문의 내용:\n{state['description']}\n\n"
-            f"🕐 선호 시간: {time_names[state['preferred_time']]}\n\n"
-            f"━━━━━━━━━━━━━━━━━━━\n"
-            f"빠른 시일 내에 연락드리겠습니다.\n"
-            f"감사합니다! 😊\n\n"
-            f"접수번호로 상담 진행 상황을 확인하실 수 있습니다."
-        )
-
-        save_message(conversation_id, "bot", reply_text, used_gpt=0, matched_pattern="consult_complete")
-        user_states[line_user_id] = {"step": "none"}
-        line_bot_api.reply_message(event.reply_token, TextSendMessage(text=reply_text))
+    state = state_store.get(line_user_id)
+    outcome = consult_flow.on_postback(state, action)
+    if outcome:
+        apply_flow_outcome(event, user_id, line_user_id, conversation_id, outcome)
 
 
 # ==================== RUN ====================
+@atexit.register
+def shutdown():
+    """종료 순서: 큐에 남은 웹훅 처리 → 늦은 GPT 답변 push → 버퍼에 남은 메시지 저장"""
+    if webhook_dispatcher is not None:
+        webhook_dispatcher.drain(WEBHOOK_DRAIN_TIMEOUT)
+    gpt_runner.close()  # 기한을 넘긴 GPT 답변의 push / 저장까지 마침
+    gpt_context.close()  # 진행 중이 아닌 요약은 버림 (다음 실행에서 다시 만듦)
+    if message_writer is not None:
+        message_writer.close()
+    identity_cache.close()
+    line_session.close()
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        abort(401)
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.route("/ready")
+def ready():
+    """의존성 준비 상태. 준비 중 오류가 남아 있으면 503, ?strict=1 이면 모두 준비되어야 200
+
+    상태만 보고하고 준비는 하지 않는다 (프로브가 DB 연결 timeout 만큼 멈추지 않도록).
+    lazy 모드의 DB/OpenAI 는 처음 쓸 때 준비하므로 strict 여도 준비 전인 것은 문제로 보지 않는다.
+    """
+    patterns = pattern_store.status()
+    checks = {
+        "db": db_warm.status(),
+        "openai": openai_client.status(),
+        "patterns": {"warm": patterns["version"] > 0, "error": patterns["last_error"]},
+    }
+    strict = request.args.get("strict") == "1"
+    on_first_use = {"db", "openai"} if STARTUP_MODE == "lazy" else set()
+    ok = all(not c["error"] and (c["warm"] or not strict or name in on_first_use) for name, c in checks.items())
+    return jsonify({"ready": ok, "startup_mode": STARTUP_MODE, "checks": checks}), 200 if ok else 503
+
+
 @app.route("/")
 def home():
     return "Pet AI 상담봇 실행 중 🚀<br><a href='/admin'>관리자 페이지</a>"
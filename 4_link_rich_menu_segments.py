@@ -0,0 +1,117 @@
+"""세그먼트별 Rich Menu 일괄 연결 (기본 메뉴 대신 사용자별 메뉴)
+
+users / consultations 에서 세그먼트에 속한 LINE 사용자 ID 를 users.id 순서로 조금씩 읽어
+500명씩 bulk link 로 연결한다. 요청 수는 토큰 버킷으로 제한하고, 진행 위치를 체크포인트 파일에
+남겨 중단된 뒤 다시 실행하면 이어서 연결한다. 완료된 뒤 세그먼트 구성(사용자 수/최대·합계 users.id)이
+바뀌었으면 다시 실행할 때 처음부터 연결한다 (cron 으로 주기 실행 가능).
+
+    python 4_link_rich_menu_segments.py corporate --spec rich_menus/corporate.json
+    python 4_link_rich_menu_segments.py open_consultation --rich-menu-id richmenu-xxxx --rate 2
+
+세그먼트: rich_menu_link.SEGMENTS (all / open_consultation / corporate)
+--spec 을 주면 2_create_rich_menu_premium.py 와 같은 방식으로 (기본 메뉴는 바꾸지 않고) 배포한 뒤 연결한다.
+"""
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+from line_http import LineSession
+from rich_menu_deploy import RichMenuAPI, RichMenuError, deploy
+from rich_menu_link import BULK_LINK_MAX, SEGMENTS, Checkpoint, link_batches, rebatch, segment_signature, stream_users
+from rich_menu_render import load_spec
+from token_bucket import TokenBucket
+
+load_dotenv()
+
+CHANNEL_ACCESS_TOKEN = os.getenv("LINE_CHANNEL_ACCESS_TOKEN")
+LINE_API_ENDPOINT = os.getenv("LINE_API_ENDPOINT", "https://api.line.me")
+LINE_API_DATA_ENDPOINT = os.getenv("LINE_API_DATA_ENDPOINT", "https://api-data.line.me")
+
+
+def mysql_connect():
+    import mysql.connector
+    return mysql.connector.connect(
+        host=os.getenv("DB_HOST"),
+        port=int(os.getenv("DB_PORT", "3306")),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        database=os.getenv("DB_NAME"),
+        autocommit=True  # 청크마다 새 스냅샷 (긴 트랜잭션을 잡지 않음)
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="세그먼트별 Rich Menu 일괄 연결")
+    parser.add_argument("segment", choices=sorted(SEGMENTS))
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--spec", help="배포 후 연결할 메뉴 스펙")
+    target.add_argument("--rich-menu-id", help="이미 배포된 메뉴 ID")
+    parser.add_argument("--rate", type=float, default=3.0, help="초당 bulk link 요청 수 (채널 한도에 맞춰 조정)")
+    # 1초 창으로 세는 한도에서 첫 1초에 burst + rate 개가 나가지 않도록 기본은 몰아 보내지 않음
+    parser.add_argument("--burst", type=float, default=1.0, help="한 번에 몰아 보낼 수 있는 요청 수")
+    parser.add_argument("--concurrency", type=int, default=2, help="동시에 보낼 요청 수")
+    parser.add_argument("--batch-size", type=int, default=BULK_LINK_MAX, help=f"요청 1건당 사용자 수 (최대 {BULK_LINK_MAX})")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="DB 에서 한 번에 읽을 사용자 수")
+    parser.add_argument("--checkpoint", default=None, help="진행 기록 파일 (기본: .rich_menu_link_<세그먼트>.json)")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터")
+    args = parser.parse_args(argv)
+
+    if not CHANNEL_ACCESS_TOKEN:
+        print("❌ LINE_CHANNEL_ACCESS_TOKEN이 .env 파일에 없습니다!")
+        return 1
+    if not 1 <= args.batch_size <= BULK_LINK_MAX:
+        parser.error(f"--batch-size 는 1~{BULK_LINK_MAX}")
+
+    session = LineSession(pool_size=max(args.concurrency, 2), read_timeout=30, deadline=60)
+    api = RichMenuAPI(session, CHANNEL_ACCESS_TOKEN, LINE_API_ENDPOINT, LINE_API_DATA_ENDPOINT)
+
+    print("=" * 60)
+    print(f"🔗 세그먼트 '{args.segment}' Rich Menu 연결")
+    print("=" * 60)
+    try:
+        rich_menu_id = args.rich_menu_id
+        if args.spec:
+            # 세그먼트용 메뉴: 기본 메뉴를 바꾸지 않고, 이전 버전에 연결된 사용자가 빈 메뉴가 되지 않도록 삭제도 하지 않음
+            rich_menu_id = deploy(api, load_spec(args.spec), set_default=False, delete_stale=False)["menu_id"]
+    except RichMenuError as e:
+        print(f"❌ {e}")
+        return 1
+
+    checkpoint = Checkpoint(args.checkpoint or f".rich_menu_link_{args.segment}.json", args.segment, rich_menu_id)
+    fresh = {"last_user_id": 0, "linked": 0, "signature": None}
+    start = fresh if args.restart else checkpoint.load()
+
+    bucket = TokenBucket(args.rate, args.burst)
+    conn = mysql_connect()
+    try:
+        cursor = conn.cursor()
+        signature = segment_signature(cursor, args.segment)
+        if start.get("done"):
+            if start["signature"] == signature:
+                print(f"✅ 이미 완료된 연결입니다 ({start['linked']}명, 세그먼트 변경 없음). 다시 하려면 --restart")
+                return 0
+            print(f"🔄 완료 후 세그먼트가 바뀌어 처음부터 다시 연결 (사용자 {start['signature']} → {signature})")
+            start = fresh
+        if start["last_user_id"]:
+            print(f"⏯️ 이어서 연결: users.id > {start['last_user_id']} (이전 {start['linked']}명)")
+            # 중단된 실행이 시작할 때의 구성을 유지 (그 사이에 앞쪽에 들어온 사용자는 다음 실행에서 다시 연결)
+            signature = start["signature"] or signature
+        batches = rebatch(stream_users(cursor, args.segment, start["last_user_id"], args.chunk_size), args.batch_size)
+        report = link_batches(lambda user_ids: api.bulk_link(rich_menu_id, user_ids), batches, bucket,
+                              concurrency=args.concurrency, checkpoint=checkpoint, start=start, signature=signature)
+        cursor.close()
+    finally:
+        conn.close()
+
+    stats, waits = session.stats(), bucket.stats()
+    print("=" * 60)
+    print(f"{'🎉 완료' if report['done'] else '⚠️ 중단 (다시 실행하면 이어서 연결)'}: 누적 {report['total_linked']}명, "
+          f"마지막 users.id {report['last_user_id']}")
+    print(f"🌐 요청 {stats['calls']}회 / 재시도 {stats['retries']}회 (429 {stats['retry_429']}) / "
+          f"속도 제한 대기 {waits['wait_total_ms'] / 1000:.1f}초")
+    print("=" * 60)
+    return 0 if report["done"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""상담 플로우 처리량: 기존 if/elif + startswith 체인 vs ConsultFlow (dict 디스패치)
+
+합성 사용자 N명이 상담 신청 전 과정(시작 → 이름 → 연락처 → 종류 → 반려동물 이름 → 나이
+→ 카테고리 → 긴급도 → 내용 → 시간)을 MemoryStateStore 위에서 동시에 진행한다.
+DB/LINE 호출은 빼고 라우팅 + 상태 갱신 + 답장 문구 생성만 잰다.
+
+    python benchmarks/bench_consult_flow.py [사용자 수]
+"""
+import copy
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from consult_flow import FLOW, ConsultFlow
+from state_store import MemoryStateStore
+
+PET = ["pet_dog", "pet_cat", "pet_other"]
+CAT = ["cat_health", "cat_nutrition", "cat_behavior", "cat_grooming", "cat_emergency", "cat_other"]
+URG = ["urg_urgent", "urg_normal", "urg_flexible"]
+TIME = ["time_morning", "time_afternoon", "time_evening", "time_anytime"]
+
+
+def script(i, rnd):
+    """사용자 한 명의 이벤트 순서 [(kind, 값)]"""
+    return [
+        ("postback", rnd.choice(["personal", "corporate"])),
+        ("text", f"보호자{i}"),
+        ("text", f"010-{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}"),
+        ("postback", rnd.choice(PET)),
+        ("text", f"초코{i}"),
+        ("text", f"{rnd.randint(1, 15)}살"),
+        ("postback", rnd.choice(CAT)),
+        ("postback", rnd.choice(URG)),
+        ("text", "어제부터 밥을 안 먹어요"),
+        ("postback", rnd.choice(TIME)),
+    ]
+
+
+# ---------- 기존 방식 (3_app_complete.py 의 if/elif 체인을 부수 효과만 빼고 옮김) ----------
+def legacy_text(store, uid, text):
+    state = store.get(uid)
+    step = state.get("step", "none")
+    if text in ["메뉴", "시작", "처음", "help"]:
+        return "메인 메뉴를 띄워드릴게요 😊"
+    if step == "waiting_guardian_name":
+        state["guardian_name"] = text
+        state["step"] = "waiting_guardian_phone"
+        store.set(uid, state)
+        return "📞 연락처를 입력해주세요\n\n예시: 010-1234-5678"
+    elif step == "waiting_guardian_phone":
+        state["guardian_phone"] = text
+        state["step"] = "waiting_pet_type"
+        store.set(uid, state)
+        return "반려동물 종류를 선택해주세요 🐾"
+    elif step == "waiting_pet_name":
+        state["pet_name"] = text
+        state["step"] = "waiting_pet_age"
+        store.set(uid, state)
+        return "🎂 반려동물의 나이를 입력해주세요\n\n예시: 3살 또는 3"
+    elif step == "waiting_pet_age":
+        state["pet_age"] = text
+        state["step"] = "waiting_category"
+        store.set(uid, state)
+        return "상담 카테고리를 선택해주세요 📋"
+    elif step == "waiting_description":
+        state["description"] = text
+        state["step"] = "waiting_preferred_time"
+        store.set(uid, state)
+        return "선호하는 상담 시간대를 선택해주세요 🕐"
+    return None
+
+
+def legacy_postback(store, uid, action, number):
+    state = store.get(uid)
+    if action == "consultation":
+        return "상담 신청을 시작합니다! 😊"
+    elif action == "personal":
+        store.set(uid, {"step": "waiting_guardian_name", "member_type": "personal"})
+        return "👤 개인 회원 상담 신청\n\n보호자님의 성함을 입력해주세요"
+    elif action == "corporate":
+        store.set(uid, {"step": "waiting_guardian_name", "member_type": "corporate"})
+        return "🏢 기업/단체 회원 상담 신청\n\n담당자님의 성함을 입력해주세요"
+    elif action == "inquiry":
+        return "궁금한 내용을 입력해주세요 😊"
+    elif action == "contact":
+        return "📞 연락처 정보"
+    elif action == "event":
+        return "🎁 현재 진행 중인 이벤트"
+    elif action == "partner":
+        return "🤝 협력사 안내"
+    elif action == "app":
+        return "📱 Pet AI App 설치 안내"
+    elif action.startswith("pet_"):
+        pet_types = {"pet_dog": "dog", "pet_cat": "cat", "pet_other": "other"}
+        pet_names = {"dog": "강아지", "cat": "고양이", "other": "기타"}
+        state["pet_type"] = pet_types[action]
+        state["step"] = "waiting_pet_name"
+        store.set(uid, state)
+        return f"🐾 {pet_names[state['pet_type']]}를 선택하셨습니다!\n\n반려동물의 이름을 입력해주세요"
+    elif action.startswith("cat_"):
+        categories = {
+            "cat_health": "health", "cat_nutrition": "nutrition", "cat_behavior": "behavior",
+            "cat_grooming": "grooming", "cat_emergency": "emergency", "cat_other": "other"
+        }
+        cat_names = {
+            "health": "질병/건강", "nutrition": "영양/사료", "behavior": "행동 교정",
+            "grooming": "미용/관리", "emergency": "응급 상황", "other": "기타 문의"
+        }
+        state["category"] = categories[action]
+        state["step"] = "waiting_urgency"
+        store.set(uid, state)
+        return f"📋 {cat_names[state['category']]}를 선택하셨습니다!\n\n긴급도를 선택해주세요"
+    elif action.startswith("urg_"):
+        urgencies = {"urg_urgent": "urgent", "urg_normal": "normal", "urg_flexible": "flexible"}
+        urg_names = {"urgent": "긴급", "normal": "보통", "flexible": "여유"}
+        state["urgency"] = urgencies[action]
+        state["step"] = "waiting_description"
+        store.set(uid, state)
+        return (f"🔔 {urg_names[state['urgency']]}로 설정되었습니다!\n\n상세한 문의 내용을 입력해주세요\n\n"
+                "예시:\n• 증상이 언제부터 시작되었나요?\n• 어떤 증상이 있나요?\n• 기타 특이사항")
+    elif action.startswith("time_"):
+        times = {"time_morning": "morning", "time_afternoon": "afternoon", "time_evening": "evening",
+                 "time_anytime": "anytime"}
+        time_names = {"morning": "오전 (9-12시)", "afternoon": "오후 (12-18시)", "evening": "저녁 (18-21시)",
+                      "anytime": "상관없음"}
+        state["preferred_time"] = times[action]
+        pet_types_kr = {"dog": "강아지", "cat": "고양이", "other": "기타"}
+        cat_names_kr = {
+            "health": "질병/건강", "nutrition": "영양/사료", "behavior": "행동 교정",
+            "grooming": "미용/관리", "emergency": "응급 상황", "other": "기타"
+        }
+        urg_emoji = {"urgent": "🔴", "normal": "🟡", "flexible": "🟢"}
+        urg_names_kr = {"urgent": "긴급", "normal": "보통", "flexible": "여유"}
+        reply_text = (
+            f"✅ 상담 신청이 완료되었습니다!\n\n"
+            f"━━━━━━━━━━━━━━━━━━━\n"
+            f"📋 접수 번호: {number}\n"
+            f"━━━━━━━━━━━━━━━━━━━\n\n"
+            f"👤 보호자: {state['guardian_name']}\n"
+            f"📞 연락처: {state['guardian_phone']}\n\n"
+            f"🐾 반려동물: {state['pet_name']} ({pet_types_kr[state['pet_type']]}, {state.get('pet_age', '나이 미입력')})\n"
+            f"📋 카테고리: {cat_names_kr[state['category']]}\n"
+            f"{urg_emoji[state['urgency']]} 긴급도: {urg_names_kr[state['urgency']]}\n"
+            f"💬 문의 내용:\n{state['description']}\n\n"
+            f"🕐 선호 시간: {time_names[state['preferred_time']]}\n\n"
+            f"━━━━━━━━━━━━━━━━━━━\n"
+            f"빠른 시일 내에 연락드리겠습니다.\n"
+            f"감사합니다! 😊\n\n"
+            f"접수번호로 상담 진행 상황을 확인하실 수 있습니다."
+        )
+        store.delete(uid)
+        return reply_text
+    return None
+
+
+# ---------- ConsultFlow (3_app_complete.apply_flow_outcome 과 같은 순서) ----------
+def flow_event(flow, store, uid, kind, value, number):
+    state = store.get(uid)
+    outcome = flow.on_text(state, value) if kind == "text" else flow.on_postback(state, value)
+    if outcome is None:
+        return None
+    if outcome.complete:
+        store.delete(uid)
+        return flow.completion_text(outcome.state, number)
+    if outcome.state is not None:
+        store.set(uid, outcome.state)
+    return outcome.text
+
+
+def drive(events, handle):
+    """사용자들의 이벤트를 라운드로빈으로 섞어 실행 → (경과 초, 답장 목록)"""
+    replies = []
+    t0 = time.perf_counter()
+    for uid, kind, value in events:
+        replies.append(handle(uid, kind, value))
+    return time.perf_counter() - t0, replies
+
+
+def interleave(scripts):
+    events = []
+    for step in range(len(scripts[0])):
+        for uid, steps in enumerate(scripts):
+            kind, value = steps[step]
+            events.append((f"U{uid:08d}", kind, value))
+    return events
+
+
+def padded_flow(extra_steps):
+    """이름 입력 뒤에 텍스트 단계 extra_steps 개를 끼워 넣은 플로우 (단계가 늘어도 이벤트당 비용이 같은지 확인)"""
+    spec = copy.deepcopy(FLOW)
+    steps = spec["steps"]
+    chain = [f"waiting_extra_{i}" for i in range(extra_steps)] + ["waiting_guardian_phone"]
+    steps["waiting_guardian_name"]["next"] = chain[0]
+    for i in range(extra_steps):
+        steps[chain[i]] = {"input": "text", "field": "guardian_name", "next": chain[i + 1], "reply": f"추가 질문 {i}"}
+    return ConsultFlow(spec)
+
+
+def run(users=5000):
+    rnd = random.Random(42)
+    scripts = [script(i, rnd) for i in range(users)]
+    events = interleave(scripts)
+    number = "C20260201-0001"
+    flow = ConsultFlow()
+
+    legacy_store = MemoryStateStore(ttl=3600, max_entries=users * 2)
+    flow_store = MemoryStateStore(ttl=3600, max_entries=users * 2)
+
+    def legacy(uid, kind, value):
+        if kind == "text":
+            return legacy_text(legacy_store, uid, value)
+        return legacy_postback(legacy_store, uid, value, number)
+
+    legacy_s, legacy_replies = drive(events, legacy)
+    flow_s, flow_replies = drive(events, lambda uid, kind, value: flow_event(flow, flow_store, uid, kind, value, number))
+
+    # 답장 문구가 기존과 같은지 (완료 메시지 포함)
+    assert legacy_replies == flow_replies, "답장 문구가 기존 플로우와 다름"
+    assert legacy_store.stats()["sessions"] == flow_store.stats()["sessions"] == 0
+
+    # 연락처 검증: 잘못된 입력이면 같은 단계에 머무름
+    state = {"step": "waiting_guardian_phone", "member_type": "personal", "guardian_name": "홍길동"}
+    assert flow.on_text(state, "모름").state is None
+    assert flow.on_text(state, "010-1234-5678").state["step"] == "waiting_pet_type"
+
+    # 단계 수에 따른 이벤트당 라우팅 비용 (dict 조회라 평평해야 함)
+    growth = {}
+    for extra in (0, 50, 500):
+        grown = padded_flow(extra)
+        state = {"step": "waiting_guardian_name", "member_type": "personal"}
+        n = 200000
+        t0 = time.perf_counter()
+        for _ in range(n):
+            grown.on_text(state, "홍길동")
+        growth[len(grown._steps)] = round((time.perf_counter() - t0) / n * 1e6, 3)
+
+    n_events = len(events)
+    print("=" * 60)
+    print(f"👥 합성 사용자 {users}명 / 이벤트 {n_events}건 (답장 일치 확인)")
+    print(f"🐢 if/elif 체인  : {n_events / legacy_s:,.0f} 이벤트/초 ({legacy_s / n_events * 1e6:.2f}µs)")
+    print(f"🚀 ConsultFlow   : {n_events / flow_s:,.0f} 이벤트/초 ({flow_s / n_events * 1e6:.2f}µs)")
+    print(f"   완료된 상담    : {users / flow_s:,.0f} 플로우/초")
+    print(f"📏 텍스트 단계 수별 on_text µs: {growth}")
+    print("=" * 60)
+    print(json.dumps({
+        "users": users, "events": n_events,
+        "legacy_events_per_s": round(n_events / legacy_s), "flow_events_per_s": round(n_events / flow_s),
+        "flow_flows_per_s": round(users / flow_s), "on_text_us_by_steps": growth,
+    }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,107 @@
+"""상담 목록 조회 벤치마크: 전체 fetchall vs 키셋 페이지네이션 (로컬 sqlite3)
+
+MySQL 대신 sqlite3 에 같은 모양의 consultations 테이블과 (created_at, id) 인덱스를 만들고
+기존 목록 쿼리(SELECT * … ORDER BY created_at DESC, LIMIT 없음)와 비교한다.
+
+    python benchmarks/bench_consultation_list.py [행 수]
+"""
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from consultation_queries import list_query, split_page
+
+
+def dict_row(cursor, row):
+    return {col[0]: value for col, value in zip(cursor.description, row)}
+
+
+def setup(path, n_rows, seed=3):
+    conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+    conn.executescript("""
+        CREATE TABLE consultations (
+            id INTEGER PRIMARY KEY, consultation_number TEXT, member_type TEXT,
+            guardian_name TEXT, guardian_phone TEXT, guardian_phone_digits TEXT,
+            pet_type TEXT, pet_name TEXT, pet_age TEXT, category TEXT, urgency TEXT,
+            description TEXT, preferred_time TEXT, status TEXT, created_at TIMESTAMP
+        );
+    """)
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(1, n_rows + 1):
+        created = start + timedelta(seconds=i * 30)
+        phone = f"010-{rng.randrange(10000):04d}-{rng.randrange(10000):04d}"
+        rows.append((
+            i, f"C{created:%Y%m%d}-{i % 1000:03d}", "personal", f"보호자{i % 5000}", phone, phone.replace("-", ""),
+            "dog", f"펫{i}", "3", "health", rng.choice(["urgent", "normal", "flexible"]),
+            "설명 " * 20, "morning", rng.choice(["pending", "done"]), created,
+        ))
+        if len(rows) == 50000:
+            conn.executemany("INSERT INTO consultations VALUES (" + ", ".join(["?"] * 15) + ")", rows)
+            rows.clear()
+    if rows:
+        conn.executemany("INSERT INTO consultations VALUES (" + ", ".join(["?"] * 15) + ")", rows)
+    # migrations/002 와 같은 인덱스 (FULLTEXT 제외)
+    conn.executescript("""
+        CREATE INDEX idx_consultations_created ON consultations (created_at, id);
+        CREATE INDEX idx_consultations_status_created ON consultations (status, created_at, id);
+        CREATE INDEX idx_consultations_phone_digits ON consultations (guardian_phone_digits);
+    """)
+    conn.commit()
+    conn.execute("PRAGMA case_sensitive_like = ON")  # MySQL 처럼 LIKE 'x%' 가 인덱스를 타도록
+    return conn
+
+
+def timed(conn, query, params):
+    cur = conn.cursor()
+    cur.row_factory = dict_row
+    t0 = time.perf_counter()
+    cur.execute(query.replace("%s", "?"), params)
+    rows = cur.fetchall()
+    return rows, (time.perf_counter() - t0) * 1000
+
+
+def run(n_rows=1_000_000):
+    path = os.path.join(tempfile.mkdtemp(), "list.db")
+    t0 = time.perf_counter()
+    conn = setup(path, n_rows)
+    print(f"📦 {n_rows:,}행 생성 {time.perf_counter() - t0:.1f}s")
+
+    results = {}
+    _, results["legacy_fetchall_ms"] = timed(conn, "SELECT * FROM consultations WHERE 1=1 ORDER BY created_at DESC", [])
+
+    query, params = list_query(page_size=50)
+    rows, results["page1_ms"] = timed(conn, query, params)
+    _, cursor = split_page(rows, 50)
+    for _ in range(99):
+        query, params = list_query(cursor=cursor, page_size=50)
+        rows, elapsed = timed(conn, query, params)
+        _, cursor = split_page(rows, 50)
+    results["page100_ms"] = elapsed
+
+    query, params = list_query(status="pending", page_size=50)
+    _, results["status_filter_page1_ms"] = timed(conn, query, params)
+
+    query, params = list_query(search="010-1234", page_size=50)
+    _, results["phone_prefix_search_ms"] = timed(conn, query, params)
+
+    results = {k: round(v, 3) for k, v in results.items()}
+    print("=" * 60)
+    for key, value in results.items():
+        print(f"{key:>26}: {value}ms")
+    print("=" * 60)
+    print(json.dumps({"rows": n_rows, **results}))
+    conn.close()
+    return 0 if results["page1_ms"] < 50 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
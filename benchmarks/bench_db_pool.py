@@ -0,0 +1,75 @@
+"""DB 커넥션 풀 동시성 벤치마크 (MySQL 대신 로컬 sqlite3 파일 사용)
+
+여러 스레드가 풀에서 커넥션을 빌려 INSERT/SELECT 를 하고,
+중간에 커넥션을 강제로 끊어 재연결이 되는지 확인한다.
+
+    python benchmarks/bench_db_pool.py [스레드 수] [스레드당 작업 수]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from db_pool import ConnectionPool
+
+
+def run(n_threads=16, n_ops=200, pool_size=4):
+    path = os.path.join(tempfile.mkdtemp(), "pool.db")
+
+    def connect():
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    pool = ConnectionPool(connect, size=pool_size, timeout=30, health_check_interval=0.0,
+                          disconnect_errors=(sqlite3.ProgrammingError,))
+    with pool.cursor() as cur:
+        cur.execute("CREATE TABLE messages (id INTEGER PRIMARY KEY, thread INTEGER, content TEXT)")
+
+    errors = []
+
+    def worker(n):
+        for i in range(n_ops):
+            try:
+                with pool.connection() as conn:
+                    if n == 0 and i == n_ops // 2:
+                        conn.close()  # 끊긴 커넥션 흉내: 이 커넥션은 버려져야 한다
+                    cur = conn.cursor()
+                    cur.execute("INSERT INTO messages (thread, content) VALUES (?, ?)", (n, f"msg {i}"))
+                    cur.close()
+            except sqlite3.ProgrammingError:
+                errors.append(n)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with pool.cursor() as cur:
+        cur.execute("SELECT COUNT(*) AS cnt FROM messages")
+        count = cur.fetchone()["cnt"]
+
+    stats = pool.stats()
+    print("=" * 60)
+    print(f"🧵 스레드 {n_threads} x {n_ops}회, pool size={pool_size}: {elapsed:.2f}s")
+    print(f"📦 저장된 행 {count} / 기대 {n_threads * n_ops - len(errors)} (끊김 오류 {len(errors)}건)")
+    print(f"📊 {stats}")
+    print("=" * 60)
+
+    ok = (count == n_threads * n_ops - len(errors) and stats["broken"] == len(errors) == 1
+          and stats["created"] <= pool_size + 1 and stats["in_use"] == 0)
+    print("✅ 풀 동작 정상" if ok else "❌ 풀 동작 이상")
+    pool.close()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(run(*args))
@@ -0,0 +1,66 @@
+"""Rich Menu 이미지 인코딩: 기존 img.save(PNG) vs rich_menu_encode.encode (1MB 예산)
+
+- flat: rich_menus/premium.json 그대로 (단색 칸 + 글자)
+- busy: 같은 이미지에 노이즈를 섞음 (사진/그라데이션 배경 흉내 → 무손실 PNG 는 1MB 초과)
+
+    python benchmarks/bench_encode.py [반복 횟수]
+"""
+import io
+import json
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, ROOT)
+
+from PIL import Image
+
+from rich_menu_encode import MAX_BYTES, encode
+from rich_menu_render import load_spec, render
+
+
+def images():
+    flat = render(load_spec(os.path.join(ROOT, "rich_menus", "premium.json")))
+    rnd = random.Random(1)
+    noise = Image.frombytes("RGB", flat.size, rnd.randbytes(flat.size[0] * flat.size[1] * 3))
+    return {"flat": flat, "busy": Image.blend(flat, noise, 0.15)}
+
+
+def legacy_png(img):
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def run(repeat=3):
+    results = {}
+    for name, img in images().items():
+        legacy_ms, encoded_ms = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            legacy = legacy_png(img)
+            legacy_ms.append((time.perf_counter() - started) * 1000)
+            encoded = encode(img)
+            encoded_ms.append(encoded.encode_ms)
+        results[name] = {
+            "legacy_bytes": len(legacy), "legacy_ms": round(min(legacy_ms), 1), "legacy_fits": len(legacy) <= MAX_BYTES,
+            "encoded_bytes": len(encoded.data), "encoded_ms": round(min(encoded_ms), 1), "encoded_as": encoded.detail,
+            "attempts": len(encoded.attempts),
+        }
+
+    print("=" * 60)
+    for name, r in results.items():
+        print(f"🐢 {name:<5} 기존 PNG {r['legacy_bytes'] / 1024:,.0f}KB {r['legacy_ms']}ms "
+              f"({'OK' if r['legacy_fits'] else '1MB 초과 → 업로드 거부'})")
+        print(f"🚀 {name:<5} encode  {r['encoded_bytes'] / 1024:,.0f}KB {r['encoded_ms']}ms "
+              f"({r['encoded_as']}, 시도 {r['attempts']}번)")
+    print("=" * 60)
+    print(json.dumps(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(*[int(a) for a in sys.argv[1:2]]))
@@ -0,0 +1,86 @@
+"""답장 1건당 메시지 직렬화 CPU 비교: 매번 dict 생성 + json.dumps vs 미리 인코딩된 bytes
+
+기존 경로(SDK)는 FlexSendMessage 객체 생성 → as_json_dict() → json.dumps 를 답장마다 하므로
+여기서 재는 '매번 dict + json.dumps' 는 기존 비용의 하한이다.
+
+    python benchmarks/bench_flex_messages.py [반복 수]
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from flex_templates import MessageRegistry, reply_body, text_message
+
+REPLY_TOKEN = "nHuyWiB7yP5Zw52FIkcQobQuGDXCTA"
+
+
+def category_contents():
+    return {
+        "type": "bubble",
+        "body": {
+            "type": "box",
+            "layout": "vertical",
+            "contents": [
+                {"type": "text", "text": "상담 카테고리를 선택해주세요", "weight": "bold", "size": "lg", "align": "center"},
+                {"type": "separator", "margin": "lg"},
+                {"type": "button", "style": "primary", "color": "#E74C3C",
+                 "action": {"type": "postback", "label": "🏥 질병/건강", "data": "action=cat_health"}},
+                {"type": "button", "style": "primary", "color": "#F39C12",
+                 "action": {"type": "postback", "label": "🍖 영양/사료", "data": "action=cat_nutrition"}},
+                {"type": "button", "style": "primary", "color": "#9B59B6",
+                 "action": {"type": "postback", "label": "😺 행동 교정", "data": "action=cat_behavior"}},
+                {"type": "button", "style": "primary", "color": "#3498DB",
+                 "action": {"type": "postback", "label": "✂️ 미용/관리", "data": "action=cat_grooming"}},
+                {"type": "button", "style": "primary", "color": "#C0392B",
+                 "action": {"type": "postback", "label": "💊 응급 상황", "data": "action=cat_emergency"}},
+                {"type": "button", "style": "primary", "color": "#7F8C8D",
+                 "action": {"type": "postback", "label": "🏠 기타 문의", "data": "action=cat_other"}}
+            ]
+        }
+    }
+
+
+def legacy_reply(text):
+    data = {
+        "replyToken": REPLY_TOKEN,
+        "messages": [
+            {"type": "text", "text": text},
+            {"type": "flex", "altText": "상담 카테고리", "contents": category_contents()},
+        ],
+    }
+    return json.dumps(data).encode("utf-8")
+
+
+def per_call_us(fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def run(n=20000):
+    registry = MessageRegistry()
+    registry.register_flex("category_selection", "상담 카테고리", category_contents())
+    text = "상담 카테고리를 선택해주세요 📋"
+
+    # 같은 JSON 이 나오는지 확인
+    assert json.loads(legacy_reply(text)) == json.loads(
+        reply_body(REPLY_TOKEN, [text_message(text), registry.get("category_selection")]))
+    assert json.loads(text_message('홍"길동님\n접수 번호 C20260201-001'))["text"] == '홍"길동님\n접수 번호 C20260201-001'
+
+    legacy = per_call_us(lambda: legacy_reply(text), n)
+    cached = per_call_us(lambda: reply_body(REPLY_TOKEN, [text_message(text), registry.get("category_selection")]), n)
+
+    print("=" * 60)
+    print(f"🐢 매번 dict + json.dumps : {legacy:.2f}µs / 답장")
+    print(f"🚀 미리 인코딩된 bytes    : {cached:.2f}µs / 답장 ({legacy / cached:.1f}배)")
+    print("=" * 60)
+    print(json.dumps({"legacy_us": round(legacy, 3), "cached_us": round(cached, 3)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,142 @@
+"""GPT 대화 문맥: 전체 기록을 보내는 방식 vs ConversationContext (최근 메시지 + 누적 요약, 토큰 예산) (로컬 sqlite3)
+
+sqlite3 에 messages 테이블과 (conversation_id, id) 인덱스를 만들고 MessageWriter(write-behind)로 대화를 쌓으면서
+질문마다 문맥을 만든다. 턴이 늘어날 때 프롬프트 토큰 수와 문맥을 만드는 시간, 요약 호출 수를 비교한다.
+요약은 GPT 대신 이전 요약 + 새 대화 앞부분을 이어 붙이는 함수로 흉내 낸다 (summary_latency 초 대기).
+
+    python benchmarks/bench_gpt_context.py [턴 수] [대화 수]
+"""
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gpt_context import ConversationContext, estimate_tokens
+from message_writer import MessageWriter
+
+SYSTEM_PROMPT = "너는 친절한 고객 상담 챗봇이야."
+QUESTIONS = ["우리 강아지가 어제부터 밥을 안 먹어요", "토도 두 번 했어요", "열은 없는 것 같은데 기운이 없어요",
+             "예방접종은 작년에 했어요", "병원에 가야 할까요?", "사료를 바꾼 지 일주일 됐어요"]
+
+
+class Store:
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.executescript("""
+            CREATE TABLE messages (id INTEGER PRIMARY KEY AUTOINCREMENT, conversation_id INTEGER, sender TEXT,
+                                   content TEXT, used_gpt INTEGER, matched_pattern TEXT);
+            CREATE INDEX idx_messages_conversation ON messages (conversation_id, id);
+        """)
+
+    def insert(self, rows):
+        with self.lock:
+            self.conn.executemany("INSERT INTO messages (conversation_id, sender, content, used_gpt, matched_pattern) "
+                                  "VALUES (?, ?, ?, ?, ?)", rows)
+
+    def query(self, sql, params):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def load_recent(self, conversation_id, limit):
+        rows = self.query("SELECT id, sender, content FROM messages WHERE conversation_id = ? ORDER BY id DESC LIMIT ?",
+                          (conversation_id, limit))
+        return list(reversed(rows))
+
+    def load_between(self, conversation_id, after_id, before_id, limit):
+        rows = self.query("SELECT id, sender, content FROM messages WHERE conversation_id = ? AND id > ? AND id < ? "
+                          "ORDER BY id DESC LIMIT ?", (conversation_id, after_id, before_id, limit))
+        return list(reversed(rows))
+
+    def load_all(self, conversation_id):
+        return self.query("SELECT id, sender, content FROM messages WHERE conversation_id = ? ORDER BY id",
+                          (conversation_id,))
+
+    def plan(self, sql, params):
+        with self.lock:
+            return " / ".join(row[-1] for row in self.conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def full_history_tokens(rows, prompt):
+    return (estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt) + 8
+            + sum(estimate_tokens(content) + 4 for _, _, content in rows))
+
+
+def run(turns=300, conversations=20, summary_latency=0.05, seed=5):
+    rng = random.Random(seed)
+    store = Store()
+    writer = MessageWriter(store.insert, flush_rows=50, flush_interval_ms=20)
+    summarize_calls = [0]
+
+    def summarize(previous, new_turns):
+        summarize_calls[0] += 1
+        time.sleep(summary_latency)
+        return (previous + " " + " ".join(content[:20] for _, content in new_turns))[-400:]
+
+    context = ConversationContext(store.load_recent, store.load_between, summarize, writer=writer,
+                                  recent_messages=8, token_budget=1200, summary_tokens=200, fold_every=3)
+    samples = {}  # 턴 → {"full": [...], "bounded": [...], "build_ms": [...], "full_ms": [...]}
+    checkpoints = {1, 10, 50, 100, 200, turns}
+    missing_unsaved = 0
+    for turn in range(1, turns + 1):
+        for conversation_id in range(1, conversations + 1):
+            prompt = f"{rng.choice(QUESTIONS)} ({turn})"
+            writer.append((conversation_id, "user", prompt, 0, None))
+
+            t0 = time.perf_counter()
+            built = context.build(conversation_id, prompt, SYSTEM_PROMPT)
+            build_ms = (time.perf_counter() - t0) * 1000
+            t0 = time.perf_counter()
+            writer.flush()  # 전체 기록 방식은 DB 에 모두 있어야 하므로 비교를 위해 저장 후 조회
+            full = full_history_tokens(store.load_all(conversation_id)[:-1], prompt)
+            full_ms = (time.perf_counter() - t0) * 1000
+
+            # 직전 답변은 아직 저장되지 않았어도 문맥에 있어야 함 (write-behind 버퍼)
+            if turn > 1 and (not built.turns or built.turns[-1][0] != "assistant"):
+                missing_unsaved += 1
+            writer.append((conversation_id, "bot", f"답변 {turn}: " + "상담 내용 " * rng.randint(5, 30), 1, None))
+
+            if turn in checkpoints:
+                s = samples.setdefault(turn, {"full": [], "bounded": [], "build_ms": [], "full_ms": []})
+                s["full"].append(full)
+                s["bounded"].append(built.tokens)
+                s["build_ms"].append(build_ms)
+                s["full_ms"].append(full_ms)
+
+    writer.close()
+    context.close()
+    results = {
+        "turns": turns, "conversations": conversations, "summarize_calls": summarize_calls[0],
+        "missing_unsaved_answer": missing_unsaved, "context_stats": context.stats(),
+        "query_plan": store.plan("SELECT id, sender, content FROM messages WHERE conversation_id = ? "
+                                 "ORDER BY id DESC LIMIT ?", (1, 8)),
+        "by_turn": {
+            turn: {
+                "full_tokens": round(sum(s["full"]) / len(s["full"])),
+                "bounded_tokens": round(sum(s["bounded"]) / len(s["bounded"])),
+                "build_ms": round(sum(s["build_ms"]) / len(s["build_ms"]), 3),
+                "full_history_ms": round(sum(s["full_ms"]) / len(s["full_ms"]), 3),
+            } for turn, s in sorted(samples.items())
+        },
+    }
+
+    print("=" * 60)
+    print(f"대화 {conversations}개 × {turns}턴, 최근 8개 + 요약, 예산 1200토큰")
+    for turn, r in results["by_turn"].items():
+        print(f"  {turn:>4}턴: 전체 기록 {r['full_tokens']:>6}토큰 ({r['full_history_ms']}ms)  →  "
+              f"제한 문맥 {r['bounded_tokens']:>5}토큰 ({r['build_ms']}ms)")
+    print(f"📝 요약 호출 {summarize_calls[0]}회 (질문 {turns * conversations}회), "
+          f"저장 전 답변 누락 {missing_unsaved}회")
+    print(f"🔎 {results['query_plan']}")
+    print("=" * 60)
+    print(json.dumps(results, ensure_ascii=False))
+    return 0 if missing_unsaved == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(*[int(a) for a in sys.argv[1:3]]))
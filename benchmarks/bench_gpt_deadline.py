@@ -0,0 +1,107 @@
+"""GPT 답장 기한: 끝까지 기다린 뒤 답장 vs DeadlineRunner (기한 초과 시 임시 답장 + push)
+
+GPT 지연을 꼬리가 긴 분포(대부분 1~3초, 일부 10~25초)로 흉내 내고, 웹훅 수신부터
+사용자가 첫 응답을 받기까지의 시간과 경로별(reply/ack/push) 횟수를 비교한다.
+실제 시간을 scale 배로 줄여 돌린다 (기본 0.05 → 8초 기한이 0.4초).
+
+    python benchmarks/bench_gpt_deadline.py [이벤트 수] [기한(초)] [scale]
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from deadline_runner import DeadlineRunner
+
+
+def gpt_latencies(n, seed=7):
+    rng = random.Random(seed)
+    return [rng.uniform(10, 25) if rng.random() < 0.1 else rng.uniform(1, 3) for _ in range(n)]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def run_events(latencies, scale, deadline_s, concurrency=64):
+    """deadline_s 가 None 이면 기존 방식 (GPT 가 끝날 때까지 기다린 뒤 답장)"""
+    runner = DeadlineRunner(workers=concurrency, name="bench") if deadline_s is not None else None
+    first_response, answered = [], []
+    paths = {"reply": 0, "ack": 0, "push": 0}
+    lock = threading.Lock()
+    pushed = threading.Semaphore(0)
+
+    def record(kind, received, answer=True):
+        elapsed = (time.monotonic() - received) / scale
+        with lock:
+            paths[kind] += 1
+            if kind != "push":
+                first_response.append(elapsed)
+            if answer:
+                answered.append(elapsed)
+
+    def handle(latency):
+        received = time.monotonic()
+        fn = lambda: time.sleep(latency * scale)
+        if runner is None:
+            fn()
+            return record("reply", received)
+
+        def late(result, error):
+            record("push", received)
+            pushed.release()
+
+        on_time, _ = runner.run(fn, received + deadline_s * scale,
+                                lambda: record("ack", received, answer=False), late)
+        if on_time:
+            record("reply", received)
+
+    threads = []
+    started = time.perf_counter()
+    for latency in latencies:
+        t = threading.Thread(target=handle, args=(latency,))
+        t.start()
+        threads.append(t)
+        time.sleep(0.2 * scale)  # 이벤트 도착 간격 0.2초
+    for t in threads:
+        t.join()
+    for _ in range(paths["ack"]):
+        pushed.acquire()
+    if runner is not None:
+        runner.close()
+    return {
+        "paths": paths,
+        "first_response_p50_s": round(percentile(first_response, 0.5), 2),
+        "first_response_p95_s": round(percentile(first_response, 0.95), 2),
+        "first_response_max_s": round(max(first_response), 2),
+        "answer_p95_s": round(percentile(answered, 0.95), 2),
+        "over_deadline": sum(1 for v in first_response if deadline_s is not None and v > deadline_s + 0.5),
+        "wall_s": round(time.perf_counter() - started, 2),
+    }
+
+
+def run(n_events=200, deadline_s=8.0, scale=0.05):
+    latencies = gpt_latencies(n_events)
+    results = {
+        "wait": run_events(latencies, scale, None),
+        "deadline": run_events(latencies, scale, deadline_s),
+    }
+    print("=" * 60)
+    print(f"이벤트 {n_events}건, GPT 지연 10%가 10~25초, 답장 기한 {deadline_s}초 (시간 ×{scale})")
+    for name, r in results.items():
+        print(f"{'🐢' if name == 'wait' else '🚀'} {name:<8} 첫 응답 p50 {r['first_response_p50_s']}s / "
+              f"p95 {r['first_response_p95_s']}s / 최대 {r['first_response_max_s']}s, "
+              f"답변 p95 {r['answer_p95_s']}s, 경로 {r['paths']}")
+    print("=" * 60)
+    print(json.dumps(results))
+    return 0 if results["deadline"]["over_deadline"] == 0 else 1
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:4]
+    sys.exit(run(*(int(args[0]) if i == 0 else float(a) for i, a in enumerate(args))))
@@ -0,0 +1,109 @@
+"""동시 동일 질문 GPT 호출 병합(single-flight) 부하 테스트
+
+로컬 가짜 OpenAI 서버를 띄우고, 같은 질문(띄어쓰기·문장부호만 다른 변형 포함)을
+여러 스레드에서 동시에 보내 실제 업스트림 호출 수를 센다.
+숫자(용량·체중·나이)만 다른 질문이 같은 캐시 키로 모이지 않는지도 확인한다.
+
+    python benchmarks/bench_gpt_singleflight.py [동시 사용자 수] [지연(초)]
+"""
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fake_servers import FakeOpenAI
+from gpt_cache import cache_key
+from singleflight import SingleFlight
+
+SYSTEM_PROMPT = "너는 친절한 고객 상담 챗봇이야."
+QUESTIONS = ["강아지 예방접종 언제?", "강아지예방접종 언제", "강아지 예방 접종 언제요?", "고양이 사료 추천해줘"]
+# (같은 키여야 하는 쌍, 다른 키여야 하는 쌍)
+SAME_KEY = [("강아지 예방접종 언제?", "강아지예방접종 언제"), ("사료 추천해줘!!", "사료 추천해줘")]
+DIFFERENT_KEY = [("1.5kg 강아지 구충제 몇 알?", "15kg 강아지 구충제 몇 알?"), ("3-4살 고양이 사료", "34살 고양이 사료"),
+                 ("1/2알 먹여도 돼?", "12알 먹여도 돼?"), ("2 3일 설사", "23일 설사")]
+
+
+def call_fake_gpt(base_url, prompt):
+    body = json.dumps({
+        "model": "gpt-3.5-turbo",
+        "messages": [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}],
+        "max_tokens": 300,
+    }).encode("utf-8")
+    req = urllib.request.Request(f"{base_url}/chat/completions", data=body,
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        return json.loads(resp.read())["choices"][0]["message"]["content"]
+
+
+def burst(base_url, n_users, flight, timeout):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    start = threading.Barrier(n_users)
+
+    def user(i):
+        prompt = QUESTIONS[i % len(QUESTIONS)]
+        start.wait()
+        t0 = time.perf_counter()
+        try:
+            if flight is None:
+                call_fake_gpt(base_url, prompt)
+            else:
+                flight.do(cache_key(prompt, SYSTEM_PROMPT), lambda: call_fake_gpt(base_url, prompt), timeout=timeout)
+        except Exception as e:
+            errors.append(e)
+        with lock:
+            latencies.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(n_users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors
+
+
+def check_keys():
+    """키가 잘못 모이거나 갈라지는 질문 쌍"""
+    return ([pair for pair in SAME_KEY if cache_key(pair[0], SYSTEM_PROMPT) != cache_key(pair[1], SYSTEM_PROMPT)]
+            + [pair for pair in DIFFERENT_KEY if cache_key(pair[0], SYSTEM_PROMPT) == cache_key(pair[1], SYSTEM_PROMPT)])
+
+
+def run(n_users=100, latency=0.5):
+    wrong_keys = check_keys()
+    fake = FakeOpenAI(latency=latency).start()
+    try:
+        results = {}
+        for label, flight in (("without", None), ("with", SingleFlight())):
+            before = fake.calls
+            latencies, errors = burst(fake.base_url, n_users, flight, timeout=latency * 10)
+            results[label] = {
+                "requests": n_users,
+                "upstream_calls": fake.calls - before,
+                "errors": len(errors),
+                "max_latency_s": round(max(latencies), 3),
+            }
+            if flight is not None:
+                results[label].update(flight.stats())
+    finally:
+        fake.stop()
+
+    print("=" * 60)
+    for label, r in results.items():
+        print(f"{label:>8} single-flight: {r}")
+    avoided = results["without"]["upstream_calls"] - results["with"]["upstream_calls"]
+    print(f"🚀 업스트림 호출 {avoided}건 절감 ({n_users}명 동시 요청, 질문 변형 {len(QUESTIONS)}종)")
+    print(f"🔑 캐시 키 확인: {'✅' if not wrong_keys else f'❌ {wrong_keys}'}")
+    print("=" * 60)
+    results["wrong_keys"] = wrong_keys
+    print(json.dumps(results, ensure_ascii=False))
+    return 0 if results["with"]["upstream_calls"] <= 2 * len(QUESTIONS) and not wrong_keys else 1
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    lat = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    sys.exit(run(n, lat))
@@ -0,0 +1,83 @@
+"""이벤트당 ID 조회 DB 구문 수 비교 (캐시 전 / 후)
+
+기존: INSERT…ON DUPLICATE KEY UPDATE + SELECT users.id + SELECT conversations (+ 최초 INSERT)
+캐시: 최초 1회만 DB 조회, 이후 last_seen 은 주기적인 일괄 UPDATE 한 번
+
+    python benchmarks/bench_identity_cache.py [이벤트 수] [사용자 수]
+"""
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from identity_cache import IdentityCache
+
+
+class CountingDB:
+    """구문 수만 세는 가짜 DB (users / conversations 를 dict 로 흉내)"""
+
+    def __init__(self):
+        self.statements = 0
+        self.users = {}
+        self.conversations = {}
+
+    # 기존 방식
+    def legacy_upsert_user(self, line_user_id):
+        self.statements += 2  # INSERT … ON DUPLICATE KEY UPDATE, SELECT id
+        return self.users.setdefault(line_user_id, len(self.users) + 1)
+
+    def legacy_conversation(self, user_id):
+        self.statements += 1  # SELECT 열린 대화
+        if user_id not in self.conversations:
+            self.statements += 1  # INSERT
+            self.conversations[user_id] = len(self.conversations) + 1
+        return self.conversations[user_id]
+
+    # 캐시 방식에서 쓰는 로더
+    def load_user_id(self, line_user_id):
+        self.statements += 1  # INSERT … ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)
+        return self.users.setdefault(line_user_id, len(self.users) + 1)
+
+    def update_last_seen(self, line_user_ids):
+        self.statements += 1  # UPDATE … WHERE line_user_id IN (…)
+
+
+def run(n_events=10000, n_users=500, seed=7, flushes=10):
+    rng = random.Random(seed)
+    events = [f"U{rng.randrange(n_users):032d}" for _ in range(n_events)]
+
+    legacy = CountingDB()
+    for line_user_id in events:
+        legacy.legacy_conversation(legacy.legacy_upsert_user(line_user_id))
+
+    cached_db = CountingDB()
+    cache = IdentityCache(max_entries=n_users * 2, flush_last_seen=None)
+    cache._flush_last_seen = cached_db.update_last_seen  # 스레드 없이 수동 flush
+    flush_every = max(1, n_events // flushes)
+    for i, line_user_id in enumerate(events, 1):
+        user_id = cache.user_id(line_user_id, cached_db.load_user_id)
+        cache.conversation_id(user_id, cached_db.legacy_conversation)
+        if i % flush_every == 0:
+            cache.flush()
+    cache.flush()
+
+    result = {
+        "events": n_events,
+        "users": n_users,
+        "legacy_statements_per_event": round(legacy.statements / n_events, 3),
+        "cached_statements_per_event": round(cached_db.statements / n_events, 3),
+        "cache": cache.stats(),
+    }
+    print("=" * 60)
+    print(f"🐢 기존: 이벤트당 {result['legacy_statements_per_event']} 구문")
+    print(f"🚀 캐시: 이벤트당 {result['cached_statements_per_event']} 구문")
+    print("=" * 60)
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(run(*args))
@@ -0,0 +1,110 @@
+"""LINE 답장 호출 지연/실패율: linebot 기본 전송 (호출마다 requests.post) vs LineSession (keep-alive 풀 + 재시도)
+
+가짜 LINE 서버는 새 연결마다 connect_latency(TLS 핸드셰이크 흉내)를 더하고,
+error_rate 비율만큼 429/503 을 돌려준다.
+
+    python benchmarks/bench_line_http.py [스레드 수] [스레드당 호출 수]
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+import requests
+
+from fake_servers import FakeLINE
+from line_http import LineSession
+
+HEADERS = {"Authorization": "Bearer bench-token", "Content-Type": "application/json"}
+
+
+def body(i):
+    return json.dumps({"replyToken": f"token-{i}", "messages": [{"type": "text", "text": "안녕하세요 😊"}]},
+                      ensure_ascii=False).encode("utf-8")
+
+
+def burst(post, threads, per_thread):
+    """threads 개 스레드가 동시에 per_thread 번씩 호출 → (지연 목록, 실패 수, 경과 초)"""
+    latencies, failures = [], [0]
+    lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def worker(t):
+        start.wait()
+        for j in range(per_thread):
+            t0 = time.perf_counter()
+            try:
+                ok = post(body(t * per_thread + j)).status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - t0
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    failures[0] += 1
+
+    t0 = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return latencies, failures[0], time.perf_counter() - t0
+
+
+def summary(latencies, failures, elapsed, connections):
+    values = sorted(latencies)
+
+    def pick(p):
+        return round(values[min(len(values) - 1, int(p / 100 * len(values)))] * 1000, 2)
+
+    return {"calls": len(values), "p50_ms": pick(50), "p95_ms": pick(95), "p99_ms": pick(99),
+            "failure_rate": round(failures / len(values), 4), "connections": connections,
+            "throughput": round(len(values) / elapsed, 1)}
+
+
+def run(threads=16, per_thread=50, latency=0.01, connect_latency=0.05, error_rate=0.05):
+    results = {}
+    for name in ("legacy", "pooled"):
+        server = FakeLINE(latency=latency, connect_latency=connect_latency, error_rate=error_rate).start()
+        url = f"{server.url}/v2/bot/message/reply"
+        session = None
+        if name == "legacy":
+            # linebot RequestsHttpClient.post 와 같음: 모듈 함수 requests.post → 매번 새 연결, 재시도 없음
+            def post(data):
+                return requests.post(url, headers=HEADERS, data=data, timeout=5)
+        else:
+            session = LineSession(pool_size=threads, read_timeout=5, deadline=5, backoff_base=0.05, backoff_max=0.5)
+
+            def post(data):
+                return session.post(url, headers=HEADERS, data=data, timeout=5)
+
+        latencies, failures, elapsed = burst(post, threads, per_thread)
+        results[name] = summary(latencies, failures, elapsed, server.connections)
+        if session is not None:
+            results[name]["session"] = session.stats()
+            session.close()
+        server.stop()
+
+    legacy, pooled = results["legacy"], results["pooled"]
+    print("=" * 60)
+    print(f"동시 {threads}스레드 × {per_thread}회, 서버 지연 {latency * 1000:.0f}ms, "
+          f"새 연결 +{connect_latency * 1000:.0f}ms, 429/503 {error_rate:.0%}")
+    for name, r in results.items():
+        print(f"{'🐢' if name == 'legacy' else '🚀'} {name:<7} p50 {r['p50_ms']}ms / p95 {r['p95_ms']}ms / "
+              f"p99 {r['p99_ms']}ms / 실패 {r['failure_rate']:.1%} / 연결 {r['connections']}")
+    s = pooled["session"]
+    print(f"   재시도 {s['retries']}회 (429 {s['retry_429']}, 5xx {s['retry_5xx']}), 연결 재사용률 {s['connection_reuse_ratio']:.1%}")
+    print("=" * 60)
+    print(json.dumps(results))
+    return 0
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(run(*args))
@@ -0,0 +1,110 @@
+"""Rich Menu 이미지 variant 일괄 렌더링: 기존 방식(한 장씩, 폰트/이모지 매번 새로) vs 프로세스 풀 + 캐시, 그리고 변경 없는 재실행
+
+rich_menus/premium.json 을 extends 하는 variant 스펙(색만 다름)을 임시 폴더에 만들어 렌더링한다.
+폰트는 스펙의 Windows 경로가 없으면 PIL 기본 폰트가 쓰이므로, 실제 비용을 보려면 폰트 경로를 넘긴다.
+
+    python benchmarks/bench_render.py [variant 수] [프로세스 수] [텍스트 폰트.ttf] [이모지 폰트.ttf]
+"""
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, ROOT)
+
+import rich_menu_render
+from rich_menu_render import load_spec, render_file
+
+PALETTE = ["#667EEA", "#764BA2", "#F093FB", "#4FACFE", "#00F2FE", "#43E97B", "#C0392B", "#1E8449", "#F39C12"]
+
+
+def load_cli():
+    # 파일 이름이 숫자로 시작해 import 문으로는 불러올 수 없음
+    spec = importlib.util.spec_from_file_location("image_creator", os.path.join(ROOT, "1_image_creator_premium.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_variants(workdir, count, text_font=None, emoji_font=None):
+    base = os.path.join(workdir, "base.json")
+    shutil.copy(os.path.join(ROOT, "rich_menus", "premium.json"), base)
+    with open(base, encoding="utf-8") as f:
+        cells = json.load(f)["cells"]
+    fonts = {}
+    if text_font:
+        fonts["text"] = {"paths": [text_font]}
+    if emoji_font:
+        fonts["emoji"] = {"paths": [emoji_font]}
+    paths = []
+    for i in range(count):
+        variant = {
+            "extends": "base.json",
+            "name": f"variant_{i:03d}",
+            "output": os.path.join(workdir, "out", f"variant_{i:03d}.png"),
+            "fonts": fonts,
+            "cells": [dict(cell, color=PALETTE[(i + j) % len(PALETTE)]) for j, cell in enumerate(cells)],
+        }
+        path = os.path.join(workdir, f"variant_{i:03d}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(variant, f, ensure_ascii=False)
+        paths.append(path)
+    return paths
+
+
+def run(count=24, jobs=4, text_font=None, emoji_font=None):
+    workdir = tempfile.mkdtemp(prefix="petbot-render-")
+    paths = write_variants(workdir, count, text_font, emoji_font)
+    cli = load_cli()
+    manifest = os.path.join(workdir, "manifest.json")
+
+    # 기존 방식: 한 프로세스에서 한 장씩, 매번 폰트를 열고 이모지를 새로 그림
+    started = time.perf_counter()
+    for path in paths:
+        rich_menu_render.load_font.cache_clear()
+        rich_menu_render.emoji_tile.cache_clear()
+        render_file(load_spec(path))
+    legacy = time.perf_counter() - started
+
+    # 한 프로세스 + 캐시
+    rich_menu_render.load_font.cache_clear()
+    rich_menu_render.emoji_tile.cache_clear()
+    started = time.perf_counter()
+    for path in paths:
+        render_file(load_spec(path))
+    cached = time.perf_counter() - started
+
+    # CLI: 프로세스 풀 + 캐시 → 같은 스펙으로 다시 실행 (전부 건너뜀)
+    started = time.perf_counter()
+    cli.main(paths + ["-j", str(jobs), "--manifest", manifest, "--force"])
+    pooled = time.perf_counter() - started
+    started = time.perf_counter()
+    cli.main(paths + ["-j", str(jobs), "--manifest", manifest])
+    unchanged = time.perf_counter() - started
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    results = {
+        "variants": count, "jobs": jobs,
+        "legacy_s": round(legacy, 3), "cached_s": round(cached, 3),
+        "pooled_s": round(pooled, 3), "unchanged_rerun_s": round(unchanged, 3),
+    }
+    print("=" * 60)
+    print(f"variant {count}개 (텍스트 폰트 {text_font or '스펙 기본'}, 이모지 폰트 {emoji_font or '스펙 기본'})")
+    print(f"🐢 한 장씩, 캐시 없음       {legacy:.2f}s ({legacy / count * 1000:.0f}ms/장)")
+    print(f"🧠 한 장씩, 폰트/이모지 캐시 {cached:.2f}s ({cached / count * 1000:.0f}ms/장)")
+    print(f"🚀 프로세스 {jobs}개 + 캐시     {pooled:.2f}s")
+    print(f"⏭️ 변경 없이 재실행         {unchanged:.2f}s")
+    print("=" * 60)
+    print(json.dumps(results))
+    return 0
+
+
+if __name__ == "__main__":
+    numbers = [int(a) for a in sys.argv[1:3]]
+    fonts = sys.argv[3:5]
+    sys.exit(run(*numbers, *fonts) if len(numbers) == 2 else run(*numbers))
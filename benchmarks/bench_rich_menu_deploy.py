@@ -0,0 +1,79 @@
+"""Rich Menu 배포 반복: 기존 방식(매번 생성 + 업로드 + 기본 설정) vs rich_menu_deploy.deploy (해시로 재사용)
+
+가짜 LINE 서버(FakeRichMenus)에 같은 스펙을 여러 번 배포하고, change_every 번마다 색을 바꿔 새 정의를 만든다.
+API 호출 수, 업로드한 바이트, 채널에 남은 메뉴 수(LINE 은 채널당 1000개 제한)를 비교한다.
+
+    python benchmarks/bench_rich_menu_deploy.py [배포 횟수] [몇 번마다 스펙 변경]
+"""
+import copy
+import json
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, HERE)
+sys.path.insert(0, ROOT)
+
+from fake_servers import FakeLINE
+from line_http import LineSession
+from rich_menu_deploy import RichMenuAPI, deploy, menu_definition
+from rich_menu_render import load_spec, render_encoded
+
+PALETTE = ["#667EEA", "#C0392B", "#1E8449", "#F39C12"]
+
+
+def spec_for(base, version):
+    spec = copy.deepcopy(base)
+    spec["cells"][0]["color"] = PALETTE[version % len(PALETTE)]
+    return spec
+
+
+def legacy_deploy(api, spec):
+    """기존 2_create_rich_menu_premium.py 흐름"""
+    encoded, _ = render_encoded(spec)
+    menu_id = api.create(menu_definition(spec))
+    api.upload_image(menu_id, encoded)
+    api.set_default(menu_id)
+    return len(encoded.data)
+
+
+def run(deploys=20, change_every=5, latency=0.02):
+    base = load_spec(os.path.join(ROOT, "rich_menus", "premium.json"))
+    results = {}
+    for name in ("legacy", "deploy"):
+        line = FakeLINE(latency=latency).start()
+        session = LineSession()
+        api = RichMenuAPI(session, "bench-token", line.url, line.url)
+        uploaded = 0
+        started = time.perf_counter()
+        for i in range(deploys):
+            spec = spec_for(base, i // change_every)
+            if name == "legacy":
+                uploaded += legacy_deploy(api, spec)
+            else:
+                report = deploy(api, spec, log=lambda *a: None)
+                uploaded += report.get("image", {}).get("bytes", 0) if report["uploaded"] else 0
+        elapsed = time.perf_counter() - started
+        menus = line.rich_menus
+        results[name] = {
+            "deploys": deploys, "seconds": round(elapsed, 3), "api_calls": menus.call_count(),
+            "writes": menus.call_count("POST") + menus.call_count("DELETE"),
+            "uploaded_kb": round(uploaded / 1024, 1), "menus_left": len(menus.menus),
+        }
+        session.close()
+        line.stop()
+
+    print("=" * 60)
+    print(f"배포 {deploys}번, {change_every}번마다 스펙 변경, API 지연 {latency * 1000:.0f}ms")
+    for name, r in results.items():
+        print(f"{'🐢' if name == 'legacy' else '🚀'} {name:<6} {r['seconds']}s / API {r['api_calls']}회 (쓰기 {r['writes']}) / "
+              f"업로드 {r['uploaded_kb']}KB / 남은 메뉴 {r['menus_left']}개")
+    print("=" * 60)
+    print(json.dumps(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(*[int(a) for a in sys.argv[1:3]]))
@@ -0,0 +1,168 @@
+"""세그먼트 Rich Menu 연결: 사용자별 link vs bulk link (토큰 버킷 有/無) + 중단 후 이어서 연결 (로컬 sqlite3 + 가짜 LINE)
+
+sqlite3 에 users / consultations 를 만들고 corporate 세그먼트를 rich_menu_link 로 읽어 FakeRichMenus 에 연결한다.
+가짜 서버의 bulk link 는 초당 rate_limit 회를 넘으면 429 를 돌려준다.
+
+    python benchmarks/bench_rich_menu_link.py [사용자 수] [bulk link 초당 한도]
+"""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, HERE)
+sys.path.insert(0, ROOT)
+
+from fake_servers import FakeLINE
+from line_http import LineSession
+from rich_menu_deploy import RichMenuAPI, deploy
+from rich_menu_link import Checkpoint, link_batches, rebatch, segment_signature, stream_users
+from rich_menu_render import load_spec
+from token_bucket import TokenBucket
+
+BULK_ROUTE = "POST /v2/bot/richmenu/bulk/link"
+PER_USER_SAMPLE = 300  # 사용자별 link 는 이만큼만 보내고 나머지는 비례 추정
+MARGIN = 0.9  # 버킷 속도 = 한도 × MARGIN (요청이 서버에 닿는 시각이 흔들려도 1초 창을 넘지 않게)
+
+
+class QmarkCursor:
+    """MySQL 용 %s 쿼리를 sqlite3 에 그대로 넘기기 위한 커서"""
+
+    def __init__(self, conn):
+        self._cursor = conn.cursor()
+
+    def execute(self, query, params=()):
+        self._cursor.execute(query.replace("%s", "?"), params)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+
+def setup(n_users, corporate_every=4):
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.executescript("""
+        CREATE TABLE users (id INTEGER PRIMARY KEY, line_user_id TEXT NOT NULL);
+        CREATE TABLE consultations (id INTEGER PRIMARY KEY, user_id INTEGER, member_type TEXT, status TEXT);
+        CREATE INDEX idx_consultations_user ON consultations (user_id);
+    """)
+    conn.executemany("INSERT INTO users VALUES (?, ?)", ((i, f"U{i:032x}") for i in range(1, n_users + 1)))
+    conn.executemany(
+        "INSERT INTO consultations (user_id, member_type, status) VALUES (?, ?, ?)",
+        ((i, "corporate" if i % corporate_every == 0 else "personal", "pending" if i % 7 == 0 else "done")
+         for i in range(1, n_users + 1)),
+    )
+    return conn
+
+
+def segment_users(conn, segment="corporate"):
+    return [line_user_id for chunk in stream_users(QmarkCursor(conn), segment) for _, line_user_id in chunk]
+
+
+def fresh_line(rate_limit):
+    line = FakeLINE(latency=0.01).start()
+    line.rich_menus.rate_limits = {BULK_ROUTE: rate_limit}
+    session = LineSession(pool_size=4, deadline=5)
+    api = RichMenuAPI(session, "bench-token", line.url, line.url)
+    menu_id = deploy(api, load_spec(os.path.join(ROOT, "rich_menus", "corporate.json")),
+                     set_default=False, log=lambda *a: None)["menu_id"]
+    return line, session, api, menu_id
+
+
+def run_per_user(conn, rate_limit):
+    users = segment_users(conn)
+    line, session, api, menu_id = fresh_line(rate_limit)
+    started = time.perf_counter()
+    for user_id in users[:PER_USER_SAMPLE]:
+        api.link(user_id, menu_id)
+    elapsed = time.perf_counter() - started
+    result = {"users": len(users), "requests": len(users),
+              "seconds_estimated": round(elapsed * len(users) / min(len(users), PER_USER_SAMPLE), 2)}
+    session.close()
+    line.stop()
+    return result
+
+
+def run_bulk(conn, rate_limit, rate):
+    line, session, api, menu_id = fresh_line(rate_limit)
+    bucket = TokenBucket(rate, burst=1) if rate else TokenBucket(1e9)
+    batches = rebatch(stream_users(QmarkCursor(conn), "corporate"))
+    report = link_batches(lambda ids: api.bulk_link(menu_id, ids), batches, bucket, concurrency=2, log=lambda *a: None)
+    stats = session.stats()
+    result = {"linked": report["linked"], "done": report["done"], "seconds": report["elapsed_s"],
+              "requests": stats["attempts"], "throttled": line.rich_menus.throttled.get(BULK_ROUTE, 0),
+              "retries": stats["retries"], "linked_in_fake": len(line.rich_menus.links),
+              "failed": report["failed"]}
+    session.close()
+    line.stop()
+    return result
+
+
+def run_resume(conn, rate_limit, fail_after=3):
+    """fail_after 번째 요청에서 실패시킨 뒤 같은 체크포인트로 다시 실행, 완료 후 세그먼트에 사용자가 추가되면 변경 감지"""
+    line, session, api, menu_id = fresh_line(rate_limit)
+    path = os.path.join(tempfile.mkdtemp(), "checkpoint.json")
+    checkpoint = Checkpoint(path, "corporate", menu_id)
+    sent = [0]
+
+    def flaky_link(ids):
+        sent[0] += 1
+        if sent[0] == fail_after:
+            raise RuntimeError("주입된 실패")
+        api.bulk_link(menu_id, ids)
+
+    signature = segment_signature(QmarkCursor(conn), "corporate")
+    first = link_batches(flaky_link, rebatch(stream_users(QmarkCursor(conn), "corporate")),
+                         TokenBucket(rate_limit * MARGIN, burst=1), checkpoint=checkpoint, signature=signature,
+                         log=lambda *a: None)
+    start = checkpoint.load()
+    second = link_batches(lambda ids: api.bulk_link(menu_id, ids),
+                          rebatch(stream_users(QmarkCursor(conn), "corporate", start["last_user_id"])),
+                          TokenBucket(rate_limit * MARGIN, burst=1), checkpoint=checkpoint, start=start,
+                          signature=start["signature"], log=lambda *a: None)
+    expected = set(segment_users(conn))
+    done = checkpoint.load()
+
+    # 완료 후 기존 사용자가 corporate 상담을 새로 신청 → 체크포인트의 signature 와 달라져야 함
+    conn.execute("INSERT INTO consultations (user_id, member_type, status) VALUES (1, 'corporate', 'done')")
+    changed = done["signature"] != segment_signature(QmarkCursor(conn), "corporate")
+    conn.execute("DELETE FROM consultations WHERE id = (SELECT MAX(id) FROM consultations)")
+    result = {"first_done": first["done"], "resumed_from_user_id": start["last_user_id"],
+              "resumed_linked": second["linked"], "total_linked": second["total_linked"],
+              "all_linked": expected <= set(line.rich_menus.links), "segment_users": len(expected),
+              "checkpoint_done": done["done"], "unchanged_skips": done["signature"] == signature,
+              "change_detected": changed}
+    session.close()
+    line.stop()
+    return result
+
+
+def run(n_users=20000, rate_limit=3):
+    conn = setup(n_users)
+    results = {
+        "per_user": run_per_user(conn, rate_limit),
+        "bulk_no_bucket": run_bulk(conn, rate_limit, None),
+        "bulk_bucket": run_bulk(conn, rate_limit, rate_limit * MARGIN),
+        "resume": run_resume(conn, rate_limit),
+    }
+
+    per_user, loose, paced, resume = (results[k] for k in ("per_user", "bulk_no_bucket", "bulk_bucket", "resume"))
+    print("=" * 60)
+    print(f"사용자 {n_users}명 중 corporate {per_user['users']}명, bulk link 초당 한도 {rate_limit}회")
+    print(f"🐢 사용자별 link : 요청 {per_user['requests']}회, 약 {per_user['seconds_estimated']}s (추정)")
+    for name, r in (("bulk (버킷 없음)", loose), ("bulk + 버킷", paced)):
+        print(f"{'⚠️' if r['throttled'] else '🚀'} {name:<14}: 요청 {r['requests']}회, 429 {r['throttled']}회, "
+              f"{r['seconds']}s, 연결 {r['linked_in_fake']}명" + (f" - 실패: {r['failed']}" if r["failed"] else ""))
+    print(f"⏯️ 중단 후 재실행 : users.id > {resume['resumed_from_user_id']} 부터 {resume['resumed_linked']}명 추가, "
+          f"누적 {resume['total_linked']}명, 전원 연결 {'✅' if resume['all_linked'] else '❌'}")
+    print(f"🔄 완료 후 세그먼트 변경 감지 : {'✅' if resume['change_detected'] and resume['unchanged_skips'] else '❌'}")
+    print("=" * 60)
+    print(json.dumps(results, ensure_ascii=False))
+    return 0 if paced["done"] and resume["all_linked"] and resume["change_detected"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run(*[int(a) for a in sys.argv[1:3]]))
@@ -0,0 +1,166 @@
+"""콜드 스타트 측정: STARTUP_MODE (eager / background / lazy) 별 import 시간과 첫 응답까지의 시간
+
+- import: `python -X importtime` 으로 3_app_complete.py 를 불러올 때 최상위 import 별 누적 시간
+- 기동: 프로세스 시작 → READY(요청 받을 준비) → /ready 200 → 첫 웹훅의 답장이 가짜 LINE 서버에 도착
+
+LINE / OpenAI 는 fake_servers 의 가짜 서버, DB 는 loadtest.py 와 같은 전용 MySQL (LOADTEST_DB_* 환경변수).
+MySQL 에 접속할 수 없으면 DB 를 건드리지 않는 lazy 모드의 import / READY 만 잰다.
+
+    LOADTEST_DB_PASSWORD=loadtest python benchmarks/bench_startup.py [반복 횟수]
+"""
+import csv
+import http.client
+import json
+import os
+import re
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from fake_servers import FakeLINE, FakeOpenAI
+from loadtest import ROOT, db_config, prepare_db, start_app, stop_app
+from webhook_payloads import PATTERNS, sign, text_event, webhook_body
+
+MODES = ("eager", "background", "lazy")
+# import time:       123 |       4567 |   module  (이름 앞 공백 = import 깊이)
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+_IMPORT_APP = "import sys; sys.path.insert(0, 'benchmarks'); import loadtest_app; loadtest_app.load_app()"
+
+
+def import_times(env, top=8):
+    """최상위 import 별 누적 시간(ms), 많이 걸린 순 (앱 모듈이 import 한 것도 exec_module 안이라 최상위로 잡힘)"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _IMPORT_APP],
+                          cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    modules = {}
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME.match(line)
+        if m and len(m.group(3)) == 1:
+            modules[m.group(4)] = int(m.group(2)) / 1000
+    ranked = sorted(modules.items(), key=lambda kv: kv[1], reverse=True)
+    return {name: round(ms, 1) for name, ms in ranked[:top]}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def http_get(port, path):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def wait_until(check, timeout=30, interval=0.005):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if check():
+            return time.monotonic()
+        time.sleep(interval)
+    return None
+
+
+def cold_start(mode, env, port, secret, line, workdir, with_db):
+    """(READY, /ready 200, 첫 답장) 까지의 ms"""
+    env = dict(env, STARTUP_MODE=mode)
+    spawned = time.monotonic()
+    proc = start_app(port, env, os.path.join(workdir, f"app-{mode}.log"))
+    result = {"ready_ms": round((time.monotonic() - spawned) * 1000, 1)}
+    try:
+        def is_ready():
+            try:
+                return http_get(port, "/ready")[0] == 200
+            except OSError:
+                return False
+
+        at = wait_until(is_ready)
+        result["ready_200_ms"] = round((at - spawned) * 1000, 1) if at else None
+        if with_db:
+            event = text_event(f"Ustartup{secrets.token_hex(12)}", PATTERNS[0][0].split("|")[0])
+            body = webhook_body([event])
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            conn.request("POST", "/webhook", body=body,
+                         headers={"Content-Type": "application/json", "X-Line-Signature": sign(body, secret)})
+            conn.getresponse().read()
+            conn.close()
+            at = wait_until(lambda: event["replyToken"] in line.replies)
+            result["first_reply_ms"] = round((at - spawned) * 1000, 1) if at else None
+    finally:
+        stop_app(proc)
+    return result
+
+
+def run(repeat=3):
+    cfg = db_config()
+    try:
+        prepare_db(cfg)
+        with_db = True
+    except Exception as e:
+        print(f"⚠️ MySQL 접속 실패 ({type(e).__name__}: {e}) - lazy 모드의 import / READY 만 측정")
+        with_db = False
+
+    workdir = tempfile.mkdtemp(prefix="petbot-startup-")
+    patterns_path = os.path.join(workdir, "patterns.csv")
+    with open(patterns_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["pattern", "response"])
+        writer.writerows(PATTERNS)
+
+    line = FakeLINE(latency=0.005).start()
+    openai = FakeOpenAI(latency=0.05).start()
+    secret = secrets.token_hex(16)
+    env = dict(os.environ)
+    env.update({
+        "LINE_CHANNEL_ACCESS_TOKEN": "startup-token",
+        "LINE_CHANNEL_SECRET": secret,
+        "LINE_API_ENDPOINT": line.url,
+        "OPENAI_API_KEY": "sk-startup",
+        "OPENAI_BASE_URL": openai.base_url,
+        "DB_HOST": cfg["host"], "DB_PORT": str(cfg["port"]), "DB_NAME": cfg["database"],
+        # DB 없이 재는 lazy 모드도 앱의 환경변수 검사는 통과해야 함
+        "DB_USER": cfg["user"], "DB_PASSWORD": cfg["password"] or "unused",
+        "PATTERNS_PATH": patterns_path,
+        "PATTERN_RELOAD_INTERVAL": "0",
+        "MESSAGE_JOURNAL_PATH": os.path.join(workdir, "message_journal.jsonl"),
+        "STATS_RECONCILE_INTERVAL": "3600",
+    })
+
+    modes = MODES if with_db else ("lazy",)
+    results = {}
+    try:
+        for mode in modes:
+            runs = [cold_start(mode, env, free_port(), secret, line, workdir, with_db) for _ in range(repeat)]
+            summary = {key: sorted(r[key] for r in runs if r.get(key) is not None) for key in runs[0]}
+            results[mode] = {
+                "imports_ms": import_times(dict(env, STARTUP_MODE=mode)),
+                **{key: values[len(values) // 2] if values else None for key, values in summary.items()},
+            }
+    finally:
+        line.stop()
+        openai.stop()
+
+    print("=" * 60)
+    for mode, r in results.items():
+        timings = " / ".join(f"{key} {r[key]}" for key in ("ready_ms", "ready_200_ms", "first_reply_ms") if key in r)
+        print(f"🚀 {mode:<10} {timings}")
+        print("   " + ", ".join(f"{name} {ms}ms" for name, ms in r["imports_ms"].items()))
+    print("=" * 60)
+    print(json.dumps(results, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(*[int(a) for a in sys.argv[1:2]]))
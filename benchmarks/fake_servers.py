@@ -0,0 +1,318 @@
+"""벤치마크/오프라인 실행용 로컬 가짜 서버
+
+실제 OpenAI / LINE Messaging API 대신 응답 지연을 조절할 수 있는 엔드포인트를 띄운다.
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # 동시 접속 폭주 시 연결 거부가 나지 않도록
+
+
+class _FakeServer:
+    def __init__(self, handler_cls, port=0):
+        self.calls = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(handler_cls):
+            fake = server
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = _HTTPServer(("127.0.0.1", port), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self):
+        with self._lock:
+            self.calls += 1
+            return self.calls
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _OpenAIHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        n = self.fake.count()
+        time.sleep(self.fake.latency)
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        payload = {
+            "id": f"chatcmpl-fake-{n}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": f"[fake] {prompt[:50]} 에 대한 답변입니다."},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeOpenAI(_FakeServer):
+    """POST /v1/chat/completions - latency 초 후에 고정 형식의 답변을 돌려준다."""
+
+    def __init__(self, latency=0.5, port=0):
+        self.latency = latency
+        super().__init__(_OpenAIHandler, port)
+
+    @property
+    def base_url(self):
+        return f"{self.url}/v1"
+
+
+class _LINEHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (실제 API 처럼 연결 재사용 가능)
+    disable_nagle_algorithm = True  # 헤더/본문을 나눠 보낼 때 delayed ACK 로 40ms 씩 늘어나지 않도록
+    wbufsize = -1  # 응답 전체를 모아서 한 번에 전송
+
+    def setup(self):
+        super().setup()
+        # 새 연결마다 TLS 핸드셰이크 비용을 흉내
+        self.fake.connected()
+        if self.fake.connect_latency:
+            time.sleep(self.fake.connect_latency)
+
+    def _send(self, status, data, headers=(), content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method):
+        received = time.monotonic()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        n = self.fake.count()
+        time.sleep(self.fake.latency)
+        error = self.fake.inject_error()
+        if error == 429:
+            headers = [("Retry-After", str(self.fake.retry_after))] if self.fake.retry_after is not None else []
+            return self._send(429, b'{"message":"Too Many Requests"}', headers)
+        if error:
+            return self._send(error, b'{"message":"Service Unavailable"}')
+        if method == "POST" and self.path == "/v2/bot/message/reply":
+            try:
+                token = json.loads(body).get("replyToken")
+            except ValueError:
+                token = None
+            self.fake.record_reply(token, received)
+        status, data, content_type = self.fake.rich_menus.handle(method, self.path, self.headers, body)
+        self._send(status, data, [("X-Line-Request-Id", f"fake-{n}")], content_type)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+def _json(status, payload):
+    return status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json"
+
+
+class FakeRichMenus:
+    """Rich Menu API 흉내 (메뉴 생성/목록/이미지/기본 메뉴/삭제/사용자 연결)
+
+    실제 API 처럼 이미지는 메뉴당 한 번만 올릴 수 있고 1MB 를 넘으면 거부한다.
+    calls 에 (method, 경로 패턴) 별 호출 수를 남긴다. 그 밖의 경로는 200 {} (메시지 API 등).
+    rate_limits 에 {"METHOD 경로 패턴": 초당 허용 수} 를 주면 1초 창을 넘는 요청은 429 (throttled 에 기록).
+    """
+
+    MAX_IMAGE_BYTES = 1024 * 1024
+    BULK_LINK_MAX = 500
+
+    def __init__(self, rate_limits=None):
+        self._lock = threading.Lock()
+        self.rate_limits = dict(rate_limits or {})
+        self.throttled = {}
+        self._windows = {}  # 경로 패턴 → (창 시작 시각, 창 안의 요청 수)
+        self.menus = {}  # richMenuId → 메뉴 정의
+        self.images = {}  # richMenuId → (content type, bytes)
+        self.default = None
+        self.links = {}  # userId → richMenuId
+        self.calls = {}
+        self._next = 0
+        self._routes = [
+            ("GET", "/v2/bot/richmenu/list", self._list),
+            ("POST", "/v2/bot/richmenu", self._create),
+            ("POST", "/v2/bot/richmenu/bulk/link", self._bulk_link),
+            ("POST", "/v2/bot/richmenu/{id}/content", self._upload),
+            ("GET", "/v2/bot/richmenu/{id}/content", self._download),
+            ("DELETE", "/v2/bot/richmenu/{id}", self._delete),
+            ("GET", "/v2/bot/user/all/richmenu", self._get_default),
+            ("POST", "/v2/bot/user/all/richmenu/{id}", self._set_default),
+            ("POST", "/v2/bot/user/{id}/richmenu/{id}", self._link),
+        ]
+        self._routes = [(method, template, re.compile("^" + template.replace("{id}", r"([\w-]+)") + "$"), fn)
+                        for method, template, fn in self._routes]
+
+    def handle(self, method, path, headers, body):
+        path = path.split("?", 1)[0]
+        for route_method, template, pattern, fn in self._routes:
+            m = pattern.match(path)
+            if m and route_method == method:
+                key = f"{method} {template}"
+                with self._lock:
+                    self.calls[key] = self.calls.get(key, 0) + 1
+                    if self._over_limit(key):
+                        self.throttled[key] = self.throttled.get(key, 0) + 1
+                        return _json(429, {"message": "Too Many Requests"})
+                    return fn(headers, body, *m.groups())
+        return _json(200, {})
+
+    def _over_limit(self, key) -> bool:
+        limit = self.rate_limits.get(key)
+        if limit is None:
+            return False
+        now = time.monotonic()
+        started, count = self._windows.get(key, (now, 0))
+        if now - started >= 1.0:
+            started, count = now, 0
+        self._windows[key] = (started, count + 1)
+        return count >= limit
+
+    def call_count(self, method=None):
+        with self._lock:
+            return sum(n for key, n in self.calls.items() if method is None or key.startswith(method + " "))
+
+    def _list(self, headers, body):
+        return _json(200, {"richmenus": [dict(menu, richMenuId=menu_id) for menu_id, menu in self.menus.items()]})
+
+    def _create(self, headers, body):
+        menu = json.loads(body)
+        if len(menu.get("name", "")) > 300 or not 1 <= len(menu.get("areas", [])) <= 20:
+            return _json(400, {"message": "The request body has 1 error(s)"})
+        self._next += 1
+        menu_id = f"richmenu-{self._next:032x}"
+        self.menus[menu_id] = menu
+        return _json(200, {"richMenuId": menu_id})
+
+    def _upload(self, headers, body, menu_id):
+        if menu_id not in self.menus:
+            return _json(404, {"message": "Not found"})
+        if menu_id in self.images:
+            return _json(400, {"message": "An image has already been uploaded to the richmenu"})
+        content_type = headers.get("Content-Type", "")
+        if content_type not in ("image/png", "image/jpeg") or len(body) > self.MAX_IMAGE_BYTES:
+            return _json(400, {"message": "Invalid image"})
+        self.images[menu_id] = (content_type, body)
+        return _json(200, {})
+
+    def _download(self, headers, body, menu_id):
+        if menu_id not in self.images:
+            return _json(404, {"message": "Not found"})
+        content_type, data = self.images[menu_id]
+        return 200, data, content_type
+
+    def _delete(self, headers, body, menu_id):
+        if self.menus.pop(menu_id, None) is None:
+            return _json(404, {"message": "Not found"})
+        self.images.pop(menu_id, None)
+        if self.default == menu_id:
+            self.default = None
+        self.links = {user: linked for user, linked in self.links.items() if linked != menu_id}
+        return _json(200, {})
+
+    def _get_default(self, headers, body):
+        if self.default is None:
+            return _json(404, {"message": "no default richmenu"})
+        return _json(200, {"richMenuId": self.default})
+
+    def _set_default(self, headers, body, menu_id):
+        if menu_id not in self.menus:
+            return _json(404, {"message": "Not found"})
+        if menu_id not in self.images:
+            return _json(400, {"message": "must upload richmenu image before applying it to user"})
+        self.default = menu_id
+        return _json(200, {})
+
+    def _link(self, headers, body, user_id, menu_id):
+        if menu_id not in self.images:
+            return _json(400 if menu_id in self.menus else 404, {"message": "Invalid richmenu"})
+        self.links[user_id] = menu_id
+        return _json(200, {})
+
+    def _bulk_link(self, headers, body):
+        payload = json.loads(body)
+        menu_id, user_ids = payload.get("richMenuId"), payload.get("userIds", [])
+        if menu_id not in self.images:
+            return _json(400 if menu_id in self.menus else 404, {"message": "Invalid richmenu"})
+        if not 1 <= len(user_ids) <= self.BULK_LINK_MAX:
+            return _json(400, {"message": f"userIds must be 1-{self.BULK_LINK_MAX} items"})
+        for user_id in user_ids:
+            self.links[user_id] = menu_id
+        return 202, b"{}", "application/json"
+
+
+class FakeLINE(_FakeServer):
+    """LINE Messaging API (POST /v2/bot/message/reply 등) - latency 초 후에 200 {} 을 돌려준다.
+
+    Rich Menu API 는 rich_menus(FakeRichMenus) 가 상태를 가지고 흉내 낸다 (api-data 경로도 같은 서버).
+
+    replies 에 replyToken → 요청을 받은 시각(time.monotonic)을 남겨 웹훅 수신부터 답장까지의 지연을 잴 수 있다.
+    connect_latency 는 새 연결마다 추가되는 지연(TLS 핸드셰이크 흉내),
+    error_rate 비율만큼 429/503 을 번갈아 돌려준다 (retry_after 를 주면 429 에 Retry-After 헤더).
+    """
+
+    def __init__(self, latency=0.05, port=0, connect_latency=0.0, error_rate=0.0, retry_after=None, seed=1):
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.replies = {}
+        self.connections = 0
+        self.errors = 0
+        self.rich_menus = FakeRichMenus()
+        self._random = random.Random(seed)
+        super().__init__(_LINEHandler, port)
+
+    def connected(self):
+        with self._lock:
+            self.connections += 1
+
+    def inject_error(self):
+        with self._lock:
+            if not self.error_rate or self._random.random() >= self.error_rate:
+                return None
+            self.errors += 1
+            return 429 if self.errors % 2 else 503
+
+    def record_reply(self, token, received):
+        with self._lock:
+            self.replies[token] = received
+
+    def reply_count(self):
+        with self._lock:
+            return len(self.replies)
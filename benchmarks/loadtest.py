@@ -0,0 +1,460 @@
+"""오프라인 부하 테스트: 실제 LINE/OpenAI/운영 DB 없이 3_app_complete.py 전체 경로를 측정한다.
+
+- LINE Messaging API / OpenAI 는 fake_servers 의 로컬 가짜 서버 (지연 조절 가능)
+- MySQL 은 로컬(도커 등) 인스턴스에 부하 테스트 전용 DB 를 새로 만들어 사용
+  (loadtest_schema.sql + migrations/*.sql 적용, 실행할 때마다 DROP 후 다시 생성)
+- 서명된 웹훅(Follow / Message / Postback, 상담 신청 전 과정 포함)을 지정한 속도로 재생
+
+결과(p50/p95/p99 지연, 처리량, 이벤트당 DB 구문 수)는 JSON 으로 출력하고,
+--baseline 으로 이전 결과 파일을 주면 주요 지표의 변화율을 함께 보여준다.
+
+    docker run -d --name petbot-mysql -e MYSQL_ROOT_PASSWORD=loadtest -p 3306:3306 mysql:8
+    LOADTEST_DB_PASSWORD=loadtest python benchmarks/loadtest.py --users 200 --rate 50 --output run.json
+    LOADTEST_DB_PASSWORD=loadtest python benchmarks/loadtest.py --async --baseline run.json
+
+DB 접속: LOADTEST_DB_HOST(127.0.0.1) / LOADTEST_DB_PORT(3306) / LOADTEST_DB_USER(root) /
+LOADTEST_DB_PASSWORD / LOADTEST_DB_NAME(petbot_loadtest)
+DB 구문 수는 SHOW GLOBAL STATUS 의 Com_* 차이라서 다른 클라이언트가 없는 전용 인스턴스에서 재야 정확하다.
+"""
+import argparse
+import csv
+import glob
+import http.client
+import json
+import os
+import re
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, HERE)
+
+from fake_servers import FakeLINE, FakeOpenAI
+from webhook_payloads import PATTERNS, build_sessions, interleave, make_event, sign, webhook_body
+
+STATEMENT_COUNTERS = ("Com_select", "Com_insert", "Com_update", "Com_delete")
+ADMIN_USERNAME = "loadtest"
+ADMIN_PASSWORD = secrets.token_hex(8)
+
+
+# ==================== DB ====================
+def db_config():
+    return {
+        "host": os.getenv("LOADTEST_DB_HOST", "127.0.0.1"),
+        "port": int(os.getenv("LOADTEST_DB_PORT", "3306")),
+        "user": os.getenv("LOADTEST_DB_USER", "root"),
+        "password": os.getenv("LOADTEST_DB_PASSWORD", ""),
+        "database": os.getenv("LOADTEST_DB_NAME", "petbot_loadtest"),
+    }
+
+
+def split_sql(text):
+    lines = [line for line in text.splitlines() if not line.strip().startswith("--")]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+def prepare_db(cfg):
+    """부하 테스트 전용 DB 를 비우고 스키마 + 마이그레이션 적용"""
+    import mysql.connector
+
+    conn = mysql.connector.connect(host=cfg["host"], port=cfg["port"], user=cfg["user"],
+                                   password=cfg["password"], autocommit=True)
+    try:
+        cur = conn.cursor()
+        cur.execute(f"DROP DATABASE IF EXISTS `{cfg['database']}`")
+        cur.execute(f"CREATE DATABASE `{cfg['database']}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+        cur.execute(f"USE `{cfg['database']}`")
+        files = [os.path.join(HERE, "loadtest_schema.sql")] + sorted(glob.glob(os.path.join(ROOT, "migrations", "*.sql")))
+        for path in files:
+            with open(path, encoding="utf-8") as f:
+                for stmt in split_sql(f.read()):
+                    cur.execute(stmt)
+        cur.close()
+    finally:
+        conn.close()
+
+
+def db_counters(cfg):
+    import mysql.connector
+
+    conn = mysql.connector.connect(host=cfg["host"], port=cfg["port"], user=cfg["user"], password=cfg["password"])
+    try:
+        cur = conn.cursor()
+        names = ", ".join(f"'{name}'" for name in STATEMENT_COUNTERS)
+        cur.execute(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({names})")
+        counters = {name: int(value) for name, value in cur.fetchall()}
+        cur.close()
+        return counters
+    finally:
+        conn.close()
+
+
+# ==================== 앱 프로세스 ====================
+def start_app(port, env, log_path, timeout=60):
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "loadtest_app.py"), str(port)],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1,
+    )
+    log = open(log_path, "w", encoding="utf-8")
+    ready = threading.Event()
+
+    def pump():
+        for line in proc.stdout:
+            log.write(line)
+            log.flush()
+            if line.startswith("READY"):
+                ready.set()
+        log.close()
+
+    threading.Thread(target=pump, daemon=True).start()
+    deadline = time.monotonic() + timeout
+    while not ready.wait(0.2):
+        if proc.poll() is not None or time.monotonic() > deadline:
+            proc.kill()
+            raise RuntimeError(f"앱 시작 실패 - 로그: {log_path}")
+    return proc
+
+
+def stop_app(proc, timeout=60):
+    proc.terminate()  # loadtest_app.py 가 SIGTERM 을 받아 atexit(shutdown) 실행
+    try:
+        proc.wait(timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def fetch_admin_stats(port):
+    """관리자 로그인 후 /admin/db, gpt-cache, webhook, line-http (DB 조회 없는 인메모리 통계)"""
+    stats = {}
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        conn.request("POST", "/admin/login", body=urlencode({"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}),
+                     headers={"Content-Type": "application/x-www-form-urlencoded"})
+        response = conn.getresponse()
+        response.read()
+        cookie = (response.getheader("Set-Cookie") or "").split(";", 1)[0]
+        for path in ("/admin/db", "/admin/gpt-cache", "/admin/webhook", "/admin/line-http"):
+            conn.request("GET", path, headers={"Cookie": cookie})
+            response = conn.getresponse()
+            body = response.read()
+            if response.status == 200:
+                stats[path.rsplit("/", 1)[1]] = json.loads(body)
+        conn.close()
+    except (OSError, ValueError, http.client.HTTPException) as e:
+        stats["error"] = str(e)
+    return stats
+
+
+_SAMPLE = re.compile(r'^(\w+)\{([^}]*)\} (\S+)$')
+
+
+def fetch_stage_metrics(port):
+    """/metrics 에서 단계별 평균 시간과 답장 경로/GPT 답변 출처 카운터만 추림"""
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        conn.request("GET", "/metrics")
+        text = conn.getresponse().read().decode("utf-8")
+        conn.close()
+    except (OSError, http.client.HTTPException) as e:
+        return {"error": str(e)}
+
+    stages, counters = {}, {}
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if not match:
+            continue
+        name, labels, value = match.groups()
+        label = labels.split('="', 1)[1].rstrip('"') if '="' in labels else ""
+        if name in ("petbot_stage_seconds_sum", "petbot_stage_seconds_count"):
+            stages.setdefault(label, {})[name.rsplit("_", 1)[1]] = float(value)
+        elif name in ("petbot_text_replies_total", "petbot_gpt_answers_total", "petbot_postbacks_total"):
+            counters.setdefault(name[len("petbot_"):], {})[label] = int(float(value))
+    stage_ms = {
+        stage: {"count": int(v.get("count", 0)),
+                "mean_ms": round(v.get("sum", 0.0) / v["count"] * 1000, 3) if v.get("count") else 0.0}
+        for stage, v in sorted(stages.items())
+    }
+    return {"stages": stage_ms, **counters}
+
+
+# ==================== 재생 ====================
+class Sender:
+    """스레드마다 keep-alive 커넥션 하나로 /webhook 에 POST"""
+
+    def __init__(self, port, secret, timeout):
+        self.port = port
+        self.secret = secret
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=self.timeout)
+        return conn
+
+    def post(self, body):
+        headers = {"Content-Type": "application/json", "X-Line-Signature": sign(body, self.secret)}
+        for attempt in (1, 2):
+            conn = self._conn()
+            try:
+                conn.request("POST", "/webhook", body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                return response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                self._local.conn = None
+                if attempt == 2:
+                    raise
+
+
+def replay(order, sender, rate, concurrency):
+    """open-loop 재생: i 번째 이벤트는 start + i/rate 에 보낸다.
+
+    지연은 '보내기로 예정된 시각'부터 재므로 부하 발생기가 밀려도 대기 시간이 결과에 포함된다.
+    같은 사용자의 다음 이벤트는 이전 요청이 끝난 뒤에 보낸다 (상담 플로우 순서 보장).
+    """
+    results = [None] * len(order)
+    previous = {}
+    start = time.monotonic() + 0.5
+
+    def send(i, user_id, kind, value, wait_for):
+        if wait_for is not None:
+            wait_for.result()
+        scheduled = start + i / rate
+        delay = scheduled - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        event = make_event(user_id, kind, value)
+        sent = time.monotonic()
+        try:
+            status = sender.post(webhook_body([event]))
+            error = None if status == 200 else f"HTTP {status}"
+        except Exception as e:
+            error = type(e).__name__
+        done = time.monotonic()
+        results[i] = {"type": event["type"], "token": event["replyToken"], "scheduled": scheduled,
+                      "sent": sent, "done": done, "error": error}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = []
+        for i, (user_id, kind, value) in enumerate(order):
+            future = pool.submit(send, i, user_id, kind, value, previous.get(user_id))
+            previous[user_id] = future
+            futures.append(future)
+        for future in futures:
+            future.result()
+    return start, results
+
+
+# ==================== 결과 ====================
+def percentiles(values):
+    if not values:
+        return None
+    values = sorted(values)
+
+    def pick(p):
+        return round(values[min(len(values) - 1, int(p / 100 * len(values)))] * 1000, 2)
+
+    return {"p50": pick(50), "p95": pick(95), "p99": pick(99), "max": round(values[-1] * 1000, 2),
+            "mean": round(sum(values) / len(values) * 1000, 2), "count": len(values)}
+
+
+def wait_for_replies(line, tokens, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with line._lock:
+            if all(token in line.replies for token in tokens):
+                return
+        time.sleep(0.1)
+
+
+COMPARE = [
+    ("throughput_eps", "처리량 (이벤트/초)", True),
+    ("latency_ms.webhook.p50", "웹훅 p50 ms", False),
+    ("latency_ms.webhook.p99", "웹훅 p99 ms", False),
+    ("latency_ms.reply.p50", "답장 p50 ms", False),
+    ("latency_ms.reply.p99", "답장 p99 ms", False),
+    ("db.statements_per_event", "이벤트당 DB 구문", False),
+    ("upstream.openai_calls", "OpenAI 호출", False),
+]
+
+
+def _lookup(report, dotted):
+    value = report
+    for key in dotted.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(report, baseline):
+    print("-" * 60)
+    print("📊 baseline 대비")
+    for key, label, higher_is_better in COMPARE:
+        old, new = _lookup(baseline, key), _lookup(report, key)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        better = change >= 0 if higher_is_better else change <= 0
+        mark = "✅" if better or abs(change) < 5 else "⚠️"
+        print(f"{mark} {label:<18} {old:>10} → {new:>10} ({change:+.1f}%)")
+
+
+def run(args):
+    cfg = db_config()
+    workdir = tempfile.mkdtemp(prefix="petbot-loadtest-")
+    patterns_path = os.path.join(workdir, "patterns.csv")
+    with open(patterns_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["pattern", "response"])
+        writer.writerows(PATTERNS)
+
+    sessions = build_sessions(args.users, consult_ratio=args.consult_ratio, chat_turns=args.chat_turns,
+                              seed=args.seed)
+    order = interleave(sessions)
+
+    prepare_db(cfg)
+    line = FakeLINE(latency=args.line_latency).start()
+    openai = FakeOpenAI(latency=args.openai_latency).start()
+
+    secret = secrets.token_hex(16)
+    env = dict(os.environ)
+    env.update({
+        "LINE_CHANNEL_ACCESS_TOKEN": "loadtest-token",
+        "LINE_CHANNEL_SECRET": secret,
+        "LINE_API_ENDPOINT": line.url,
+        "OPENAI_API_KEY": "sk-loadtest",
+        "OPENAI_BASE_URL": openai.base_url,
+        "DB_HOST": cfg["host"], "DB_PORT": str(cfg["port"]), "DB_NAME": cfg["database"],
+        "DB_USER": cfg["user"], "DB_PASSWORD": cfg["password"],
+        "ADMIN_USERNAME": ADMIN_USERNAME, "ADMIN_PASSWORD": ADMIN_PASSWORD,
+        "PATTERNS_PATH": patterns_path,
+        "PATTERN_RELOAD_INTERVAL": "0",
+        "MESSAGE_JOURNAL_PATH": os.path.join(workdir, "message_journal.jsonl"),
+        "GPT_CACHE_PATH": "",
+        "STATS_RECONCILE_INTERVAL": "3600",  # 측정 중 주기 집계 쿼리가 끼지 않도록
+        "WEBHOOK_ASYNC": "1" if args.async_webhook else "0",
+    })
+    for item in args.app_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+
+    port = args.port
+    proc = start_app(port, env, os.path.join(workdir, "app.log"))
+    try:
+        before = db_counters(cfg)
+        sender = Sender(port, secret, timeout=args.timeout)
+        started, results = replay(order, sender, args.rate, args.concurrency)
+        finished = max(r["done"] for r in results)
+
+        ok = [r for r in results if r["error"] is None]
+        wait_for_replies(line, [r["token"] for r in ok], args.timeout)
+        with line._lock:
+            replies = dict(line.replies)
+        reply_latency = [replies[r["token"]] - r["scheduled"] for r in ok if r["token"] in replies]
+        replied_at = [replies[r["token"]] for r in ok if r["token"] in replies]
+        end = max([finished] + replied_at)
+
+        app_stats = fetch_admin_stats(port)
+        app_stats["metrics"] = fetch_stage_metrics(port)
+    finally:
+        stop_app(proc)  # 종료 시 남은 메시지 버퍼/last_seen 까지 DB 에 기록된 뒤 구문 수를 셈
+        line.stop()
+        openai.stop()
+
+    after = db_counters(cfg)
+    by_command = {name: after.get(name, 0) - before.get(name, 0) for name in STATEMENT_COUNTERS}
+    statements = sum(by_command.values())
+
+    kinds = {}
+    for r in results:
+        kinds[r["type"]] = kinds.get(r["type"], 0) + 1
+    errors = {}
+    for r in results:
+        if r["error"]:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+
+    report = {
+        "config": {
+            "users": args.users, "rate": args.rate, "concurrency": args.concurrency,
+            "consult_ratio": args.consult_ratio, "chat_turns": args.chat_turns, "seed": args.seed,
+            "line_latency_s": args.line_latency, "openai_latency_s": args.openai_latency,
+            "async_webhook": args.async_webhook, "app_env": args.app_env,
+        },
+        "events": {"total": len(results), **kinds},
+        "errors": {"total": len(results) - len(ok), **errors, "missing_replies": len(ok) - len(reply_latency)},
+        "duration_s": round(end - started, 3),
+        "throughput_eps": round(len(reply_latency) / (end - started), 2) if end > started else 0.0,
+        "latency_ms": {
+            # 웹훅 HTTP 응답까지 (동기 모드면 처리 전체, 비동기 모드면 서명 검증 + 큐 적재)
+            "webhook": percentiles([r["done"] - r["scheduled"] for r in ok]),
+            # 가짜 LINE 서버가 해당 replyToken 의 답장을 받기까지 (사용자 체감 지연)
+            "reply": percentiles(reply_latency),
+        },
+        "db": {
+            "statements": statements,
+            "statements_per_event": round(statements / len(results), 3) if results else 0.0,
+            "by_command": by_command,
+        },
+        "upstream": {"line_calls": line.calls, "openai_calls": openai.calls},
+        "app": app_stats,
+        "workdir": workdir,
+    }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pet AI 상담봇 오프라인 부하 테스트")
+    parser.add_argument("--users", type=int, default=100, help="합성 사용자 수 (사용자마다 세션 하나)")
+    parser.add_argument("--rate", type=float, default=50.0, help="초당 웹훅 전송 수")
+    parser.add_argument("--concurrency", type=int, default=64, help="동시 전송 스레드 수")
+    parser.add_argument("--consult-ratio", type=float, default=0.3, help="상담 신청 전 과정을 진행하는 사용자 비율")
+    parser.add_argument("--chat-turns", type=int, default=4, help="일반 대화 사용자의 질문 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--line-latency", type=float, default=0.03, help="가짜 LINE API 응답 지연 (초)")
+    parser.add_argument("--openai-latency", type=float, default=0.8, help="가짜 OpenAI 응답 지연 (초)")
+    parser.add_argument("--async", dest="async_webhook", action="store_true", help="WEBHOOK_ASYNC=1 로 실행")
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE", help="앱 환경변수 추가/덮어쓰기")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    latency = report["latency_ms"]
+    print("=" * 60)
+    print(f"📨 이벤트 {report['events']['total']}건 / 오류 {report['errors']['total']}건 "
+          f"/ 답장 누락 {report['errors']['missing_replies']}건")
+    print(f"🚀 처리량: {report['throughput_eps']} 이벤트/초")
+    for name in ("webhook", "reply"):
+        if latency[name]:
+            print(f"⏱️ {name:<8} p50 {latency[name]['p50']}ms / p95 {latency[name]['p95']}ms / p99 {latency[name]['p99']}ms")
+    print(f"🗄️ DB 구문: 이벤트당 {report['db']['statements_per_event']} ({report['db']['by_command']})")
+    print(f"🌐 LINE 호출 {report['upstream']['line_calls']} / OpenAI 호출 {report['upstream']['openai_calls']}")
+    for stage, value in report["app"].get("metrics", {}).get("stages", {}).items():
+        print(f"   {stage:<28} {value['count']:>7}회  평균 {value['mean_ms']}ms")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(report, json.load(f))
+    print("=" * 60)
+    print(json.dumps(report, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""부하 테스트용 앱 실행기: 3_app_complete.py 를 불러와 지정한 포트에서 (디버그/리로더 없이) 띄운다.
+
+환경변수(LINE/OpenAI 엔드포인트, DB 등)는 loadtest.py 가 넘겨준다.
+
+    python benchmarks/loadtest_app.py <포트>
+"""
+import importlib.util
+import os
+import signal
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+
+def load_app():
+    # 파일 이름이 숫자로 시작해 import 문으로는 불러올 수 없음
+    spec = importlib.util.spec_from_file_location("petbot_app", os.path.join(ROOT, "3_app_complete.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def main(port):
+    from werkzeug.serving import make_server
+
+    module = load_app()
+    server = make_server("127.0.0.1", port, module.app, threaded=True)
+    # SIGTERM 도 KeyboardInterrupt 처럼 처리해 atexit(shutdown: 웹훅 큐/메시지 버퍼 비우기)가 실행되게 함
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(f"READY {port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1])))
@@ -0,0 +1,45 @@
+-- 부하 테스트용 빈 DB 스키마 (3_app_complete.py 가 쓰는 컬럼만)
+-- loadtest.py 가 이 파일을 적용한 뒤 migrations/*.sql 을 순서대로 적용한다.
+CREATE TABLE users (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    line_user_id VARCHAR(64) NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_seen DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_users_line_user_id (line_user_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE conversations (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'open',
+    started_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_conversations_user_status (user_id, status, started_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE messages (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    conversation_id BIGINT NOT NULL,
+    sender VARCHAR(8) NOT NULL,
+    content TEXT NOT NULL,
+    used_gpt TINYINT NOT NULL DEFAULT 0,
+    matched_pattern VARCHAR(100) NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE consultations (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    consultation_number VARCHAR(32) NOT NULL,
+    member_type VARCHAR(16) NOT NULL,
+    guardian_name VARCHAR(100) NOT NULL,
+    guardian_phone VARCHAR(32) NOT NULL,
+    pet_type VARCHAR(16) NOT NULL,
+    pet_name VARCHAR(100) NOT NULL,
+    pet_age VARCHAR(32) NOT NULL DEFAULT '',
+    category VARCHAR(32) NOT NULL,
+    urgency VARCHAR(16) NOT NULL,
+    description TEXT NOT NULL,
+    preferred_time VARCHAR(16) NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'pending',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
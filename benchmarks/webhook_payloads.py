@@ -0,0 +1,133 @@
+"""부하 테스트용 LINE 웹훅 페이로드 생성 (서명 포함)
+
+사용자 한 명 = 세션. 세션은 Follow 로 시작해서
+- 상담 신청 전 과정 (personal/corporate → 이름 → 연락처 → 버튼 선택 … → 선호 시간) 또는
+- 일반 대화 (패턴에 걸리는 질문 + GPT 로 넘어가는 질문, 일부는 다른 사용자와 같은 질문)
+을 순서대로 보낸다.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import random
+import time
+import uuid
+
+DESTINATION = "Uloadtest0000000000000000000000000"
+
+# loadtest.py 가 patterns.csv 로 써 주는 패턴 (pattern, response)
+PATTERNS = [
+    ("안녕|하이|반가", "안녕하세요 😊 무엇을 도와드릴까요?"),
+    ("진료\\s*시간|운영\\s*시간", "🕐 운영 시간은 평일 9:00-18:00 입니다."),
+    ("주소|위치|오시는\\s*길", "📍 서울시 강남구 테헤란로 123 입니다."),
+    ("예방\\s*접종", "💉 예방 접종 일정은 상담 신청으로 안내해 드려요."),
+    ("감사|고마", "별말씀을요 😊"),
+]
+PATTERN_QUESTIONS = ["안녕하세요", "진료 시간 알려주세요", "주소가 어디예요?", "예방 접종 언제 해요?", "감사합니다"]
+GPT_QUESTIONS = [
+    "강아지가 밥을 안 먹어요", "고양이가 토를 해요", "산책은 하루에 몇 번 해야 하나요",
+    "사료를 바꾸고 싶어요", "발톱은 얼마나 자주 깎나요", "강아지가 계속 긁어요",
+]
+
+
+def sign(body: bytes, channel_secret: str) -> str:
+    """X-Line-Signature: base64(HMAC-SHA256(channel secret, body))"""
+    digest = hmac.new(channel_secret.encode("utf-8"), body, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def _event(event_type, user_id, **fields):
+    event = {
+        "type": event_type,
+        "mode": "active",
+        "timestamp": int(time.time() * 1000),
+        "source": {"type": "user", "userId": user_id},
+        "webhookEventId": uuid.uuid4().hex.upper()[:26],
+        "deliveryContext": {"isRedelivery": False},
+        "replyToken": uuid.uuid4().hex,
+    }
+    event.update(fields)
+    return event
+
+
+def follow_event(user_id):
+    return _event("follow", user_id, follow={"isUnblocked": False})
+
+
+def text_event(user_id, text):
+    return _event("message", user_id, message={
+        "id": str(random.getrandbits(60)), "type": "text", "quoteToken": uuid.uuid4().hex, "text": text,
+    })
+
+
+def postback_event(user_id, data):
+    return _event("postback", user_id, postback={"data": data})
+
+
+def webhook_body(events) -> bytes:
+    return json.dumps({"destination": DESTINATION, "events": events}, ensure_ascii=False).encode("utf-8")
+
+
+# ---------- 시나리오 ----------
+def consultation_steps(rnd, i):
+    """상담 신청 전 과정 [(kind, 값)] - consult_flow.FLOW 순서"""
+    return [
+        ("postback", "action=consultation"),
+        ("postback", "action=" + rnd.choice(["personal", "corporate"])),
+        ("text", f"보호자{i}"),
+        ("text", f"010-{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}"),
+        ("postback", "action=" + rnd.choice(["pet_dog", "pet_cat", "pet_other"])),
+        ("text", f"초코{i}"),
+        ("text", f"{rnd.randint(1, 15)}살"),
+        ("postback", "action=" + rnd.choice(["cat_health", "cat_nutrition", "cat_behavior",
+                                             "cat_grooming", "cat_emergency", "cat_other"])),
+        ("postback", "action=" + rnd.choice(["urg_urgent", "urg_normal", "urg_flexible"])),
+        ("text", "어제부터 밥을 잘 안 먹고 기운이 없어요"),
+        ("postback", "action=" + rnd.choice(["time_morning", "time_afternoon", "time_evening", "time_anytime"])),
+    ]
+
+
+def chat_steps(rnd, i, turns, pattern_ratio, repeat_ratio):
+    steps = [("text", "메뉴")]
+    for turn in range(turns):
+        if rnd.random() < pattern_ratio:
+            steps.append(("text", rnd.choice(PATTERN_QUESTIONS)))
+        elif rnd.random() < repeat_ratio:
+            steps.append(("text", rnd.choice(GPT_QUESTIONS)))  # 다른 사용자와 겹치는 질문 (캐시/합치기 대상)
+        else:
+            steps.append(("text", f"{rnd.choice(GPT_QUESTIONS)} ({i}-{turn})"))
+    return steps
+
+
+def build_sessions(users, consult_ratio=0.3, chat_turns=4, pattern_ratio=0.4, repeat_ratio=0.5, seed=42):
+    """[(user_id, [(kind, 값)])] - 이벤트 객체(replyToken 등)는 보낼 때 만든다"""
+    rnd = random.Random(seed)
+    sessions = []
+    for i in range(users):
+        user_id = "U" + hashlib.md5(f"loadtest-{seed}-{i}".encode()).hexdigest()
+        if rnd.random() < consult_ratio:
+            steps = consultation_steps(rnd, i)
+        else:
+            steps = chat_steps(rnd, i, chat_turns, pattern_ratio, repeat_ratio)
+        sessions.append((user_id, [("follow", None)] + steps))
+    return sessions
+
+
+def interleave(sessions):
+    """세션들을 라운드로빈으로 섞은 전송 순서 [(user_id, kind, 값)] (같은 사용자의 이벤트는 순서 유지)"""
+    order = []
+    longest = max((len(steps) for _, steps in sessions), default=0)
+    for n in range(longest):
+        for user_id, steps in sessions:
+            if n < len(steps):
+                kind, value = steps[n]
+                order.append((user_id, kind, value))
+    return order
+
+
+def make_event(user_id, kind, value):
+    if kind == "follow":
+        return follow_event(user_id)
+    if kind == "postback":
+        return postback_event(user_id, value)
+    return text_event(user_id, value)
@@ -0,0 +1,334 @@
+import re
+from collections import namedtuple
+from functools import partial
+
+from state_store import FIELDS
+
+LINE = "━━━━━━━━━━━━━━━━━━━"
+
+# 처리 결과
+#   text    : 답장 텍스트 (완료 단계는 None - 접수 번호를 받은 뒤 completion_text 로 만듦)
+#   flex    : 텍스트 뒤에 붙일 Flex 템플릿 이름 (flex_templates.MessageRegistry 키) 또는 None
+#   pattern : messages.matched_pattern 에 남길 값
+#   state   : 저장할 새 상태 (None 이면 그대로 둠)
+#   complete: True 면 상담 저장 후 상태 삭제
+Outcome = namedtuple("Outcome", "text flex pattern state complete")
+
+
+# ==================== 플로우 정의 ====================
+# 단계를 추가/변경할 때는 여기만 고치면 된다. ConsultFlow 가 시작 시 dict 디스패치로 컴파일한다.
+FLOW = {
+    "menu": {
+        "keywords": ["메뉴", "시작", "처음", "help"],
+        "reply": "메인 메뉴를 띄워드릴게요 😊",
+        "flex": "main_menu",
+        "pattern": "system_menu",
+    },
+
+    # 상태와 무관한 고정 답장 (postback action → 답장)
+    "actions": {
+        "consultation": {"reply": "상담 신청을 시작합니다! 😊", "flex": "consultation_type", "pattern": "postback"},
+        "inquiry": {"reply": "궁금한 내용을 입력해주세요 😊", "pattern": "postback"},
+        "contact": {
+            "reply": f"📞 연락처 정보\n\n{LINE}\n📱 전화: 02-1234-5678\n✉️ 이메일: contact@example.com\n🕐 운영: 평일 9:00-18:00\n{LINE}",
+            "pattern": "postback",
+        },
+        "event": {
+            "reply": f"🎁 현재 진행 중인 이벤트\n\n{LINE}\n1️⃣ 신규 회원 가입 이벤트\n2️⃣ 친구 추천 이벤트\n3️⃣ 월간 행운의 룰렛\n{LINE}",
+            "pattern": "event",
+        },
+        "partner": {
+            "reply": f"🤝 협력사 안내\n\n{LINE}\n🏥 ABC 동물병원\n🏪 XYZ 펫샵\n🎓 123 애견훈련소\n{LINE}",
+            "pattern": "partner",
+        },
+        "app": {
+            "reply": f"📱 Pet AI App 설치 안내\n\n{LINE}\n🍎 iOS: App Store\n🤖 Android: Play Store\n{LINE}\n\n(현재 개발 중)",
+            "pattern": "app",
+        },
+    },
+
+    # 상담 시작 (postback action → 새 상태)
+    "starts": {
+        "personal": {
+            "step": "waiting_guardian_name",
+            "state": {"member_type": "personal"},
+            "reply": "👤 개인 회원 상담 신청\n\n보호자님의 성함을 입력해주세요",
+        },
+        "corporate": {
+            "step": "waiting_guardian_name",
+            "state": {"member_type": "corporate"},
+            "reply": "🏢 기업/단체 회원 상담 신청\n\n담당자님의 성함을 입력해주세요",
+        },
+    },
+
+    # 단계별 입력
+    #   input=text     : 사용자가 입력한 텍스트를 field 에 저장 (validate 실패 시 invalid 답장 후 그대로 대기)
+    #   input=postback : choices[field] 의 버튼 중 하나를 기다림 (텍스트는 일반 대화로 처리)
+    "steps": {
+        "waiting_guardian_name": {
+            "input": "text", "field": "guardian_name", "next": "waiting_guardian_phone",
+            "reply": "📞 연락처를 입력해주세요\n\n예시: 010-1234-5678",
+        },
+        "waiting_guardian_phone": {
+            "input": "text", "field": "guardian_phone", "next": "waiting_pet_type",
+            "validate": "phone", "invalid": "연락처 형식을 확인해주세요 📞\n\n예시: 010-1234-5678",
+            "reply": "반려동물 종류를 선택해주세요 🐾", "flex": "pet_type_selection",
+        },
+        "waiting_pet_type": {"input": "postback", "field": "pet_type"},
+        "waiting_pet_name": {
+            "input": "text", "field": "pet_name", "next": "waiting_pet_age",
+            "reply": "🎂 반려동물의 나이를 입력해주세요\n\n예시: 3살 또는 3",
+        },
+        "waiting_pet_age": {
+            "input": "text", "field": "pet_age", "next": "waiting_category",
+            "reply": "상담 카테고리를 선택해주세요 📋", "flex": "category_selection",
+        },
+        "waiting_category": {"input": "postback", "field": "category"},
+        "waiting_urgency": {"input": "postback", "field": "urgency"},
+        "waiting_description": {
+            "input": "text", "field": "description", "next": "waiting_preferred_time",
+            "reply": "선호하는 상담 시간대를 선택해주세요 🕐", "flex": "time_selection",
+        },
+        "waiting_preferred_time": {"input": "postback", "field": "preferred_time"},
+    },
+
+    # 버튼 선택 (field → postback action 별 값/표시명). next 가 없으면 상담 완료.
+    # {label} 은 선택한 항목의 label, 완료 요약에는 summary_label(없으면 label)을 쓴다.
+    "choices": {
+        "pet_type": {
+            "options": {
+                "pet_dog": {"value": "dog", "label": "강아지"},
+                "pet_cat": {"value": "cat", "label": "고양이"},
+                "pet_other": {"value": "other", "label": "기타"},
+            },
+            "next": "waiting_pet_name",
+            "reply": "🐾 {label}를 선택하셨습니다!\n\n반려동물의 이름을 입력해주세요",
+        },
+        "category": {
+            "options": {
+                "cat_health": {"value": "health", "label": "질병/건강"},
+                "cat_nutrition": {"value": "nutrition", "label": "영양/사료"},
+                "cat_behavior": {"value": "behavior", "label": "행동 교정"},
+                "cat_grooming": {"value": "grooming", "label": "미용/관리"},
+                "cat_emergency": {"value": "emergency", "label": "응급 상황"},
+                "cat_other": {"value": "other", "label": "기타 문의", "summary_label": "기타"},
+            },
+            "next": "waiting_urgency",
+            "reply": "📋 {label}를 선택하셨습니다!\n\n긴급도를 선택해주세요",
+            "flex": "urgency_selection",
+        },
+        "urgency": {
+            "options": {
+                "urg_urgent": {"value": "urgent", "label": "긴급", "emoji": "🔴"},
+                "urg_normal": {"value": "normal", "label": "보통", "emoji": "🟡"},
+                "urg_flexible": {"value": "flexible", "label": "여유", "emoji": "🟢"},
+            },
+            "next": "waiting_description",
+            "reply": (
+                "🔔 {label}로 설정되었습니다!\n\n상세한 문의 내용을 입력해주세요\n\n"
+                "예시:\n• 증상이 언제부터 시작되었나요?\n• 어떤 증상이 있나요?\n• 기타 특이사항"
+            ),
+        },
+        "preferred_time": {
+            "options": {
+                "time_morning": {"value": "morning", "label": "오전 (9-12시)"},
+                "time_afternoon": {"value": "afternoon", "label": "오후 (12-18시)"},
+                "time_evening": {"value": "evening", "label": "저녁 (18-21시)"},
+                "time_anytime": {"value": "anytime", "label": "상관없음"},
+            },
+        },
+    },
+
+    # 완료 메시지. {필드}, {필드_label}, {필드_emoji}, {consultation_number} 사용 가능
+    "complete": {
+        "pattern": "consult_complete",
+        "defaults": {"pet_age": "나이 미입력"},
+        "reply": (
+            "✅ 상담 신청이 완료되었습니다!\n\n"
+            f"{LINE}\n"
+            "📋 접수 번호: {consultation_number}\n"
+            f"{LINE}\n\n"
+            "👤 보호자: {guardian_name}\n"
+            "📞 연락처: {guardian_phone}\n\n"
+            "🐾 반려동물: {pet_name} ({pet_type_label}, {pet_age})\n"
+            "📋 카테고리: {category_label}\n"
+            "{urgency_emoji} 긴급도: {urgency_label}\n"
+            "💬 문의 내용:\n{description}\n\n"
+            "🕐 선호 시간: {preferred_time_label}\n\n"
+            f"{LINE}\n"
+            "빠른 시일 내에 연락드리겠습니다.\n"
+            "감사합니다! 😊\n\n"
+            "접수번호로 상담 진행 상황을 확인하실 수 있습니다."
+        ),
+    },
+}
+
+
+# ==================== 입력 검증 ====================
+_PHONE = re.compile(r"^[\d\-\s+()]+$")
+
+
+def valid_phone(text: str) -> bool:
+    """숫자/하이픈/공백/괄호만, 숫자 9~11자리 (국가번호 +82 는 12자리까지)"""
+    if not _PHONE.match(text):
+        return False
+    digits = sum(c.isdigit() for c in text)
+    return 9 <= digits <= (12 if text.startswith("+") else 11)
+
+
+VALIDATORS = {"phone": valid_phone}
+
+
+class _Summary(dict):
+    def __missing__(self, key):
+        return ""
+
+
+# ==================== 상태 머신 ====================
+class ConsultFlow:
+    """FLOW 정의를 시작 시 한 번 컴파일해 step/action → 처리 함수 dict 로 만든다.
+
+    이벤트 처리는 dict 조회 한 번이라 단계가 늘어나도 비용이 같고, 표시명과 답장 문구도 미리 만들어 둔다.
+    DB 저장/답장 전송은 하지 않고 Outcome 만 돌려준다 (부수 효과는 호출하는 쪽 담당).
+    """
+
+    def __init__(self, spec=None):
+        spec = spec or FLOW
+        menu = spec["menu"]
+        self.menu_keywords = frozenset(menu["keywords"])
+        self._menu = Outcome(menu["reply"], menu.get("flex"), menu["pattern"], None, False)
+
+        complete = spec["complete"]
+        self._complete_pattern = complete["pattern"]
+        self._complete_reply = complete["reply"]
+        self._defaults = dict(complete.get("defaults", {}))
+
+        self._steps = {}      # step -> fn(state, text)
+        self._actions = {}    # action -> fn(state)
+        self._awaiting = {}   # 버튼을 기다리는 step -> field
+        self._choice_field = {}  # 버튼 action -> field
+        self.labels = {}      # field -> {value: 표시명}
+        self._summary_labels = {}
+        self._emoji = {}
+
+        steps = spec["steps"]
+        for name, step in steps.items():
+            self._check_field(step["field"])
+            if step["input"] == "text":
+                self._check_step(step["next"], steps)
+                validate = VALIDATORS[step["validate"]] if "validate" in step else None
+                invalid = Outcome(step.get("invalid"), None, "consult_flow", None, False)
+                self._steps[name] = partial(
+                    self._on_input, step["field"], step["next"], validate, invalid,
+                    step["reply"], step.get("flex"))
+            elif step["input"] == "postback":
+                self._awaiting[name] = step["field"]
+            else:
+                raise ValueError(f"알 수 없는 입력 종류: {name}={step['input']}")
+
+        for action, item in spec["actions"].items():
+            self._add_action(action, partial(
+                self._fixed, Outcome(item["reply"], item.get("flex"), item["pattern"], None, False)))
+
+        for action, start in spec["starts"].items():
+            self._check_step(start["step"], steps)
+            for field in start["state"]:
+                self._check_field(field)
+            initial = dict(start["state"], step=start["step"])
+            self._add_action(action, partial(self._start, initial, start["reply"], start.get("flex")))
+
+        for field, choice in spec["choices"].items():
+            self._check_field(field)
+            next_step = choice.get("next")
+            if next_step:
+                self._check_step(next_step, steps)
+            labels = self.labels[field] = {}
+            summary_labels = self._summary_labels[field] = {}
+            emoji = self._emoji[field] = {}
+            for action, option in choice["options"].items():
+                value, label = option["value"], option["label"]
+                labels[value] = label
+                summary_labels[value] = option.get("summary_label", label)
+                if "emoji" in option:
+                    emoji[value] = option["emoji"]
+                if next_step:
+                    reply = choice["reply"].format(label=label)
+                    fn = partial(self._choose, field, value, next_step, reply, choice.get("flex"))
+                else:
+                    fn = partial(self._finish, field, value)
+                self._add_action(action, fn)
+                self._choice_field[action] = field
+
+    # ---------- 컴파일 ----------
+    @staticmethod
+    def _check_field(field):
+        if field not in FIELDS:
+            raise ValueError(f"상태 저장소에 없는 필드: {field}")
+
+    @staticmethod
+    def _check_step(step, steps):
+        if step not in steps:
+            raise ValueError(f"정의되지 않은 단계: {step}")
+
+    def _add_action(self, action, fn):
+        if action in self._actions:
+            raise ValueError(f"postback action 중복: {action}")
+        self._actions[action] = fn
+
+    # ---------- 처리 함수 ----------
+    def _fixed(self, outcome, state):
+        return outcome
+
+    def _start(self, initial, reply, flex, state):
+        return Outcome(reply, flex, "consult_flow", dict(initial), False)
+
+    def _on_input(self, field, next_step, validate, invalid, reply, flex, state, text):
+        if validate and not validate(text):
+            return invalid
+        state = dict(state)
+        state[field] = text
+        state["step"] = next_step
+        return Outcome(reply, flex, "consult_flow", state, False)
+
+    def _choose(self, field, value, next_step, reply, flex, state):
+        state = dict(state)
+        state[field] = value
+        state["step"] = next_step
+        return Outcome(reply, flex, "consult_flow", state, False)
+
+    def _finish(self, field, value, state):
+        state = dict(state)
+        state[field] = value
+        return Outcome(None, None, self._complete_pattern, state, True)
+
+    # ---------- 공개 API ----------
+    @property
+    def actions(self):
+        """정의된 postback action 이름들"""
+        return self._actions.keys()
+
+    def on_text(self, state: dict, text: str):
+        """메뉴 키워드/텍스트 입력 단계면 Outcome, 아니면 None (일반 대화로 처리)"""
+        if text in self.menu_keywords:
+            return self._menu
+        fn = self._steps.get(state.get("step"))
+        return fn(state, text) if fn else None
+
+    def on_postback(self, state: dict, action: str):
+        """알 수 없는 action 이거나, 지금 단계가 기다리는 필드가 아닌 버튼(이전 메시지의 버튼 등)이면 None"""
+        field = self._choice_field.get(action)
+        if field is not None and self._awaiting.get(state.get("step")) != field:
+            return None
+        fn = self._actions.get(action)
+        return fn(state) if fn else None
+
+    def completion_text(self, state: dict, consultation_number: str) -> str:
+        summary = _Summary(self._defaults)
+        summary.update(state)
+        summary["consultation_number"] = consultation_number
+        for field, labels in self._summary_labels.items():
+            value = state.get(field)
+            summary[f"{field}_label"] = labels.get(value, value or "")
+            if field in self._emoji:
+                summary[f"{field}_emoji"] = self._emoji[field].get(value, "")
+        return self._complete_reply.format_map(summary)
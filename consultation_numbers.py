@@ -0,0 +1,28 @@
+from datetime import date
+
+# 날짜별 카운터 행 하나를 원자적으로 +1 하고 새 값을 받는다 (consultations 크기와 무관한 O(1)).
+# MySQL: LAST_INSERT_ID(expr) 로 증가된 값을 같은 구문의 lastrowid 로 돌려받음
+# SQLite: 로컬 테스트/벤치마크용 (UPSERT … RETURNING, 3.35+)
+_ALLOCATE_SQL = {
+    "mysql": (
+        "INSERT INTO consultation_sequences (seq_date, last_value) VALUES (%s, LAST_INSERT_ID(1)) "
+        "ON DUPLICATE KEY UPDATE last_value = LAST_INSERT_ID(last_value + 1)"
+    ),
+    "sqlite": (
+        "INSERT INTO consultation_sequences (seq_date, last_value) VALUES (?, 1) "
+        "ON CONFLICT(seq_date) DO UPDATE SET last_value = last_value + 1 RETURNING last_value"
+    ),
+}
+
+
+def allocate_sequence(cursor, day: date, dialect: str = "mysql") -> int:
+    """day 의 다음 접수 순번 (1부터). 여러 워커가 동시에 호출해도 중복 없음"""
+    cursor.execute(_ALLOCATE_SQL[dialect], (day.isoformat(),))
+    if dialect == "sqlite":
+        return int(cursor.fetchone()[0])
+    return int(cursor.lastrowid)
+
+
+def format_consultation_number(day: date, seq: int) -> str:
+    """접수 번호 형식: C20260201-001"""
+    return f"C{day:%Y%m%d}-{seq:03d}"
@@ -0,0 +1,145 @@
+import base64
+import re
+from datetime import datetime
+
+# 목록 화면에 필요한 컬럼만 (SELECT * 대신)
+LIST_COLUMNS = (
+    "id, consultation_number, member_type, guardian_name, guardian_phone, "
+    "pet_type, pet_name, category, urgency, status, created_at"
+)
+# 내보내기 컬럼
+EXPORT_COLUMNS = (
+    "id", "consultation_number", "member_type", "guardian_name", "guardian_phone",
+    "pet_type", "pet_name", "pet_age", "category", "urgency", "description",
+    "preferred_time", "status", "created_at",
+)
+TRANSCRIPT_COLUMNS = (
+    "consultation_number", "conversation_id", "message_id", "sender", "content",
+    "used_gpt", "matched_pattern", "created_at",
+)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+_CONSULTATION_NUMBER = re.compile(r"^C\d{8}-\d+$", re.IGNORECASE)
+_CONSULTATION_NUMBER_PREFIX = re.compile(r"^C\d{1,8}(-\d*)?$", re.IGNORECASE)
+_PHONE = re.compile(r"^[\d\-\s+()]+$")
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_condition(search: str, contains=False):
+    """검색어 종류에 맞는 인덱스 조건 (migrations/002 참고)
+
+    - 접수 번호 형식 → consultation_number 정확히 일치, 앞부분(C2026… 등)만 주면 앞부분 일치 (UNIQUE 인덱스)
+    - 숫자/하이픈 → 숫자만 남긴 guardian_phone_digits 앞부분 일치
+    - 그 외 → guardian_name ngram FULLTEXT (한 글자는 이름 앞부분 일치)
+
+    예전 검색(세 컬럼 '%검색어%')과 달리 접수 번호 뒷부분, 전화번호 가운데/끝자리로는 찾지 못한다.
+    그런 검색은 contains=True(관리자 화면 ?contains=1) 로 기존 부분 일치를 쓴다 (인덱스 없이 전체 스캔).
+    """
+    search = search.strip()
+    if contains:
+        term = f"%{_escape_like(search)}%"
+        return "(consultation_number LIKE %s OR guardian_name LIKE %s OR guardian_phone LIKE %s)", [term, term, term]
+    if _CONSULTATION_NUMBER.match(search):
+        return "consultation_number = %s", [search.upper()]
+    if _CONSULTATION_NUMBER_PREFIX.match(search):
+        return "consultation_number LIKE %s", [_escape_like(search.upper()) + "%"]
+    if _PHONE.match(search):
+        digits = re.sub(r"\D", "", search)
+        if digits:
+            return "guardian_phone_digits LIKE %s", [_escape_like(digits) + "%"]
+    term = search.replace('"', " ").strip()
+    if len(term) >= 2:
+        return "MATCH(guardian_name) AGAINST (%s IN BOOLEAN MODE)", [f'"{term}"']
+    return "guardian_name LIKE %s", [_escape_like(term) + "%"]
+
+
+def filter_conditions(search="", status="", urgency="", contains=False):
+    """admin_consultations / export 공통 필터 → (조건 목록, 파라미터)"""
+    conditions, params = [], []
+    if search:
+        condition, values = search_condition(search, contains)
+        conditions.append(condition)
+        params.extend(values)
+    if status:
+        conditions.append("status = %s")
+        params.append(status)
+    if urgency:
+        conditions.append("urgency = %s")
+        params.append(urgency)
+    return conditions, params
+
+
+# ==================== 커서 ====================
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str):
+    """(created_at, id) 또는 잘못된 값이면 None"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def page_size_arg(value) -> int:
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(MAX_PAGE_SIZE, size))
+
+
+def list_query(search="", status="", urgency="", cursor=None, page_size=DEFAULT_PAGE_SIZE, contains=False):
+    """(created_at, id) 키셋 페이지네이션 쿼리. 다음 페이지 확인용으로 page_size + 1 행을 가져온다.
+
+    page_size 가 None 이면 페이지 없이 전체 목록 (ADMIN_PAGINATION=0).
+    """
+    conditions, params = filter_conditions(search, status, urgency, contains)
+    after = decode_cursor(cursor) if cursor else None
+    if after:
+        conditions.append("(created_at < %s OR (created_at = %s AND id < %s))")
+        params.extend([after[0], after[0], after[1]])
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    query = f"SELECT {LIST_COLUMNS} FROM consultations{where} ORDER BY created_at DESC, id DESC"
+    if page_size is None:
+        return query, params
+    return query + " LIMIT %s", params + [page_size + 1]
+
+
+def split_page(rows, page_size):
+    """(현재 페이지 행, 다음 페이지 커서 또는 None)"""
+    if page_size is None or len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor(last["created_at"], last["id"])
+
+
+def export_query(kind="consultations", search="", status="", urgency="", contains=False):
+    """(컬럼, 쿼리, 파라미터) - admin_consultations 와 같은 필터, 정렬은 인덱스 순서"""
+    conditions, params = filter_conditions(search, status, urgency, contains)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    if kind == "transcripts":
+        # 필터에 맞는 상담을 신청한 사용자의 대화 전체 - 상담에는 대화 id 가 없으므로 사용자당 한 번만
+        # (상담이 여러 건이면 메시지가 그 수만큼 반복되지 않도록 접수 번호를 모아 한 행으로)
+        query = (
+            "SELECT cs.consultation_number, m.conversation_id, m.id AS message_id, m.sender, m.content, "
+            "m.used_gpt, m.matched_pattern, m.created_at "
+            "FROM (SELECT user_id, MAX(id) AS id, "
+            "GROUP_CONCAT(consultation_number ORDER BY id SEPARATOR ' ') AS consultation_number "
+            f"FROM consultations{where} GROUP BY user_id) AS cs "
+            "JOIN conversations c ON c.user_id = cs.user_id "
+            "JOIN messages m ON m.conversation_id = c.id "
+            "ORDER BY cs.id, m.conversation_id, m.id"
+        )
+        return TRANSCRIPT_COLUMNS, query, params
+    query = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM consultations{where} ORDER BY created_at DESC, id DESC"
+    return EXPORT_COLUMNS, query, params
@@ -0,0 +1,104 @@
+import threading
+import time
+from datetime import date
+
+# 한 번의 집계로 네 가지 카운트를 모두 구한다 (DATE(created_at) 대신 인덱스를 탈 수 있는 범위 조건)
+AGGREGATE_SQL = """
+    SELECT COUNT(*) AS total,
+           COALESCE(SUM(created_at >= CURDATE()), 0) AS today,
+           COALESCE(SUM(status = 'pending' AND urgency = 'urgent'), 0) AS urgent,
+           COALESCE(SUM(status = 'pending'), 0) AS pending
+    FROM consultations
+"""
+
+
+class ConsultationStats:
+    """관리자 대시보드 통계: 증분 카운터 + 주기적 DB 대조
+
+    save_consultation / update_status 가 on_created / on_status_changed 로 카운터를 바로 갱신하고,
+    reconcile_interval 초마다 한 번만 AGGREGATE_SQL 로 실제 값과 맞춘다
+    (다른 워커의 변경이나 직접 수정한 데이터 반영).
+    """
+
+    def __init__(self, load_counts, reconcile_interval=300.0):
+        self._load_counts = load_counts
+        self.reconcile_interval = reconcile_interval
+        self._lock = threading.Lock()
+        self._reconcile_lock = threading.Lock()
+        self._counts = None
+        self._day = None
+        self._reconciled_at = 0.0
+        self._metrics = {"reads": 0, "reconciles": 0, "reconcile_ms_total": 0.0, "last_reconcile_ms": 0.0,
+                         "incremental_updates": 0, "drift_corrections": 0}
+
+    def _roll_day(self):
+        today = date.today()
+        if self._day != today and self._counts is not None:
+            self._counts["today"] = 0
+        self._day = today
+
+    def reconcile(self):
+        with self._reconcile_lock:
+            started = time.perf_counter()
+            row = self._load_counts(AGGREGATE_SQL)
+            counts = {key: int(row[key]) for key in ("total", "today", "urgent", "pending")}
+            elapsed = (time.perf_counter() - started) * 1000
+            with self._lock:
+                if self._counts is not None and self._counts != counts:
+                    self._metrics["drift_corrections"] += 1
+                self._counts = counts
+                self._day = date.today()
+                self._reconciled_at = time.monotonic()
+                self._metrics["reconciles"] += 1
+                self._metrics["reconcile_ms_total"] += elapsed
+                self._metrics["last_reconcile_ms"] = elapsed
+
+    def snapshot(self) -> dict:
+        """대시보드용 카운트. 대조 주기가 지났거나 처음이면 DB 집계 1회"""
+        with self._lock:
+            stale = self._counts is None or time.monotonic() - self._reconciled_at >= self.reconcile_interval
+        if stale:
+            self.reconcile()
+        with self._lock:
+            self._roll_day()
+            self._metrics["reads"] += 1
+            return dict(self._counts)
+
+    def _apply(self, fn):
+        with self._lock:
+            if self._counts is None:
+                return  # 아직 한 번도 집계 전: 첫 snapshot 때 DB 에서 읽음
+            self._roll_day()
+            fn(self._counts)
+            self._metrics["incremental_updates"] += 1
+
+    def on_created(self, urgency: str, status: str = "pending"):
+        def apply(c):
+            c["total"] += 1
+            c["today"] += 1
+            if status == "pending":
+                c["pending"] += 1
+                if urgency == "urgent":
+                    c["urgent"] += 1
+        self._apply(apply)
+
+    def on_status_changed(self, old_status: str, new_status: str, urgency: str):
+        if old_status == new_status:
+            return
+
+        def apply(c):
+            delta = (new_status == "pending") - (old_status == "pending")
+            c["pending"] += delta
+            if urgency == "urgent":
+                c["urgent"] += delta
+        self._apply(apply)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["counts"] = dict(self._counts) if self._counts else None
+            metrics["age_s"] = round(time.monotonic() - self._reconciled_at, 1) if self._counts else None
+        metrics["reconcile_interval"] = self.reconcile_interval
+        metrics["reconcile_ms_total"] = round(metrics["reconcile_ms_total"], 3)
+        metrics["last_reconcile_ms"] = round(metrics["last_reconcile_ms"], 3)
+        return metrics
@@ -0,0 +1,156 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    """풀에서 정해진 시간 안에 커넥션을 빌리지 못함"""
+
+
+class ConnectionPool:
+    """스레드 안전 DB 커넥션 풀
+
+    요청마다 커넥션을 빌려 쓰고 돌려준다. 오래 쉬던 커넥션은 빌려주기 전에
+    헬스 체크를 하고, 끊김 오류가 난 커넥션은 버려서 다음 대여 때 새로 연결한다.
+    connect 는 새 DB-API 커넥션을 돌려주는 함수면 되므로 MySQL 대신 sqlite3 로도 쓸 수 있다.
+    disconnect_errors 는 예외 클래스 튜플 또는 그 튜플을 돌려주는 함수 (드라이버 import 를 첫 사용 때로 미룰 때).
+    """
+
+    def __init__(self, connect, size=5, timeout=10.0, health_check_interval=30.0,
+                 cursor_factory=None, disconnect_errors=()):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._cursor_factory = cursor_factory or (lambda conn: conn.cursor())
+        self._disconnect_errors = disconnect_errors if callable(disconnect_errors) else tuple(disconnect_errors)
+
+        self._idle = queue.LifoQueue()  # (conn, 마지막 반납 시각) - 최근 것부터 재사용
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._stats = {
+            "created": 0, "closed": 0, "in_use": 0, "borrows": 0, "timeouts": 0,
+            "health_checks": 0, "health_failures": 0, "broken": 0,
+            "wait_total_ms": 0.0, "wait_max_ms": 0.0,
+        }
+
+    # ---------- 내부 ----------
+    def _count(self, key, n=1):
+        with self._lock:
+            self._stats[key] += n
+
+    def _disconnect_error_types(self):
+        if callable(self._disconnect_errors):
+            self._disconnect_errors = tuple(self._disconnect_errors())
+        return self._disconnect_errors
+
+    def _create(self):
+        conn = self._connect()
+        self._count("created")
+        return conn
+
+    def _close(self, conn):
+        self._count("closed")
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, conn) -> bool:
+        self._count("health_checks")
+        try:
+            if hasattr(conn, "ping"):
+                conn.ping()
+            else:
+                cur = conn.cursor()
+                cur.execute("SELECT 1")
+                cur.fetchall()
+                cur.close()
+            return True
+        except Exception:
+            self._count("health_failures")
+            return False
+
+    def _acquire(self):
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            self._count("timeouts")
+            raise PoolTimeout(f"DB 커넥션 대기 {self.timeout}초 초과 (pool size={self.size})")
+        waited = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats["borrows"] += 1
+            self._stats["in_use"] += 1
+            self._stats["wait_total_ms"] += waited
+            self._stats["wait_max_ms"] = max(self._stats["wait_max_ms"], waited)
+
+        try:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._create()
+            if time.monotonic() - last_used >= self.health_check_interval and not self._healthy(conn):
+                self._close(conn)
+                return self._create()
+            return conn
+        except BaseException:
+            self._count("in_use", -1)
+            self._slots.release()
+            raise
+
+    def _release(self, conn, broken=False):
+        if broken:
+            self._count("broken")
+            self._close(conn)
+        else:
+            self._idle.put((conn, time.monotonic()))
+        self._count("in_use", -1)
+        self._slots.release()
+
+    # ---------- 공개 API ----------
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        broken = False
+        try:
+            yield conn
+        except self._disconnect_error_types():
+            broken = True
+            raise
+        except BaseException as e:
+            # GeneratorExit 등 (스트리밍 도중 클라이언트 연결 끊김): 읽지 않은 결과가 남아 있을 수 있으므로 버림
+            if not isinstance(e, Exception):
+                broken = True
+            raise
+        finally:
+            self._release(conn, broken)
+
+    @contextmanager
+    def cursor(self):
+        with self.connection() as conn:
+            cur = self._cursor_factory(conn)
+            try:
+                yield cur
+            finally:
+                try:
+                    cur.close()
+                except Exception:
+                    pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["size"] = self.size
+        stats["idle"] = self._idle.qsize()
+        stats["wait_avg_ms"] = round(stats["wait_total_ms"] / stats["borrows"], 3) if stats["borrows"] else 0.0
+        stats["wait_total_ms"] = round(stats["wait_total_ms"], 3)
+        stats["wait_max_ms"] = round(stats["wait_max_ms"], 3)
+        return stats
+
+    def close(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(conn)
@@ -0,0 +1,64 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+
+class DeadlineRunner:
+    """fn 을 워커 스레드에서 실행하고 정해진 시각(deadline)까지만 기다린다.
+
+    시간 안에 끝나면 결과를 바로 돌려주고, 넘기면 on_timeout() (예: 임시 답장) 을 부른 뒤
+    fn 이 끝나는 대로 워커 스레드에서 on_late(결과, 예외) (예: push 로 전달) 를 부른다.
+    워커가 모두 바쁘면 fn 은 큐에서 기다리며, 그 시간도 deadline 에 포함된다.
+    """
+
+    def __init__(self, workers=16, min_wait=0.05, name="deadline"):
+        self.min_wait = min_wait  # 기한이 이미 지났어도 캐시 적중처럼 바로 끝나는 호출은 이만큼 기다림
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._stats = {"on_time": 0, "late": 0, "late_completed": 0, "late_errors": 0,
+                       "callback_errors": 0, "in_flight_late": 0}
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self._stats[key] += n
+
+    def run(self, fn, deadline, on_timeout, on_late):
+        """(기한 안에 끝났는지, 결과) 반환. deadline 은 time.monotonic() 기준 시각.
+
+        기한 안에 fn 이 예외를 던지면 그대로 올린다. on_late 는 on_timeout 이 끝난 뒤에만 불리므로
+        임시 답장보다 늦은 답변이 먼저 나가지 않는다 (on_timeout 이 실패해도 on_late 는 불림).
+        """
+        future = self._pool.submit(fn)
+        try:
+            result = future.result(timeout=max(self.min_wait, deadline - time.monotonic()))
+        except FutureTimeout:
+            pass
+        else:
+            self._count("on_time")
+            return True, result
+
+        self._count("late")
+        self._count("in_flight_late")
+        try:
+            on_timeout()
+        finally:
+            future.add_done_callback(lambda f: self._deliver(f, on_late))
+        return False, None
+
+    def _deliver(self, future, on_late):
+        error = future.exception()
+        self._count("late_errors" if error is not None else "late_completed")
+        try:
+            on_late(None if error is not None else future.result(), error)
+        except Exception as e:
+            self._count("callback_errors")
+            print("❌ 늦은 결과 전달 실패:", e)
+        finally:
+            self._count("in_flight_late", -1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self, wait=True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+import zlib
+
+# 엑셀/스프레드시트가 수식으로 실행하는 첫 글자 (보호자 이름·상담 내용 등 사용자 입력)
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_chunk(rows, columns):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow([_csv_cell(row[c]) for c in columns])
+    return buf.getvalue()
+
+
+def _jsonl_chunk(rows, columns):
+    return "".join(json.dumps({c: row[c] for c in columns}, ensure_ascii=False, default=str) + "\n"
+                   for row in rows)
+
+
+def iter_export(batches, columns, fmt="csv", compress=False):
+    """batches(행 묶음 이터레이터)를 CSV/JSONL 바이트 청크로 바꿔 흘려보낸다.
+
+    헤더는 쿼리 결과를 기다리지 않고 바로 내보내고, 이후에는 묶음 하나씩만 메모리에 둔다.
+    compress=True 면 gzip 스트림으로 압축한다.
+    """
+    encode = _csv_chunk if fmt == "csv" else _jsonl_chunk
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def out(text):
+        data = text.encode("utf-8")
+        return gz.compress(data) if gz else data
+
+    if fmt == "csv":
+        # 엑셀에서 한글이 깨지지 않도록 BOM + 헤더
+        first = out("\ufeff" + _csv_chunk([dict(zip(columns, columns))], columns))
+    else:
+        first = out("")
+    # gzip 은 헤더만으로는 출력이 없을 수 있으므로 한 번 비워 첫 바이트를 바로 보냄
+    if gz:
+        first += gz.flush(zlib.Z_SYNC_FLUSH)
+    if first:
+        yield first
+
+    for rows in batches:
+        chunk = out(encode(rows, columns))
+        if chunk:
+            yield chunk
+    if gz:
+        yield gz.flush()
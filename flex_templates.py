@@ -0,0 +1,45 @@
+import json
+
+
+def encode(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _escape(value) -> bytes:
+    """JSON 문자열 안에 그대로 넣을 수 있게 이스케이프 (따옴표 제외)"""
+    return json.dumps(str(value), ensure_ascii=False)[1:-1].encode("utf-8")
+
+
+class MessageRegistry:
+    """시작 시 한 번 만든 LINE 메시지 페이로드 모음 (정적 Flex 는 미리 인코딩된 bytes 그대로 재사용)
+
+    값이 바뀌는 답장(완료 요약, GPT 답변 등)은 모두 텍스트라 text_message() 로 만든다.
+    """
+
+    def __init__(self):
+        self._encoded = {}
+
+    def register(self, name: str, message: dict) -> bytes:
+        encoded = self._encoded[name] = encode(message)
+        return encoded
+
+    def register_flex(self, name: str, alt_text: str, contents: dict) -> bytes:
+        return self.register(name, {"type": "flex", "altText": alt_text, "contents": contents})
+
+    def get(self, name: str) -> bytes:
+        return self._encoded[name]
+
+
+def text_message(text: str) -> bytes:
+    """텍스트 메시지 (값만 이스케이프해 이어 붙임 - dict 를 만들어 json.dumps 하지 않음)"""
+    return b'{"type":"text","text":"' + _escape(text) + b'"}'
+
+
+def reply_body(reply_token: str, messages) -> bytes:
+    """/v2/bot/message/reply 요청 본문 (인코딩된 메시지 bytes 를 이어 붙이기만 함)"""
+    return b'{"replyToken":"' + _escape(reply_token) + b'","messages":[' + b",".join(messages) + b"]}"
+
+
+def push_body(to: str, messages) -> bytes:
+    """/v2/bot/message/push 요청 본문"""
+    return b'{"to":"' + _escape(to) + b'","messages":[' + b",".join(messages) + b"]}"
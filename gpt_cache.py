@@ -0,0 +1,112 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+_SPACE = re.compile(r"\s+")
+_SPACE_NOT_BETWEEN_DIGITS = re.compile(r"(?<!\d) | (?!\d)")
+_TRAILING_PUNCT = re.compile(r"[\W_]+$")
+
+
+def normalize_prompt(text: str) -> str:
+    """캐시 키용 정규화: 전각/반각 통일, 소문자, 공백 제거, 끝의 문장부호 제거
+
+    '강아지 예방접종 언제?', '강아지예방 접종 언제 ?' 처럼 띄어쓰기나 끝 문장부호만 다른 질문을
+    같은 키로 모으기 위해 공백을 없앤다 (한국어는 띄어쓰기 변형이 흔함).
+    문장 안의 문장부호와 숫자 사이 공백은 남긴다 - '1.5kg'/'15kg', '3-4살'/'34살' 은 다른 질문.
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _SPACE_NOT_BETWEEN_DIGITS.sub("", _SPACE.sub(" ", text).strip())
+    return _TRAILING_PUNCT.sub("", text)
+
+
+def cache_key(prompt: str, system_prompt: str):
+    """정규화 후 내용이 없으면(문장부호만 있는 메시지 등) None - 캐시하지 않음"""
+    normalized = normalize_prompt(prompt)
+    if not normalized:
+        return None
+    raw = f"{system_prompt}\x00{normalized}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class GPTCache:
+    """GPT 답변 캐시: 메모리 LRU + TTL, 선택적으로 SQLite 파일에 영속화"""
+
+    def __init__(self, max_entries=1000, ttl=6 * 3600, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, answer)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS gpt_cache (key TEXT PRIMARY KEY, answer TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM gpt_cache WHERE expires_at < ?", (time.time(),))
+
+    def _remember(self, key, expires_at, answer):
+        self._entries[key] = (expires_at, answer)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, prompt: str, system_prompt: str = ""):
+        key = cache_key(prompt, system_prompt)
+        if key is None:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._stats["expired"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT answer, expires_at FROM gpt_cache WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row:
+                    self._remember(key, row[1], row[0])
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    return row[0]
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, prompt: str, system_prompt: str, answer: str):
+        key = cache_key(prompt, system_prompt)
+        if key is None:
+            return
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, answer)
+            self._stats["stores"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO gpt_cache (key, answer, expires_at) VALUES (?, ?, ?)",
+                    (key, answer, expires_at)
+                )
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["ttl"] = self.ttl
+        stats["persistent"] = self._db is not None
+        return stats
@@ -0,0 +1,195 @@
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# summary: 이전 대화 요약, turns: [(role, content)] (role 은 user / assistant), key: 문맥 해시 (문맥이 없으면 None)
+Context = namedtuple("Context", "summary turns tokens key")
+EMPTY_CONTEXT = Context("", (), 0, None)
+
+MESSAGE_OVERHEAD_TOKENS = 4  # chat 형식에서 메시지 1개에 붙는 토큰
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정 (토크나이저 없이): ASCII 는 4글자당 1, 한글 등 나머지는 글자당 1 - 실제보다 약간 크게 잡음"""
+    ascii_chars = sum(1 for ch in text if ch < "\x80")
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """앞에서부터 max_tokens 안에 들어가는 만큼만 남김"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    used, ascii_run = 0, 0
+    for i, ch in enumerate(text):
+        if ch < "\x80":
+            ascii_run += 1
+            cost = 1 if ascii_run % 4 == 1 else 0
+        else:
+            cost = 1
+        if used + cost > max_tokens:
+            return text[:i]
+        used += cost
+    return text
+
+
+def _role(sender: str) -> str:
+    return "user" if sender == "user" else "assistant"
+
+
+class ConversationContext:
+    """대화별 GPT 문맥: 최근 메시지 recent_messages 개 + 그보다 오래된 메시지의 누적 요약
+
+    - 최근 메시지는 load_recent(conversation_id, limit) 로 (conversation_id, id) 인덱스를 거꾸로 읽어 가져오고,
+      writer(MessageWriter) 에 아직 DB 에 쓰이지 않은 같은 대화의 메시지를 뒤에 붙인다.
+    - 창 밖으로 밀려난 메시지는 fold_every 번의 build 마다 모아서 summarize(이전 요약, turns) 로 요약에 더한다.
+      요약은 백그라운드에서 만들어 답장 경로의 지연에 더해지지 않는다 (그동안은 직전 요약 사용).
+    - 요약은 대화별로 메모리 LRU 에 (요약에 포함된 마지막 messages.id, 요약) 으로 둔다. 재시작 후에는
+      창 바로 앞의 fold_max 개 메시지만 다시 요약한다.
+    - 시스템 프롬프트 + 요약 + 최근 메시지 + 질문이 token_budget 을 넘으면 오래된 메시지부터 뺀다.
+    - matched_pattern 이 skip_patterns 인 메시지(상담 신청 입력/완료 요약 등 개인정보)는 넣지 않는다.
+      writer 의 미저장 행은 여기서 거르고, DB 에서 읽는 load_recent / load_before 도 같은 행을 빼고 돌려줘야 한다.
+    """
+
+    def __init__(self, load_recent, load_before, summarize, writer=None, skip_patterns=(), recent_messages=8,
+                 token_budget=1200, summary_tokens=200, fold_every=3, fold_max=40, cache_size=10000, workers=2,
+                 flush_wait_ms=50):
+        self._load_recent = load_recent
+        self._load_before = load_before
+        self._summarize = summarize
+        self.writer = writer
+        self.skip_patterns = frozenset(skip_patterns)
+        self.recent_messages = recent_messages
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.fold_every = fold_every
+        self.fold_max = fold_max
+        self.cache_size = cache_size
+        self.flush_wait = flush_wait_ms / 1000
+        self._summaries = OrderedDict()  # conversation_id → {"upto": id, "summary": str, "stale": n}
+        self._folding = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gpt-summary")
+        self._stats = {"builds": 0, "unsaved_used": 0, "retries": 0, "unsaved_skipped": 0, "turns_dropped": 0,
+                       "folds": 0, "fold_errors": 0, "folded_messages": 0}
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self._stats[key] += n
+
+    # ---------- 최근 메시지 ----------
+    def _recent(self, conversation_id):
+        """[(id 또는 None(아직 저장 안 됨), sender, content)] 오래된 순, 최대 recent_messages 개"""
+        limit = self.recent_messages
+        if self.writer is None:
+            return list(self._load_recent(conversation_id, limit))
+        match = lambda row: row[0] == conversation_id and row[4] not in self.skip_patterns
+        for attempt in range(2):
+            unsaved, before = self.writer.unsaved(match)
+            rows = list(self._load_recent(conversation_id, limit))
+            after = self.writer.generation
+            if before == after and before % 2 == 0:
+                break
+            self._count("retries")
+            # 바로 다시 읽으면 같은 flush 와 또 겹치므로 그 flush 가 끝날 때까지 잠깐 기다림
+            self.writer.wait_idle(self.flush_wait)
+        else:
+            self._count("unsaved_skipped")
+            unsaved = []  # 계속 flush 중이면 겹치지 않도록 DB 에 있는 것만 사용
+        if unsaved:
+            self._count("unsaved_used")
+        rows.extend((None, sender, content) for _, sender, content, _, _ in unsaved)
+        return rows[-limit:]
+
+    # ---------- 요약 ----------
+    def _summary_entry(self, conversation_id, window_full, oldest_id):
+        with self._lock:
+            entry = self._summaries.get(conversation_id)
+            if entry is None:
+                # 처음 보는 대화(또는 재시작 후): 창이 꽉 찼으면 더 오래된 메시지가 있을 수 있으니 바로 요약
+                entry = {"upto": 0, "summary": "", "stale": self.fold_every if window_full else 0}
+                self._summaries[conversation_id] = entry
+                while len(self._summaries) > self.cache_size:
+                    self._summaries.popitem(last=False)
+            else:
+                self._summaries.move_to_end(conversation_id)
+                if oldest_id is not None and oldest_id > entry["upto"] + 1 and window_full:
+                    entry["stale"] += 1
+            fold = (oldest_id is not None and entry["stale"] >= self.fold_every
+                    and conversation_id not in self._folding)
+            if fold:
+                self._folding.add(conversation_id)
+                entry["stale"] = 0
+            return entry["summary"], fold
+
+    def _fold(self, conversation_id, oldest_id):
+        """창 앞쪽(요약 이후 ~ oldest_id 전)의 메시지를 요약에 더함 (백그라운드)"""
+        try:
+            with self._lock:
+                entry = self._summaries.get(conversation_id) or {"upto": 0, "summary": "", "stale": 0}
+                upto, previous = entry["upto"], entry["summary"]
+            rows = list(self._load_before(conversation_id, upto, oldest_id, self.fold_max))
+            if not rows:
+                return
+            turns = [(_role(sender), content) for _, sender, content in rows]
+            summary = truncate_tokens(self._summarize(previous, turns), self.summary_tokens)
+            with self._lock:
+                current = self._summaries.get(conversation_id)
+                if current is not None:  # 그 사이에 forget 된 대화는 되살리지 않음
+                    current["upto"], current["summary"] = rows[-1][0], summary
+                self._stats["folds"] += 1
+                self._stats["folded_messages"] += len(rows)
+        except Exception as e:
+            self._count("fold_errors")
+            print("❌ 대화 요약 실패:", e)
+        finally:
+            with self._lock:
+                self._folding.discard(conversation_id)
+
+    # ---------- 문맥 ----------
+    def build(self, conversation_id, prompt: str, system_prompt: str = "") -> Context:
+        """prompt(이번 사용자 메시지) 에 붙일 문맥. 이미 저장된 이번 메시지는 최근 메시지에서 뺀다."""
+        self._count("builds")
+        if self.recent_messages <= 0:
+            return EMPTY_CONTEXT
+        rows = self._recent(conversation_id)
+        window_full = len(rows) >= self.recent_messages
+        if rows and rows[-1][1] == "user" and rows[-1][2] == prompt:
+            rows = rows[:-1]
+        rows = [row for row in rows if not (row[1] == "user" and row[2].startswith("[POSTBACK]"))]
+
+        oldest_id = next((row[0] for row in rows if row[0] is not None), None)
+        summary, fold = self._summary_entry(conversation_id, window_full, oldest_id)
+        if fold:
+            self._pool.submit(self._fold, conversation_id, oldest_id)
+
+        fixed = (estimate_tokens(system_prompt) + estimate_tokens(prompt) + estimate_tokens(summary)
+                 + 2 * MESSAGE_OVERHEAD_TOKENS)
+        turns, tokens = [], fixed
+        for _, sender, content in reversed(rows):  # 최근 메시지부터 예산 안에서
+            cost = estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+            if tokens + cost > self.token_budget:
+                self._count("turns_dropped", len(rows) - len(turns))
+                break
+            turns.append((_role(sender), content))
+            tokens += cost
+        turns.reverse()
+
+        if not summary and not turns:
+            return Context("", (), tokens, None)
+        raw = summary + "\x00" + "\x00".join(f"{role}\x01{content}" for role, content in turns)
+        return Context(summary, tuple(turns), tokens, hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16])
+
+    def forget(self, conversation_id):
+        with self._lock:
+            self._summaries.pop(conversation_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached_summaries"] = len(self._summaries)
+            stats["folding"] = len(self._folding)
+        return stats
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
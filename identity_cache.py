@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _LRU:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key, now):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, value, now):
+        self.entries[key] = (now + self.ttl, value)
+        self.entries.move_to_end(key)
+        evicted = []
+        while len(self.entries) > self.max_entries:
+            evicted.append(self.entries.popitem(last=False))
+        return evicted
+
+
+class IdentityCache:
+    """line_user_id → users.id, users.id → 열린 conversations.id 캐시
+
+    캐시에 있으면 DB 왕복 없이 ID 를 돌려주고, last_seen 갱신은 모아 두었다가
+    flush_interval 초마다 flush_last_seen(line_user_ids) 한 번으로 처리한다.
+    다른 워커가 대화를 닫을 수 있으므로 ttl 이 지나면 DB 에서 다시 읽는다.
+    """
+
+    def __init__(self, max_entries=10000, ttl=300, flush_last_seen=None, flush_interval=30.0):
+        self._users = _LRU(max_entries, ttl)
+        self._conversations = _LRU(max_entries, ttl)
+        self._conversation_owner = {}  # conversation_id -> user_id (무효화용 역방향 맵)
+        self._lock = threading.Lock()
+        self._seen = set()
+        self._flush_last_seen = flush_last_seen
+        self._stats = {"user_hits": 0, "user_misses": 0, "conversation_hits": 0, "conversation_misses": 0,
+                       "invalidations": 0, "last_seen_flushes": 0, "last_seen_rows": 0}
+
+        if flush_last_seen is not None:
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(flush_interval,),
+                                            name="last-seen-flusher", daemon=True)
+            self._thread.start()
+
+    def user_id(self, line_user_id: str, load) -> int:
+        """캐시 적중 시 last_seen 갱신만 예약, 아니면 load(line_user_id) 로 DB 에서 조회"""
+        now = time.time()
+        with self._lock:
+            user_id = self._users.get(line_user_id, now)
+            if user_id is not None:
+                self._stats["user_hits"] += 1
+                self._seen.add(line_user_id)
+                return user_id
+            self._stats["user_misses"] += 1
+        user_id = load(line_user_id)
+        with self._lock:
+            self._users.put(line_user_id, user_id, now)
+        return user_id
+
+    def conversation_id(self, user_id: int, load) -> int:
+        now = time.time()
+        with self._lock:
+            conversation_id = self._conversations.get(user_id, now)
+            if conversation_id is not None:
+                self._stats["conversation_hits"] += 1
+                return conversation_id
+            self._stats["conversation_misses"] += 1
+        conversation_id = load(user_id)
+        with self._lock:
+            for _, (_, evicted_id) in self._conversations.put(user_id, conversation_id, now):
+                self._conversation_owner.pop(evicted_id, None)
+            self._conversation_owner[conversation_id] = user_id
+        return conversation_id
+
+    def invalidate_conversation(self, conversation_id: int):
+        """대화가 닫히면 호출: 다음 이벤트에서 열린 대화를 DB 에서 다시 찾는다."""
+        with self._lock:
+            user_id = self._conversation_owner.pop(conversation_id, None)
+            if user_id is not None:
+                self._conversations.entries.pop(user_id, None)
+                self._stats["invalidations"] += 1
+
+    def flush(self) -> int:
+        if self._flush_last_seen is None:
+            return 0
+        with self._lock:
+            seen, self._seen = self._seen, set()
+        if not seen:
+            return 0
+        try:
+            self._flush_last_seen(sorted(seen))
+        except Exception as e:
+            with self._lock:
+                self._seen |= seen
+            print("❌ last_seen 일괄 갱신 오류:", e)
+            return 0
+        with self._lock:
+            self._stats["last_seen_flushes"] += 1
+            self._stats["last_seen_rows"] += len(seen)
+        return len(seen)
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            self.flush()
+
+    def close(self):
+        if self._flush_last_seen is not None:
+            self._stop.set()
+            self._thread.join()
+            self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["users"] = len(self._users.entries)
+            stats["conversations"] = len(self._conversations.entries)
+            stats["pending_last_seen"] = len(self._seen)
+        return stats
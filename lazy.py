@@ -0,0 +1,46 @@
+import threading
+import time
+
+
+class Lazy:
+    """처음 get() 할 때 factory() 로 만드는 객체 (스레드 안전)
+
+    만들다 실패하면 예외를 그대로 올리고 error 에 남겨 두며, 다음 get() 때 다시 시도한다.
+    status() 로 준비 여부(warm)와 생성에 걸린 시간을 볼 수 있다 (/ready).
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self._factory = factory
+        self._value = None
+        self._warm = False
+        self._lock = threading.Lock()
+        self.init_ms = None
+        self.initialized_at = None
+        self.error = None
+        self.attempts = 0
+
+    @property
+    def warm(self) -> bool:
+        return self._warm
+
+    def get(self):
+        if self._warm:
+            return self._value
+        with self._lock:
+            if not self._warm:
+                self.attempts += 1
+                started = time.perf_counter()
+                try:
+                    self._value = self._factory()
+                except Exception as e:
+                    self.error = f"{type(e).__name__}: {e}"
+                    raise
+                self.init_ms = round((time.perf_counter() - started) * 1000, 3)
+                self.initialized_at = time.time()
+                self.error = None
+                self._warm = True
+        return self._value
+
+    def status(self) -> dict:
+        return {"warm": self._warm, "init_ms": self.init_ms, "attempts": self.attempts, "error": self.error}
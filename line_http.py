@@ -0,0 +1,151 @@
+import random
+import threading
+import time
+import uuid
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 잠깐 기다렸다 다시 보내면 성공할 수 있는 응답
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+# 재시도해도 중복 발송되지 않도록 X-Line-Retry-Key 를 붙이는 API (답장은 replyToken 이 1회용이라 불필요)
+RETRY_KEY_PATHS = ("/v2/bot/message/push", "/v2/bot/message/multicast",
+                   "/v2/bot/message/narrowcast", "/v2/bot/message/broadcast")
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP 날짜) → 기다릴 초, 없거나 잘못된 값이면 None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LineSession:
+    """LINE API 공용 HTTP 세션
+
+    - 호스트별 keep-alive 커넥션 풀 (요청마다 TCP/TLS 연결을 새로 맺지 않음)
+    - 호출 1건의 전체 시간 한도(deadline): 재시도 대기까지 포함해 넘지 않음
+    - 429/5xx/연결 오류는 지수 백오프 + full jitter 로 재시도, Retry-After 가 있으면 그 값을 따름
+    - push 계열은 X-Line-Retry-Key 를 붙여 재시도해도 한 번만 발송
+    """
+
+    def __init__(self, pool_size=10, connect_timeout=3.0, read_timeout=5.0, deadline=10.0,
+                 max_retries=3, backoff_base=0.2, backoff_max=2.0):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        # urllib3 자체 재시도는 끄고 여기서 deadline 안에서만 재시도
+        self._adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0, "attempts": 0, "retries": 0, "failures": 0,
+            "retry_429": 0, "retry_5xx": 0, "retry_connection": 0, "retry_timeout": 0,
+            "retry_after_waits": 0, "retry_wait_total_ms": 0.0,
+        }
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self._stats[key] += n
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+    def request(self, method, url, headers=None, data=None, timeout=None, deadline=None, **kwargs):
+        """requests.Response 를 돌려준다. 재시도를 다 써도 실패 응답이면 마지막 응답, 연결 오류면 예외."""
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        read_timeout = timeout if isinstance(timeout, (int, float)) else self.read_timeout
+        headers = dict(headers or {})
+        if method == "POST" and url.endswith(RETRY_KEY_PATHS):
+            headers.setdefault("X-Line-Retry-Key", str(uuid.uuid4()))
+        # 파일 업로드 등 스트림 본문은 재시도 전에 처음 위치로 되돌림
+        rewind = data.tell() if hasattr(data, "seek") and hasattr(data, "tell") else None
+
+        self._count("calls")
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = deadline_at - time.monotonic()
+            if rewind is not None:
+                data.seek(rewind)
+            self._count("attempts")
+            try:
+                response = self.session.request(
+                    method, url, headers=headers, data=data,
+                    timeout=(max(0.001, min(self.connect_timeout, remaining)), max(0.001, min(read_timeout, remaining))),
+                    **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                reason = "retry_timeout" if isinstance(e, requests.Timeout) else "retry_connection"
+                wait = self._backoff(attempt)
+                if attempt > self.max_retries or time.monotonic() + wait >= deadline_at:
+                    self._count("failures")
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS:
+                    return response
+                reason = "retry_429" if response.status_code == 429 else "retry_5xx"
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                wait = self._backoff(attempt) if retry_after is None else retry_after
+                if attempt > self.max_retries or time.monotonic() + wait >= deadline_at:
+                    self._count("failures")
+                    return response
+                if retry_after is not None:
+                    self._count("retry_after_waits")
+                response.close()
+
+            with self._lock:
+                self._stats["retries"] += 1
+                self._stats[reason] += 1
+                self._stats["retry_wait_total_ms"] += wait * 1000
+            time.sleep(wait)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def _pool_counts(self):
+        """(새로 맺은 연결 수, 보낸 요청 수) - urllib3 커넥션 풀 기준"""
+        opened = sent = 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                sent += pool.num_requests
+        return opened, sent
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        opened, sent = self._pool_counts()
+        stats["connections_opened"] = opened
+        stats["connection_reuse_ratio"] = round(1 - opened / sent, 3) if sent else 0.0
+        stats["retry_wait_total_ms"] = round(stats["retry_wait_total_ms"], 3)
+        return stats
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,270 @@
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows (개발용 단일 프로세스)
+    fcntl = None
+
+
+class MessageWriter:
+    """대화 메시지 write-behind 버퍼
+
+    append() 는 메모리 큐에 넣기만 하고 바로 반환한다. 백그라운드 스레드가
+    flush_rows 개가 모이거나 flush_interval_ms 가 지나면 write_batch(rows) 로 한꺼번에 저장한다.
+
+    journal_path 를 주면 아직 저장되지 않은 행을 JSON Lines 로 남겨 두고,
+    프로세스가 죽은 뒤 다시 시작할 때 replay() 로 버퍼에 다시 넣는다 (시작 시 DB 에 접속하지 않음).
+    저널은 journal_max_bytes 를 넘으면 더 쓰지 않는다 (메모리 버퍼는 그대로 유지).
+    gunicorn 처럼 여러 프로세스가 같은 journal_path 를 받으면 각자 잠글 수 있는 첫 번호의 파일
+    (journal_path, journal_path.1, journal_path.2, …) 을 쓰므로, 재시작한 프로세스는 죽은 프로세스가 남긴 저널을 이어받는다.
+
+    unsaved() 는 아직 DB 에 커밋되지 않은 행(flush 중인 행 포함)을 돌려준다 (GPT 문맥에 방금 쓴 메시지 포함).
+
+    DB 장애로 버퍼가 max_pending 개에 이르면 append() 는 그 행을 버리고 False 를 반환한다 (요청 스레드가
+    DB 를 기다리며 멈추지 않음). 저장이 실패하면 flush_interval_ms 부터 max_backoff_ms 까지 두 배씩 늘려 다시 시도한다.
+    """
+
+    def __init__(self, write_batch, flush_rows=100, flush_interval_ms=500, max_pending=10000,
+                 journal_path=None, journal_max_bytes=16 * 1024 * 1024, max_backoff_ms=30000):
+        self._write_batch = write_batch
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self.max_backoff = max_backoff_ms / 1000
+        self.journal_max_bytes = journal_max_bytes
+        self._journal_lock = None
+        self.journal_path = self._claim_journal(journal_path) if journal_path else None
+
+        self._pending = []
+        self._in_flight = []  # flush 중인 행 (커밋되기 전까지 unsaved() 에 포함)
+        self._generation = 0  # flush 를 시작하고 끝낼 때마다 1씩 증가 (홀수면 flush 중)
+        self._cond = threading.Condition()
+        self._idle = threading.Condition(self._cond)  # 같은 잠금, flush 가 끝날 때만 깨움 (wait_idle)
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._failed_in_row = 0  # 연속으로 실패한 flush 수 (백오프)
+        self._journal = None
+        self._journal_bytes = 0
+        self._stats = {"appended": 0, "flushed": 0, "flushes": 0, "failures": 0,
+                       "rejected": 0, "journal_skipped": 0, "replayed": 0, "flush_ms_total": 0.0}
+
+        if journal_path:
+            self.replay()
+
+        self._thread = threading.Thread(target=self._run, name="message-writer", daemon=True)
+        self._thread.start()
+
+    # ---------- 저널 ----------
+    def _claim_journal(self, path, max_slots=64):
+        """다른 살아 있는 프로세스가 쓰지 않는 저널 경로를 잠그고 돌려준다 (프로세스가 죽으면 잠금은 자동으로 풀림)"""
+        if fcntl is None:
+            return path
+        for slot in range(max_slots):
+            candidate = path if slot == 0 else f"{path}.{slot}"
+            lock = open(f"{candidate}.lock", "a")
+            try:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock.close()
+                continue
+            self._journal_lock = lock
+            return candidate
+        raise RuntimeError(f"메시지 저널 {path} 을(를) 쓸 수 있는 번호가 없습니다 (프로세스 {max_slots}개 초과)")
+
+    def _trim_flushing(self, rows):
+        """일부 묶음이 커밋된 뒤 실패하면 .flushing 저널을 아직 저장되지 않은 rows 만으로 교체 (재시작 때 중복 방지)"""
+        tmp_path = f"{self.journal_path}.replay"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._flushing_path)
+
+    @property
+    def _flushing_path(self):
+        return f"{self.journal_path}.flushing"
+
+    def replay(self):
+        """이전 실행에서 저장하지 못한 저널 행을 버퍼에 다시 넣고 저널을 연다 (저장은 백그라운드 flush 가 함).
+
+        DB 가 아직 준비되지 않았어도 시작할 수 있고, 저장에 실패하면 일반 행처럼 다시 시도한다.
+        """
+        rows, lines = [], []
+        for path in (self._flushing_path, self.journal_path):
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            rows.append(tuple(json.loads(line)))
+                        except ValueError:
+                            continue  # 죽기 직전에 반쯤 쓰인 마지막 줄
+                        lines.append(line if line.endswith("\n") else line + "\n")
+        if rows:
+            # 복구할 행만 남긴 저널로 원자적으로 교체한 뒤 .flushing 제거
+            tmp_path = f"{self.journal_path}.replay"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.journal_path)
+            self._pending.extend(rows)
+            self._journal_bytes = sum(len(line) for line in lines)
+            self._stats["replayed"] += len(rows)
+            print(f"✅ 메시지 저널 복구: {len(rows)}건 (백그라운드 저장)")
+        elif os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        if os.path.exists(self._flushing_path):
+            os.remove(self._flushing_path)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def _journal_write(self, row):
+        if self._journal is None:
+            return
+        line = json.dumps(row, ensure_ascii=False) + "\n"
+        if self._journal_bytes + len(line) > self.journal_max_bytes:
+            self._stats["journal_skipped"] += 1
+            return
+        self._journal.write(line)
+        self._journal.flush()
+        self._journal_bytes += len(line)
+
+    def _rotate_journal(self):
+        """지금까지의 저널을 .flushing 으로 옮기고 새 저널을 연다 (cond 잠금 안에서 호출)"""
+        if self._journal is None:
+            return
+        self._journal.close()
+        if os.path.exists(self._flushing_path):
+            # 이전 flush 가 실패해 남아 있으면 이어 붙인다
+            with open(self.journal_path, encoding="utf-8") as src, \
+                    open(self._flushing_path, "a", encoding="utf-8") as dst:
+                dst.write(src.read())
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, self._flushing_path)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal_bytes = 0
+
+    # ---------- 쓰기 ----------
+    def append(self, row) -> bool:
+        """버퍼에 넣었으면 True, 버퍼가 가득 차서(DB 장애가 길어짐) 버렸으면 False"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MessageWriter 가 이미 종료되었습니다")
+            if len(self._pending) >= self.max_pending:
+                # 여기서 직접 flush 하면 모든 요청 스레드가 DB 연결 timeout 만큼 줄줄이 멈추므로 버림
+                self._stats["rejected"] += 1
+                return False
+            self._pending.append(row)
+            self._journal_write(row)
+            self._stats["appended"] += 1
+            if len(self._pending) >= self.flush_rows:
+                self._cond.notify()
+        return True
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._cond:
+                rows, self._pending = self._pending, []
+                if not rows:
+                    return 0
+                self._rotate_journal()
+                self._in_flight = rows
+                self._generation += 1
+
+            started = time.perf_counter()
+            committed = 0
+            try:
+                for i in range(0, len(rows), self.flush_rows):
+                    self._write_batch(rows[i:i + self.flush_rows])
+                    committed = i + self.flush_rows
+            except Exception as e:
+                # 묶음마다 따로 커밋되므로 실패한 묶음부터만 버퍼 앞쪽으로 되돌리고 다음 주기에 다시 시도
+                # (.flushing 저널도 같은 행만 남김)
+                remaining = rows[committed:]
+                if committed and self._journal is not None and os.path.exists(self._flushing_path):
+                    self._trim_flushing(remaining)
+                with self._cond:
+                    self._pending[:0] = remaining
+                    self._in_flight = []
+                    self._generation += 1
+                    self._idle.notify_all()
+                    self._failed_in_row += 1
+                    self._stats["flushed"] += committed
+                    self._stats["failures"] += 1
+                print("❌ 메시지 일괄 저장 오류:", e)
+                return committed
+
+            if self._journal is not None and os.path.exists(self._flushing_path):
+                os.remove(self._flushing_path)
+            with self._cond:
+                self._in_flight = []
+                self._generation += 1
+                self._idle.notify_all()
+                self._failed_in_row = 0
+                self._stats["flushed"] += len(rows)
+                self._stats["flushes"] += 1
+                self._stats["flush_ms_total"] += (time.perf_counter() - started) * 1000
+            return len(rows)
+
+    def unsaved(self, match=None):
+        """(아직 DB 에 커밋되지 않은 행 중 match(row) 인 것을 추가된 순서대로, 세대 번호)
+
+        DB 를 읽기 전에 이것을 부르고, 읽은 뒤 generation 이 같은 짝수면 그 사이에 flush 가 없었으므로
+        두 결과에 겹치거나 빠진 행이 없다.
+        """
+        with self._cond:
+            rows = self._in_flight + self._pending
+            return [row for row in rows if match is None or match(row)], self._generation
+
+    @property
+    def generation(self) -> int:
+        with self._cond:
+            return self._generation
+
+    def wait_idle(self, timeout) -> bool:
+        """진행 중인 flush 가 끝날 때까지 최대 timeout 초 대기 (끝났으면 True)"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._generation % 2 == 0, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and self._failed_in_row:
+                    # 실패한 뒤에는 버퍼가 차 있어도 백오프만큼 기다림 (종료할 때만 바로 깨어남)
+                    delay = min(self.flush_interval * 2 ** self._failed_in_row, self.max_backoff)
+                    self._cond.wait_for(lambda: self._closed, delay)
+                elif not self._closed and len(self._pending) < self.flush_rows:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def close(self):
+        """남은 메시지를 모두 저장하고 종료한다."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+        if self._journal is not None:
+            self._journal.close()
+            if not self._pending and os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+        if self._journal_lock is not None:
+            self._journal_lock.close()
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending)
+            stats["journal_bytes"] = self._journal_bytes
+            stats["journal_path"] = self.journal_path
+        stats["avg_batch"] = round(stats["flushed"] / stats["flushes"], 1) if stats["flushes"] else 0.0
+        stats["flush_ms_total"] = round(stats["flush_ms_total"], 3)
+        return stats
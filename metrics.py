@@ -0,0 +1,216 @@
+import bisect
+import functools
+import json
+import threading
+import time
+
+# 초 단위 (1ms ~ 10s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, n=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + n
+
+    def values(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self.values().items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (관측 1건 = bisect + 정수 증가)"""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [버킷별 개수(누적 아님)…, +Inf 개수, 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def summary(self) -> dict:
+        """labels → {"count", "sum"}"""
+        with self._lock:
+            return {labels: {"count": s[-1], "sum": s[-2]} for labels, s in self._series.items()}
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {labels: list(s) for labels, s in self._series.items()}
+        for labels, s in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), s):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(s[-2])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {s[-1]}"
+
+
+class Gauge:
+    """scrape 할 때 fn() 을 불러 현재 값을 읽는다. (다른 모듈이 세는 누적 값은 kind="counter")"""
+
+    def __init__(self, name, help_text, fn, kind="gauge"):
+        self.name = name
+        self.help = help_text
+        self._fn = fn
+        self.kind = kind
+
+    def render(self):
+        try:
+            value = self._fn()
+        except Exception:
+            return
+        if value is None:
+            return
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield f"{self.name} {_number(value)}"
+
+
+class Metrics:
+    """단계별 지연 히스토그램 + 카운터를 모아 Prometheus 텍스트 형식으로 내보낸다.
+
+    timed(stage) 로 감싼 함수는 petbot_stage_seconds{stage=…} 에 기록되고,
+    event(type) 로 감싼 이벤트 핸들러 안에서 호출되면 그 이벤트의 단계별 시간에도 더해진다.
+    이벤트 전체가 slow_event_ms 를 넘으면 단계별 시간과 함께 로그를 남긴다 (0 이면 끔).
+    """
+
+    def __init__(self, prefix="petbot", slow_event_ms=0.0, log=print):
+        self.prefix = prefix
+        self.slow_event_ms = slow_event_ms
+        self._log = log
+        self._metrics = []
+        self._names = set()
+        self._trace = threading.local()
+
+        self.stage_seconds = self.histogram("stage_seconds", "단계별 처리 시간(초)", ("stage",))
+        self.stage_errors = self.counter("stage_errors_total", "단계별 예외 수", ("stage",))
+        self.event_seconds = self.histogram("event_seconds", "LINE 이벤트 1건 처리 시간(초)", ("type",))
+        self.slow_events = self.counter("slow_events_total", "slow_event_ms 를 넘은 이벤트 수", ("type",))
+
+    # ---------- 등록 ----------
+    def _register(self, metric):
+        if metric.name in self._names:
+            raise ValueError(f"이미 등록된 지표: {metric.name}")
+        self._names.add(metric.name)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self._register(Counter(f"{self.prefix}_{name}", help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(f"{self.prefix}_{name}", help_text, labelnames, buckets))
+
+    def gauge(self, name, help_text, fn) -> Gauge:
+        return self._register(Gauge(f"{self.prefix}_{name}", help_text, fn))
+
+    def counter_func(self, name, help_text, fn) -> Gauge:
+        return self._register(Gauge(f"{self.prefix}_{name}", help_text, fn, kind="counter"))
+
+    # ---------- 계측 ----------
+    def record(self, stage: str, seconds: float):
+        self.stage_seconds.observe(seconds, stage)
+        stages = getattr(self._trace, "stages", None)
+        if stages is not None:
+            stages.append((stage, seconds))
+
+    def timed(self, stage: str):
+        """함수 실행 시간을 stage 이름으로 기록하는 데코레이터"""
+
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                except Exception:
+                    self.stage_errors.inc(stage)
+                    raise
+                finally:
+                    self.record(stage, time.perf_counter() - started)
+
+            return wrapper
+
+        return decorator
+
+    def event(self, event_type: str):
+        """LINE 이벤트 핸들러용 데코레이터.
+
+        linebot 의 WebhookHandler 는 getfullargspec 으로 인자 개수를 보고 (event) 또는
+        (event, destination) 으로 호출하므로 래퍼도 인자를 event 하나만 받는다.
+        """
+
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(event):
+                outer = getattr(self._trace, "stages", None)
+                self._trace.stages = stages = []
+                started = time.perf_counter()
+                try:
+                    return fn(event)
+                finally:
+                    elapsed = time.perf_counter() - started
+                    self._trace.stages = outer
+                    self.event_seconds.observe(elapsed, event_type)
+                    if self.slow_event_ms and elapsed * 1000 >= self.slow_event_ms:
+                        self.slow_events.inc(event_type)
+                        self._log_slow(event_type, elapsed, stages)
+
+            return wrapper
+
+        return decorator
+
+    def _log_slow(self, event_type, elapsed, stages):
+        detail = [[stage, round(seconds * 1000, 1)] for stage, seconds in stages]
+        self._log(f"🐢 느린 이벤트 {event_type} {elapsed * 1000:.0f}ms " + json.dumps(detail, ensure_ascii=False))
+
+    # ---------- 출력 ----------
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
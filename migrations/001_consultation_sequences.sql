@@ -0,0 +1,19 @@
+-- 접수 번호 일별 순번 카운터 (generate_consultation_number 에서 사용)
+-- 기존: SELECT COUNT(*) … WHERE DATE(created_at) = CURDATE() → 인덱스를 못 타고, 동시 접수 시 번호 중복
+CREATE TABLE IF NOT EXISTS consultation_sequences (
+    seq_date DATE NOT NULL PRIMARY KEY,
+    last_value INT UNSIGNED NOT NULL
+) ENGINE=InnoDB;
+
+-- 배포 당일 이미 발급된 번호와 겹치지 않도록 오늘 순번을 기존 건수로 맞춤
+INSERT INTO consultation_sequences (seq_date, last_value)
+SELECT seq_date, cnt FROM (
+    SELECT CURDATE() AS seq_date, COUNT(*) AS cnt FROM consultations
+    WHERE created_at >= CURDATE() AND created_at < CURDATE() + INTERVAL 1 DAY
+) AS today
+WHERE cnt > 0
+ON DUPLICATE KEY UPDATE last_value = GREATEST(consultation_sequences.last_value, today.cnt);
+
+-- 번호 중복을 DB 차원에서도 막음 (기존 데이터에 중복이 있으면 먼저 정리 필요:
+--   SELECT consultation_number, COUNT(*) FROM consultations GROUP BY 1 HAVING COUNT(*) > 1;)
+ALTER TABLE consultations ADD UNIQUE INDEX uq_consultations_number (consultation_number);
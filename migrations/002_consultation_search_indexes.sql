@@ -0,0 +1,20 @@
+-- /admin/consultations 키셋 페이지네이션과 검색용 인덱스
+
+-- 목록 정렬 (created_at DESC, id DESC) 및 상태/긴급도 필터 + 정렬
+ALTER TABLE consultations
+    ADD INDEX idx_consultations_created (created_at, id),
+    ADD INDEX idx_consultations_status_created (status, created_at, id),
+    ADD INDEX idx_consultations_urgency_created (urgency, created_at, id);
+
+-- 연락처: 숫자만 남긴 생성 컬럼의 앞부분 검색 ('010-1234' → '0101234%')
+ALTER TABLE consultations
+    ADD COLUMN guardian_phone_digits VARCHAR(32)
+        GENERATED ALWAYS AS (REGEXP_REPLACE(guardian_phone, '[^0-9]', '')) STORED,
+    ADD INDEX idx_consultations_phone_digits (guardian_phone_digits);
+
+-- 보호자 이름: ngram FULLTEXT (2글자 이상), 한 글자 검색은 앞부분 일치
+ALTER TABLE consultations
+    ADD FULLTEXT INDEX ft_consultations_guardian_name (guardian_name) WITH PARSER ngram,
+    ADD INDEX idx_consultations_guardian_name (guardian_name);
+
+-- 접수 번호 정확히 일치는 migrations/001 의 uq_consultations_number 사용
@@ -0,0 +1,3 @@
+-- GPT 대화 문맥: 대화별 최근 메시지 / 요약할 구간 조회 (load_recent_messages, load_messages_between)
+-- WHERE conversation_id = ? [AND id 범위] ORDER BY id DESC LIMIT n 을 인덱스 역순 스캔으로 처리
+ALTER TABLE messages ADD INDEX idx_messages_conversation (conversation_id, id);
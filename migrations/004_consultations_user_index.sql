@@ -0,0 +1,2 @@
+-- 세그먼트별 Rich Menu 연결 (rich_menu_link.SEGMENTS): 사용자마다 consultations 를 EXISTS 로 확인
+ALTER TABLE consultations ADD INDEX idx_consultations_user (user_id);
@@ -0,0 +1,292 @@
+import csv
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+
+try:
+    import re._parser as sre_parse  # Python 3.11+
+    from re._constants import LITERAL, SUBPATTERN, BRANCH, MAX_REPEAT, MIN_REPEAT
+except ImportError:  # Python 3.10 이하
+    import sre_parse
+    from sre_constants import LITERAL, SUBPATTERN, BRANCH, MAX_REPEAT, MIN_REPEAT
+
+
+# ==================== 리터럴 추출 ====================
+def _best(requirements):
+    """후보 조건 중 가장 선택적인 것(가장 짧은 키워드가 가장 긴 것)을 고른다."""
+    best = None
+    for alts in requirements:
+        if not alts:
+            continue
+        if best is None or min(map(len, alts)) > min(map(len, best)):
+            best = alts
+    return best
+
+
+def _required(items):
+    """파싱된 패턴에서 '이 중 하나는 반드시 텍스트에 있어야 하는' 키워드 목록을 구한다.
+
+    확실히 말할 수 없으면 None 을 반환한다 (해당 패턴은 항상 검사 대상).
+    """
+    requirements = []
+    run = []
+
+    def flush():
+        if run:
+            requirements.append(["".join(run)])
+            run.clear()
+
+    for op, av in items:
+        if op is LITERAL:
+            run.append(chr(av))
+            continue
+        flush()
+        if op is SUBPATTERN:
+            requirements.append(_required(av[-1]))
+        elif op is BRANCH:
+            alts = []
+            for branch in av[1]:
+                sub = _required(branch)
+                if sub is None:
+                    alts = None
+                    break
+                alts.extend(sub)
+            requirements.append(alts)
+        elif op in (MAX_REPEAT, MIN_REPEAT) and av[0] >= 1:
+            requirements.append(_required(av[2]))
+    flush()
+    return _best(requirements)
+
+
+def _casefold_safe(keyword: str) -> bool:
+    """lower() 비교가 re.IGNORECASE 와 같은 결과를 내는 키워드인지"""
+    return all(len(c.lower()) == 1 and c.lower() == c.upper().lower() for c in keyword)
+
+
+def extract_keywords(pattern: str):
+    """정규식에서 사전 필터용 키워드(소문자)를 뽑는다. 실패 시 None"""
+    try:
+        parsed = sre_parse.parse(pattern, re.IGNORECASE)
+    except re.error:
+        return None
+    keywords = _required(list(parsed))
+    if not keywords or not all(_casefold_safe(k) for k in keywords):
+        return None
+    return sorted({k.lower() for k in keywords})
+
+
+# ==================== Aho-Corasick ====================
+class KeywordAutomaton:
+    """여러 키워드를 텍스트 한 번 훑기로 찾는 Aho-Corasick 오토마톤"""
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        self.keywords = list(keywords)
+
+        for idx, keyword in enumerate(self.keywords):
+            node = 0
+            for ch in keyword:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                node = nxt
+            self.out[node] = self.out[node] + (idx,)
+
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find(self, text: str) -> set:
+        """text 에 등장하는 키워드 인덱스 집합"""
+        goto, fail, out = self.goto, self.fail, self.out
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+# ==================== 매처 ====================
+class PatternMatcher:
+    """patterns.csv 를 한 번 컴파일해 두고 메시지마다 후보 패턴만 검사한다.
+
+    우선순위는 기존과 같이 '먼저 나온 행이 이긴다'.
+    """
+
+    def __init__(self, rows, compiled=None):
+        self.patterns = []      # [(compiled, pattern, response)] - 행 순서 유지
+        self.always = []        # 키워드를 뽑을 수 없어 항상 검사하는 패턴 인덱스
+        self.compiled = {}      # pattern -> (compiled, keywords), 다음 리로드에서 재사용
+        self.reused = 0
+        keyword_index = {}      # keyword -> [pattern 인덱스]
+        previous = compiled or {}
+
+        for pattern, response in rows:
+            pattern = str(pattern)
+            entry = self.compiled.get(pattern) or previous.get(pattern)
+            if entry is not None:
+                self.reused += 1
+            else:
+                try:
+                    entry = (re.compile(pattern, re.IGNORECASE), extract_keywords(pattern))
+                except re.error as e:
+                    print(f"⚠️ 잘못된 패턴 무시: {pattern!r} ({e})")
+                    continue
+            self.compiled[pattern] = entry
+            compiled_re, keywords = entry
+
+            idx = len(self.patterns)
+            self.patterns.append((compiled_re, pattern, response))
+            if keywords is None:
+                self.always.append(idx)
+            else:
+                for keyword in keywords:
+                    keyword_index.setdefault(keyword, []).append(idx)
+
+        self._keyword_targets = list(keyword_index.values())
+        self._automaton = KeywordAutomaton(keyword_index.keys())
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def candidates(self, text: str):
+        """정규식을 실제로 돌려볼 패턴 인덱스 (행 순서대로)"""
+        hits = set(self.always)
+        for keyword_id in self._automaton.find(text.lower()):
+            hits.update(self._keyword_targets[keyword_id])
+        return sorted(hits)
+
+    def match(self, text: str):
+        """(response, pattern) 또는 (None, None)"""
+        for idx in self.candidates(text):
+            compiled, pattern, response = self.patterns[idx]
+            if compiled.search(text):
+                return response, pattern
+        return None, None
+
+
+# ==================== 핫 리로드 ====================
+def parse_pattern_csv(data: bytes):
+    """patterns.csv (pattern, response 컬럼) 내용을 행 순서대로 파싱한다."""
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8-sig"), newline=""))
+    return [(row["pattern"], row["response"]) for row in reader
+            if row.get("pattern") and row.get("response") is not None]
+
+
+class PatternStore:
+    """patterns.csv 변경을 감지해 새 매처로 원자적으로 교체한다.
+
+    요청 처리 중에는 current() 로 받은 매처를 끝까지 쓰므로
+    리로드가 일어나도 진행 중인 handle_message 는 이전 매처를 그대로 사용한다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._matcher = PatternMatcher([])
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._digest = None
+        self.version = 0
+        self.loaded_at = None
+        self.last_reload_ms = 0.0
+        self.last_stats = {}
+        self.last_error = None
+
+    def current(self) -> PatternMatcher:
+        return self._matcher
+
+    def reload(self, force: bool = False) -> bool:
+        """파일이 바뀌었으면 다시 컴파일한다. 교체했으면 True"""
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                if self._mtime is not False:
+                    print(f"⚠️ {self.path} 없음")
+                    self._mtime = False
+                return False
+            if not force and mtime == self._mtime:
+                return False
+
+            started = time.perf_counter()
+            try:
+                with open(self.path, "rb") as f:
+                    data = f.read()
+                digest = hashlib.sha256(data).hexdigest()
+                self._mtime = mtime
+                if not force and digest == self._digest:
+                    return False
+                rows = parse_pattern_csv(data)
+            except (OSError, KeyError, csv.Error, UnicodeDecodeError) as e:
+                # 저장 도중의 반쯤 쓰인 파일 등: 이전 매처를 유지하고 다음 검사 때 다시 시도
+                self.last_error = str(e)
+                self._mtime = None
+                print(f"⚠️ patterns.csv 리로드 실패: {e}")
+                return False
+
+            old = self._matcher
+            new = PatternMatcher(rows, compiled=old.compiled)
+            self._matcher = new  # 참조 교체는 원자적
+            self._digest = digest
+            self.version += 1
+            self.loaded_at = time.time()
+            self.last_reload_ms = (time.perf_counter() - started) * 1000
+            self.last_error = None
+            self.last_stats = {
+                "patterns": len(new),
+                "recompiled": len(new) - new.reused,
+                "reused": new.reused,
+                "removed": len(old.compiled.keys() - new.compiled.keys()),
+            }
+            print(f"✅ patterns.csv v{self.version} 로드 ({len(new)}개, "
+                  f"재컴파일 {self.last_stats['recompiled']}개, {self.last_reload_ms:.1f}ms)")
+            return True
+
+    def watch(self, interval: float = 5.0):
+        """데몬 스레드에서 interval 초마다 변경을 확인한다."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload()
+                except Exception as e:
+                    print("❌ 패턴 감시 오류:", e)
+
+        thread = threading.Thread(target=loop, name="pattern-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> dict:
+        return {
+            "path": self.path,
+            "version": self.version,
+            "digest": self._digest,
+            "loaded_at": _format_ts(self.loaded_at),
+            "last_reload_ms": round(self.last_reload_ms, 3),
+            "last_error": self.last_error,
+            **self.last_stats,
+        }
+
+
+def _format_ts(ts):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) if ts else None
@@ -0,0 +1,190 @@
+import hashlib
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from rich_menu_encode import content_type
+from rich_menu_render import cell_boxes, render_encoded, spec_hash
+
+# 메뉴 이름 = "<스펙의 menu.name> #<배포 해시>" - 목록 API 만으로 같은 정의의 메뉴를 찾을 수 있게 함
+HASH_SEPARATOR = " #"
+HASH_LENGTH = 16
+MAX_NAME_LENGTH = 300  # LINE 제한
+
+
+class RichMenuError(Exception):
+    def __init__(self, action, response):
+        super().__init__(f"{action} 실패 ({response.status_code}): {response.text[:200]}")
+        self.status_code = response.status_code
+
+
+class RichMenuAPI:
+    """Rich Menu API 호출 (LineSession 위에서, 실패 응답은 RichMenuError)"""
+
+    def __init__(self, session, token, endpoint="https://api.line.me", data_endpoint="https://api-data.line.me"):
+        self.session = session
+        self.endpoint = endpoint.rstrip("/")
+        self.data_endpoint = data_endpoint.rstrip("/")
+        self._auth = {"Authorization": f"Bearer {token}"}
+
+    def _check(self, action, response):
+        if response.status_code >= 300:
+            raise RichMenuError(action, response)
+        return response
+
+    def list_menus(self) -> list:
+        response = self.session.get(f"{self.endpoint}/v2/bot/richmenu/list", headers=self._auth)
+        return self._check("메뉴 목록", response).json()["richmenus"]
+
+    def create(self, definition) -> str:
+        response = self.session.post(f"{self.endpoint}/v2/bot/richmenu",
+                                     headers=dict(self._auth, **{"Content-Type": "application/json"}),
+                                     data=json.dumps(definition, ensure_ascii=False).encode("utf-8"))
+        return self._check("메뉴 생성", response).json()["richMenuId"]
+
+    def upload_image(self, menu_id, encoded):
+        # BytesIO 로 넘겨 재시도 때 LineSession 이 처음 위치로 되돌려 다시 보냄
+        response = self.session.post(f"{self.data_endpoint}/v2/bot/richmenu/{menu_id}/content",
+                                     headers=dict(self._auth, **{"Content-Type": content_type(encoded)}),
+                                     data=io.BytesIO(encoded.data))
+        self._check("이미지 업로드", response)
+
+    def has_image(self, menu_id) -> bool:
+        """이미지가 올라가 있는지 (본문은 받지 않고 상태 코드만 확인)"""
+        response = self.session.get(f"{self.data_endpoint}/v2/bot/richmenu/{menu_id}/content",
+                                    headers=self._auth, stream=True)
+        response.close()
+        if response.status_code == 404:
+            return False
+        self._check("이미지 확인", response)
+        return True
+
+    def get_default(self):
+        response = self.session.get(f"{self.endpoint}/v2/bot/user/all/richmenu", headers=self._auth)
+        if response.status_code == 404:
+            return None
+        return self._check("기본 메뉴 조회", response).json()["richMenuId"]
+
+    def set_default(self, menu_id):
+        response = self.session.post(f"{self.endpoint}/v2/bot/user/all/richmenu/{menu_id}", headers=self._auth)
+        self._check("기본 메뉴 설정", response)
+
+    def link(self, user_id, menu_id):
+        response = self.session.post(f"{self.endpoint}/v2/bot/user/{user_id}/richmenu/{menu_id}", headers=self._auth)
+        self._check("사용자 메뉴 연결", response)
+
+    def bulk_link(self, menu_id, user_ids):
+        """한 번에 최대 500명 (LINE 제한, rich_menu_link.BULK_LINK_MAX)"""
+        response = self.session.post(f"{self.endpoint}/v2/bot/richmenu/bulk/link",
+                                     headers=dict(self._auth, **{"Content-Type": "application/json"}),
+                                     data=json.dumps({"richMenuId": menu_id, "userIds": list(user_ids)}))
+        self._check("메뉴 일괄 연결", response)
+
+    def delete(self, menu_id):
+        response = self.session.delete(f"{self.endpoint}/v2/bot/richmenu/{menu_id}", headers=self._auth)
+        if response.status_code != 404:  # 이미 지워졌으면 성공으로 봄
+            self._check("메뉴 삭제", response)
+
+
+# ==================== 정의 / 해시 ====================
+def menu_definition(spec) -> dict:
+    """스펙 → Rich Menu 정의 (터치 영역은 이미지 셀 경계와 같음, 이름에는 아직 해시가 없음)"""
+    width, height = spec["size"]
+    menu = spec["menu"]
+    areas = [
+        {"bounds": {"x": x, "y": y, "width": w, "height": h}, "action": action}
+        for (x, y, w, h), action in zip(cell_boxes(spec), spec["actions"])
+    ]
+    return {
+        "size": {"width": width, "height": height},
+        "selected": menu["selected"],
+        "name": menu.get("name") or spec["name"],
+        "chatBarText": menu["chatBarText"],
+        "areas": areas,
+    }
+
+
+def deploy_hash(spec, definition) -> str:
+    """메뉴 정의 + 이미지 내용(렌더링 스펙 해시)의 해시 - 이미지를 그리지 않고도 계산됨"""
+    payload = {"menu": definition, "image": spec_hash(spec)}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:HASH_LENGTH]
+
+
+def _base_name(name: str) -> str:
+    return name.rsplit(HASH_SEPARATOR, 1)[0] if HASH_SEPARATOR in name else name
+
+
+def _same_definition(menu, definition) -> bool:
+    return all(menu.get(key) == definition[key] for key in ("size", "selected", "chatBarText", "areas"))
+
+
+# ==================== 배포 ====================
+def deploy(api, spec, set_default=True, delete_stale=True, delete_workers=4, log=print) -> dict:
+    """스펙의 메뉴를 멱등하게 배포한다.
+
+    같은 해시의 메뉴가 있으면 재사용하고 (이미지가 빠져 있으면 이미지만 올림), 없으면 새로 만든다.
+    기본 메뉴가 이미 그 메뉴면 설정을 건너뛰고, 같은 이름(해시만 다른)의 이전 메뉴는 한 번에 병렬 삭제한다.
+    """
+    definition = menu_definition(spec)
+    digest = deploy_hash(spec, definition)
+    base = definition["name"][:MAX_NAME_LENGTH - len(HASH_SEPARATOR) - HASH_LENGTH]
+    definition["name"] = f"{base}{HASH_SEPARATOR}{digest}"
+    report = {"name": definition["name"], "hash": digest, "created": False, "uploaded": False,
+              "default_changed": False, "deleted": [], "delete_failures": []}
+
+    ours = [menu for menu in api.list_menus() if _base_name(menu["name"]) == base]
+    default_id = api.get_default()
+    matches = [menu for menu in ours if menu["name"] == definition["name"] and _same_definition(menu, definition)]
+    # 같은 해시가 여럿이면 (동시에 배포된 경우) 기본 메뉴로 쓰이는 것을 남김
+    matches.sort(key=lambda menu: menu["richMenuId"] != default_id)
+
+    encoded = None
+    if matches:
+        menu_id = matches[0]["richMenuId"]
+        log(f"♻️ 같은 메뉴가 이미 있음: {menu_id}")
+        if menu_id != default_id and not api.has_image(menu_id):
+            # 이전 배포가 이미지 업로드 전에 중단됨
+            encoded, _ = render_encoded(spec)
+            api.upload_image(menu_id, encoded)
+            report["uploaded"] = True
+    else:
+        # 메뉴를 만들기 전에 이미지부터 준비 (1MB 초과 등으로 실패하면 빈 메뉴를 남기지 않음)
+        encoded, render_ms = render_encoded(spec)
+        log(f"🎨 이미지 {encoded.detail} {len(encoded.data) / 1024:.0f}KB "
+            f"(렌더링 {render_ms:.0f}ms + 인코딩 {encoded.encode_ms:.0f}ms)")
+        menu_id = api.create(definition)
+        report["created"] = True
+        log(f"✅ Rich Menu 생성: {menu_id}")
+        api.upload_image(menu_id, encoded)
+        report["uploaded"] = True
+        log("✅ 이미지 업로드 완료")
+    if encoded is not None:
+        report["image"] = {"bytes": len(encoded.data), "format": encoded.detail, "encode_ms": encoded.encode_ms}
+    report["menu_id"] = menu_id
+
+    if set_default and default_id != menu_id:
+        api.set_default(menu_id)
+        report["default_changed"] = True
+        log("✅ 기본 메뉴로 설정")
+
+    # 기본 메뉴를 바꾸지 않는 배포(세그먼트용 등)에서는 현재 기본 메뉴를 지우지 않음
+    keep = {menu_id} if set_default else {menu_id, default_id}
+    stale = [menu["richMenuId"] for menu in ours if menu["richMenuId"] not in keep]
+    if delete_stale and stale:
+        def delete(stale_id):
+            try:
+                api.delete(stale_id)
+                return stale_id, None
+            except Exception as e:
+                return stale_id, str(e)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(delete_workers, len(stale)))) as pool:
+            for stale_id, error in pool.map(delete, stale):
+                if error:
+                    report["delete_failures"].append({"richMenuId": stale_id, "error": error})
+                else:
+                    report["deleted"].append(stale_id)
+        log(f"🧹 이전 메뉴 {len(report['deleted'])}개 삭제" +
+            (f", 실패 {len(report['delete_failures'])}개" if report["delete_failures"] else ""))
+    return report
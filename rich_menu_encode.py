@@ -0,0 +1,100 @@
+import io
+import time
+from collections import namedtuple
+
+from PIL import Image
+
+# LINE Rich Menu 이미지 최대 크기 1MB (1,000,000 으로 잡아 MB 해석 차이에도 안전하게)
+MAX_BYTES = 1_000_000
+# 화질 손실이 적은 순서: 무손실 PNG → 팔레트(256색 이하) PNG → JPEG
+DEFAULT_FORMATS = ("png", "png8", "jpeg")
+
+CONTENT_TYPES = {"png": "image/png", "jpeg": "image/jpeg"}
+EXTENSIONS = {"png": ".png", "jpeg": ".jpg"}
+
+# data: 인코딩된 바이트, format: png / jpeg, detail: 고른 설정 (예: png8-128, jpeg-q85),
+# attempts: [(설정, 바이트 수)] 시도한 순서대로
+Encoded = namedtuple("Encoded", "data format detail encode_ms attempts")
+
+
+class ImageTooLarge(Exception):
+    """어떤 설정으로도 max_bytes 안에 들어가지 않음"""
+
+
+def content_type(encoded: Encoded) -> str:
+    return CONTENT_TYPES[encoded.format]
+
+
+def extension(encoded: Encoded) -> str:
+    return EXTENSIONS[encoded.format]
+
+
+def _png(img, compress_level):
+    buf = io.BytesIO()
+    img.save(buf, "PNG", compress_level=compress_level)
+    return buf.getvalue()
+
+
+def _jpeg(img, quality):
+    buf = io.BytesIO()
+    # 4:4:4 - 색 배경 위 글자 가장자리가 번지지 않도록 색 정보를 줄이지 않음
+    img.save(buf, "JPEG", quality=quality, optimize=True, subsampling=0)
+    return buf.getvalue()
+
+
+def encode(img, max_bytes=MAX_BYTES, formats=DEFAULT_FORMATS, png_compress_level=6,
+           palette_colors=(256, 128, 64), jpeg_quality=(50, 95), jpeg_quality_step=5) -> Encoded:
+    """formats 순서대로 시도해 처음으로 max_bytes 안에 들어오는 인코딩을 돌려준다 (메모리에서만).
+
+    JPEG 는 jpeg_quality 범위에서 예산 안에 드는 가장 높은 품질을 jpeg_quality_step 간격으로 이분 탐색한다.
+    """
+    started = time.perf_counter()
+    attempts = []
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    for fmt in formats:
+        if fmt == "jpeg":
+            found = _search_jpeg(img, max_bytes, jpeg_quality, jpeg_quality_step, attempts)
+            if found:
+                return Encoded(found[1], "jpeg", found[0], _elapsed_ms(started), attempts)
+            continue
+        if fmt == "png":
+            candidates = [("png", lambda: _png(img, png_compress_level))]
+        elif fmt == "png8":
+            candidates = [(f"png8-{colors}", lambda colors=colors: _png(
+                img.quantize(colors, method=Image.Quantize.FASTOCTREE), png_compress_level)) for colors in palette_colors]
+        else:
+            raise ValueError(f"지원하지 않는 형식: {fmt} (png / png8 / jpeg)")
+        for detail, make in candidates:
+            data = make()
+            attempts.append((detail, len(data)))
+            if len(data) <= max_bytes:
+                return Encoded(data, "png", detail, _elapsed_ms(started), attempts)
+
+    smallest = min(attempts, key=lambda a: a[1]) if attempts else None
+    raise ImageTooLarge(f"{max_bytes:,} bytes 안에 들어가지 않음 (가장 작은 결과: {smallest})")
+
+
+def _search_jpeg(img, max_bytes, quality_range, step, attempts):
+    """예산 안에 드는 가장 높은 quality (step 간격) → (detail, data), 없으면 None"""
+    low, high = quality_range
+    qualities = sorted(range(high, low - 1, -step))
+    best = None
+    lo, hi = 0, len(qualities) - 1
+    i = hi  # 최고 품질이 들어가면 한 번으로 끝
+    while lo <= hi:
+        quality = qualities[i]
+        data = _jpeg(img, quality)
+        attempts.append((f"jpeg-q{quality}", len(data)))
+        if len(data) <= max_bytes:
+            best = (f"jpeg-q{quality}", data)
+            lo = i + 1
+        else:
+            hi = i - 1
+        i = (lo + hi + 1) // 2
+    return best
+
+
+def _elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+BULK_LINK_MAX = 500  # LINE bulk link 한 번에 연결할 수 있는 최대 사용자 수
+
+# 세그먼트 = users 별칭 u 에 대한 조건 (consultations 는 idx_consultations_user 로 사용자별 조회, migrations/004)
+SEGMENTS = {
+    "all": "",
+    "open_consultation": "EXISTS (SELECT 1 FROM consultations c WHERE c.user_id = u.id AND c.status = 'pending')",
+    "corporate": "EXISTS (SELECT 1 FROM consultations c WHERE c.user_id = u.id AND c.member_type = 'corporate')",
+}
+
+
+# ==================== 사용자 스트리밍 ====================
+def _condition(segment: str) -> str:
+    if segment not in SEGMENTS:
+        raise ValueError(f"알 수 없는 세그먼트: {segment} ({', '.join(SEGMENTS)})")
+    return f" AND {SEGMENTS[segment]}" if SEGMENTS[segment] else ""
+
+
+def segment_query(segment: str) -> str:
+    """users.id 키셋 페이지 쿼리 (파라미터: 마지막 id, 개수)"""
+    return f"SELECT u.id, u.line_user_id FROM users u WHERE u.id > %s{_condition(segment)} ORDER BY u.id LIMIT %s"
+
+
+def segment_signature(cursor, segment) -> list:
+    """세그먼트 구성의 요약 [사용자 수, 최대 users.id, users.id 합] - 완료 후 사용자가 들어오거나 나가면 달라짐"""
+    cursor.execute("SELECT COUNT(*), COALESCE(MAX(u.id), 0), COALESCE(SUM(u.id), 0) "
+                   f"FROM users u WHERE 1 = 1{_condition(segment)}")
+    return [int(value) for value in cursor.fetchall()[0]]
+
+
+def stream_users(cursor, segment, after_id=0, chunk_size=5000):
+    """[(users.id, line_user_id)] 묶음을 차례로 내보낸다 (한 번에 chunk_size 행만 메모리에 둠)"""
+    query = segment_query(segment)
+    while True:
+        cursor.execute(query, (after_id, chunk_size))
+        rows = [(int(row[0]), row[1]) for row in cursor.fetchall()]
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1][0]
+        if len(rows) < chunk_size:
+            return
+
+
+def rebatch(chunks, size=BULK_LINK_MAX):
+    """DB 청크 경계와 상관없이 size 명씩 다시 묶는다."""
+    batch = []
+    for rows in chunks:
+        for row in rows:
+            batch.append(row)
+            if len(batch) == size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+# ==================== 체크포인트 ====================
+class Checkpoint:
+    """세그먼트 + 메뉴별 진행 위치 (여기까지의 users.id 는 모두 연결됨) 를 JSON 파일에 원자적으로 기록"""
+
+    def __init__(self, path, segment, rich_menu_id):
+        self.path = path
+        self.segment = segment
+        self.rich_menu_id = rich_menu_id
+
+    def load(self) -> dict:
+        """같은 세그먼트/메뉴로 중단된 기록이 있으면 그 상태, 없으면 처음부터
+
+        done 이어도 signature(시작할 때의 segment_signature) 가 지금과 다르면 세그먼트가 바뀐 것이므로
+        호출하는 쪽에서 처음부터 다시 연결한다 (일괄 연결은 멱등).
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            state = {}
+        if state.get("segment") != self.segment or state.get("rich_menu_id") != self.rich_menu_id:
+            state = {}
+        return {"last_user_id": state.get("last_user_id", 0), "linked": state.get("linked", 0),
+                "done": state.get("done", False), "signature": state.get("signature")}
+
+    def save(self, last_user_id, linked, done=False, signature=None):
+        state = {"segment": self.segment, "rich_menu_id": self.rich_menu_id, "last_user_id": last_user_id,
+                 "linked": linked, "done": done, "signature": signature, "updated_at": time.time()}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+
+# ==================== 연결 ====================
+def link_batches(link, batches, bucket, concurrency=2, checkpoint=None, start=None, signature=None, log=print):
+    """batches([(users.id, line_user_id)] 묶음) 를 link(line_user_ids) 로 연결한다.
+
+    - 동시에 concurrency 개까지 요청하고, 요청마다 bucket 에서 토큰을 받음
+    - 대기 중인 묶음은 concurrency * 2 개까지만 만들어 사용자 목록을 전부 메모리에 올리지 않음
+    - 순서와 상관없이 끝난 요청 중 앞에서부터 빈틈없이 끝난 곳까지를 checkpoint 에 기록
+      (중단 후 다시 실행하면 그 다음부터, 일괄 연결은 멱등이라 겹쳐 보내도 무방)
+    - 재시도까지 실패한 묶음이 있으면 새 요청을 멈추고 진행 중인 것만 마친 뒤 보고
+    - signature(연결을 시작할 때의 segment_signature) 는 체크포인트에 함께 남겨 다음 실행에서 세그먼트 변경 확인
+    """
+    start = start or {"last_user_id": 0, "linked": 0}
+    report = {"batches": 0, "linked": 0, "failed": None, "last_user_id": start["last_user_id"],
+              "total_linked": start["linked"]}
+    lock = threading.Lock()
+    done, sizes, last_ids = set(), {}, {}
+    committed = [0]  # 다음에 체크포인트로 넘길 묶음 번호
+
+    def send(seq, batch):
+        bucket.acquire()
+        link([line_user_id for _, line_user_id in batch])
+        return seq
+
+    def on_done(seq):
+        with lock:
+            done.add(seq)
+            report["batches"] += 1
+            report["linked"] += sizes[seq]
+            advanced = False
+            while committed[0] in done:
+                report["last_user_id"] = last_ids.pop(committed[0])
+                report["total_linked"] += sizes.pop(committed[0])
+                done.discard(committed[0])
+                committed[0] += 1
+                advanced = True
+            if advanced and checkpoint is not None:
+                checkpoint.save(report["last_user_id"], report["total_linked"], signature=signature)
+
+    started = time.perf_counter()
+    in_flight = set()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for seq, batch in enumerate(batches):
+            sizes[seq], last_ids[seq] = len(batch), batch[-1][0]
+            in_flight.add(pool.submit(send, seq, batch))
+            if len(in_flight) >= concurrency * 2:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                if not _collect(finished, on_done, report):
+                    break
+        finished, _ = wait(in_flight)
+        _collect(finished, on_done, report)
+
+    report["elapsed_s"] = round(time.perf_counter() - started, 3)
+    report["done"] = report["failed"] is None
+    if checkpoint is not None and report["done"]:
+        checkpoint.save(report["last_user_id"], report["total_linked"], done=True, signature=signature)
+    log(f"🔗 {report['linked']}명 ({report['batches']}묶음) 연결, {report['elapsed_s']}초"
+        + (f" - 실패: {report['failed']}" if report["failed"] else ""))
+    return report
+
+
+def _collect(finished, on_done, report) -> bool:
+    ok = True
+    for future in finished:
+        try:
+            on_done(future.result())
+        except Exception as e:
+            report["failed"] = report["failed"] or f"{type(e).__name__}: {e}"
+            ok = False
+    return ok
@@ -0,0 +1,244 @@
+import copy
+import functools
+import hashlib
+import json
+import os
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+from rich_menu_encode import MAX_BYTES, encode, extension
+
+# 렌더링 결과가 달라지는 코드 변경이 있으면 올려서 기존 이미지를 다시 만들게 함
+RENDERER_VERSION = 1
+# 이미지에는 영향이 없는 키 (Rich Menu 정의용, rich_menu_deploy.py) - 바뀌어도 다시 렌더링하지 않음
+NON_VISUAL_KEYS = ("menu", "actions")
+
+# 스펙 기본값 (기존 1_image_creator_premium.py 의 2x3 프리미엄 메뉴)
+DEFAULTS = {
+    "size": [2500, 1686],
+    "grid": [2, 3],  # [행, 열]
+    "background": "white",
+    "divider": {"color": "white", "width": 8},
+    "fonts": {
+        "emoji": {"paths": ["C:/Windows/Fonts/seguiemj.ttf"], "size": 180},
+        "text": {"paths": ["C:/Windows/Fonts/malgunbd.ttf", "C:/Windows/Fonts/malgun.ttf"], "size": 100},
+    },
+    "emoji_y": 0.25,  # 셀 높이 대비 이모지 위쪽 위치
+    "text_y": 0.6,  # 셀 높이 대비 텍스트 위쪽 위치
+    "text_color": "white",
+    "shadow": {"color": "#00000040", "offset": 3},
+    # rich_menu_encode.encode 인자: 무손실 PNG → 팔레트 PNG → JPEG 순서로 max_bytes 안에 드는 첫 결과
+    "encode": {"max_bytes": MAX_BYTES, "formats": ["png", "png8", "jpeg"]},
+    # Rich Menu 정의 (actions 는 cells 와 같은 행 우선 순서의 LINE action 객체)
+    "menu": {"chatBarText": "메뉴", "selected": True},
+}
+
+
+# ==================== 스펙 ====================
+def _merge(base, override):
+    """dict 는 키별로 합치고 나머지(list 포함)는 덮어쓴다."""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError(f"YAML 스펙을 읽으려면 PyYAML 이 필요합니다 (pip install pyyaml): {path}")
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+def load_spec(path, _seen=()):
+    """JSON/YAML 스펙을 읽어 extends(상대 경로) 를 따라 합치고 기본값을 채운다.
+
+    variant 스펙은 extends 로 기본 스펙을 가리키고 바뀌는 부분(라벨, 색, output 등)만 적으면 된다.
+    """
+    path = os.path.abspath(path)
+    if path in _seen:
+        raise ValueError(f"스펙 extends 순환: {path}")
+    raw = _read(path)
+    base = DEFAULTS
+    if raw.get("extends"):
+        base = load_spec(os.path.join(os.path.dirname(path), raw["extends"]), _seen + (path,))
+    spec = _merge(base, {key: value for key, value in raw.items() if key != "extends"})
+    spec["name"] = raw.get("name") or os.path.splitext(os.path.basename(path))[0]
+    spec["output"] = raw.get("output") or f"{spec['name']}.png"
+    _validate(spec, path)
+    return spec
+
+
+def _validate(spec, path):
+    rows, cols = spec["grid"]
+    if len(spec.get("cells", [])) != rows * cols:
+        raise ValueError(f"{path}: cells 는 {rows}x{cols}={rows * cols}개여야 합니다 (현재 {len(spec.get('cells', []))}개)")
+    for i, cell in enumerate(spec["cells"]):
+        missing = {"color", "text"} - cell.keys()
+        if missing:
+            raise ValueError(f"{path}: cells[{i}] 에 {', '.join(sorted(missing))} 없음")
+    if "actions" in spec and len(spec["actions"]) != rows * cols:
+        raise ValueError(f"{path}: actions 는 cells 와 같은 {rows * cols}개여야 합니다 (현재 {len(spec['actions'])}개)")
+
+
+@functools.lru_cache(maxsize=64)
+def _file_digest(path, mtime_ns, size):
+    """파일 내용의 해시 (mtime/크기가 같으면 프로세스 안에서 다시 읽지 않음)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _font_files(spec):
+    """스펙이 가리키는 폰트 중 실제로 쓰일 파일의 내용 해시 (폰트가 바뀌면 다시 렌더링)
+
+    경로나 mtime 이 아니라 내용으로 비교해서 같은 폰트면 다른 서버에서도 해시가 같다 (deploy_hash).
+    """
+    files = {}
+    for role, font in sorted(spec["fonts"].items()):
+        path = next((p for p in font["paths"] if os.path.exists(p)), None)
+        if path:
+            st = os.stat(path)
+            files[role] = _file_digest(path, st.st_mtime_ns, st.st_size)
+        else:
+            files[role] = None  # PIL 기본 폰트
+    return files
+
+
+def spec_hash(spec) -> str:
+    """렌더링 결과를 결정하는 내용(스펙 + 폰트 파일 + 렌더러 버전)의 해시"""
+    visual = {key: value for key, value in spec.items() if key not in NON_VISUAL_KEYS}
+    payload = {"spec": visual, "fonts": _font_files(spec), "renderer": RENDERER_VERSION}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+# ==================== 레이아웃 ====================
+def cell_boxes(spec):
+    """셀 좌표 [(x, y, width, height)] (행 우선). 경계는 반올림해서 Rich Menu 터치 영역과 맞춘다."""
+    width, height = spec["size"]
+    rows, cols = spec["grid"]
+    xs = [round(width * c / cols) for c in range(cols + 1)]
+    ys = [round(height * r / rows) for r in range(rows + 1)]
+    return [(xs[c], ys[r], xs[c + 1] - xs[c], ys[r + 1] - ys[r]) for r in range(rows) for c in range(cols)]
+
+
+# ==================== 캐시 (프로세스별) ====================
+@functools.lru_cache(maxsize=None)
+def load_font(paths: tuple, size: int):
+    """paths 중 처음 열리는 폰트, 모두 실패하면 PIL 기본 폰트"""
+    for path in paths:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def _font(spec, role):
+    font = spec["fonts"][role]
+    return load_font(tuple(font["paths"]), font["size"])
+
+
+@functools.lru_cache(maxsize=256)
+def emoji_tile(emoji: str, paths: tuple, size: int):
+    """이모지 한 글자를 투명 배경 RGBA 로 한 번만 그려 둔다 (컬러 이모지 렌더링이 셀 그리기에서 가장 느림)"""
+    font = load_font(paths, size)
+    left, top, right, bottom = ImageDraw.Draw(Image.new("RGBA", (1, 1))).textbbox((0, 0), emoji, font=font)
+    tile = Image.new("RGBA", (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+    ImageDraw.Draw(tile).text((-left, -top), emoji, font=font, embedded_color=True)
+    return tile, left, top
+
+
+# ==================== 렌더링 ====================
+def render(spec) -> Image.Image:
+    width, height = spec["size"]
+    rows, cols = spec["grid"]
+    img = Image.new("RGB", (width, height), color=spec["background"])
+    draw = ImageDraw.Draw(img)
+    font_text = _font(spec, "text")
+    emoji_font = spec["fonts"]["emoji"]
+    divider = spec["divider"]
+    shadow = spec["shadow"]
+
+    for i, (x, y, cell_width, cell_height) in enumerate(cell_boxes(spec)):
+        row, col = divmod(i, cols)
+        cell = spec["cells"][i]
+        x_end, y_end = x + cell_width, y + cell_height
+
+        # 배경색
+        draw.rectangle([x, y, x_end, y_end], fill=cell["color"])
+
+        # 경계선
+        if divider["width"]:
+            if col < cols - 1:
+                draw.line([x_end, y, x_end, y_end], fill=divider["color"], width=divider["width"])
+            if row < rows - 1:
+                draw.line([x, y_end, x_end, y_end], fill=divider["color"], width=divider["width"])
+
+        # 이모지 (상단) - 캐시된 타일을 붙여 넣음
+        if cell.get("emoji"):
+            tile, left, top = emoji_tile(cell["emoji"], tuple(emoji_font["paths"]), emoji_font["size"])
+            emoji_x = x + (cell_width - tile.width) // 2
+            emoji_y = y + int(cell_height * spec["emoji_y"])
+            img.paste(tile, (emoji_x + left, emoji_y + top), tile)
+
+        # 텍스트 (하단)
+        text = cell["text"]
+        text_bbox = draw.textbbox((0, 0), text, font=font_text)
+        text_x = x + (cell_width - (text_bbox[2] - text_bbox[0])) // 2
+        text_y = y + int(cell_height * spec["text_y"])
+        if shadow and shadow.get("offset"):
+            offset = shadow["offset"]
+            draw.text((text_x + offset, text_y + offset), text, fill=shadow["color"], font=font_text)
+        draw.text((text_x, text_y), text, fill=cell.get("text_color", spec["text_color"]), font=font_text)
+
+    return img
+
+
+# ==================== 파일 단위 (배치) ====================
+def load_manifest(path) -> dict:
+    """output 경로 → {"hash": 마지막으로 렌더링한 스펙 해시, "file": 실제로 쓴 파일}"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(path, manifest):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def render_encoded(spec):
+    """렌더링 + 바이트 예산에 맞춘 인코딩 (파일 없이 메모리에서) → (rich_menu_encode.Encoded, 렌더링 ms)"""
+    started = time.perf_counter()
+    img = render(spec)
+    render_ms = round((time.perf_counter() - started) * 1000, 1)
+    return encode(img, **spec["encode"]), render_ms
+
+
+def render_file(spec, digest=None) -> dict:
+    """스펙 하나를 렌더링해 파일로 저장 (프로세스 풀 작업 단위). JPEG 로 인코딩되면 확장자를 .jpg 로 바꿈"""
+    encoded, render_ms = render_encoded(spec)
+    path = os.path.splitext(spec["output"])[0] + extension(encoded)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(encoded.data)
+    return {
+        "name": spec["name"], "output": spec["output"], "file": path, "hash": digest or spec_hash(spec),
+        "format": encoded.detail, "bytes": len(encoded.data),
+        "render_ms": render_ms, "encode_ms": encoded.encode_ms, "pid": os.getpid(),
+    }
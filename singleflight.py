@@ -0,0 +1,67 @@
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """같은 key 의 요청이 진행 중이면 새로 호출하지 않고 그 결과를 함께 기다린다.
+
+    먼저 온 호출(leader)만 fn 을 실행하고, 뒤에 온 호출은 각자의 timeout 으로 기다린다.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "shared": 0, "timeouts": 0}
+
+    def do(self, key, fn, timeout=None):
+        """(결과, 공유 여부) 반환. 기다리다 timeout 이 지나면 TimeoutError"""
+        if key is None:
+            return fn(), False
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+                self._stats["leaders"] += 1
+            else:
+                call.waiters += 1
+                leader = False
+
+        if not leader:
+            if not call.done.wait(timeout):
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise TimeoutError(f"single-flight 대기 {timeout}초 초과")
+            if call.error is not None:
+                raise call.error
+            with self._lock:
+                self._stats["shared"] += 1
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        stats["upstream_calls_avoided"] = stats["shared"]
+        return stats
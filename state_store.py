@@ -0,0 +1,168 @@
+import json
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# 상담 플로우 상태 필드 (레코드는 이 순서의 튜플로 저장)
+FIELDS = (
+    "step", "member_type", "guardian_name", "guardian_phone",
+    "pet_type", "pet_name", "pet_age",
+    "category", "urgency", "description", "preferred_time",
+)
+_INDEX = {name: i for i, name in enumerate(FIELDS)}
+_EMPTY = (None,) * len(FIELDS)
+
+
+def to_record(state: dict) -> tuple:
+    """dict 상태 → 고정 길이 튜플 (dict 보다 훨씬 작음)"""
+    record = list(_EMPTY)
+    for key, value in state.items():
+        if key not in _INDEX:
+            raise ValueError(f"알 수 없는 상태 필드: {key}")
+        record[_INDEX[key]] = value
+    return tuple(record)
+
+
+def from_record(record) -> dict:
+    return {name: value for name, value in zip(FIELDS, record) if value is not None}
+
+
+def default_state() -> dict:
+    return {"step": "none"}
+
+
+def record_size(record) -> int:
+    return sys.getsizeof(record) + sum(sys.getsizeof(v) for v in record if v is not None)
+
+
+class MemoryStateStore:
+    """프로세스 내 상태 저장소: TTL 만료 + 최대 개수 초과 시 가장 오래 안 쓴 것부터 제거"""
+
+    backend = "memory"
+
+    def __init__(self, ttl=1800, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # line_user_id -> (expires_at, record)
+        self._lock = threading.Lock()
+        self._stats = {"expired": 0, "evicted": 0}
+
+    def get(self, line_user_id: str) -> dict:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(line_user_id)
+            if entry is None:
+                return default_state()
+            if entry[0] <= now:
+                del self._entries[line_user_id]
+                self._stats["expired"] += 1
+                return default_state()
+            return from_record(entry[1])
+
+    def set(self, line_user_id: str, state: dict):
+        record = to_record(state)
+        now = time.time()
+        with self._lock:
+            self._entries[line_user_id] = (now + self.ttl, record)
+            self._entries.move_to_end(line_user_id)
+            # 앞쪽(가장 오래 갱신 안 된 것)부터 만료/초과분 정리
+            while self._entries:
+                oldest_id, (expires_at, _) = next(iter(self._entries.items()))
+                if expires_at <= now:
+                    self._stats["expired"] += 1
+                elif len(self._entries) > self.max_entries:
+                    self._stats["evicted"] += 1
+                else:
+                    break
+                del self._entries[oldest_id]
+
+    def delete(self, line_user_id: str):
+        with self._lock:
+            self._entries.pop(line_user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            records = [record for _, record in self._entries.values()]
+            stats = dict(self._stats)
+        total = sum(record_size(r) for r in records)
+        return {
+            "backend": self.backend,
+            "sessions": len(records),
+            "approx_bytes": total,
+            "bytes_per_session": round(total / len(records), 1) if records else 0.0,
+            "ttl": self.ttl,
+            "max_entries": self.max_entries,
+            **stats,
+        }
+
+
+class SQLiteStateStore:
+    """SQLite 파일 공유 상태 저장소: 같은 서버의 여러 gunicorn 워커가 같은 상태를 본다."""
+
+    backend = "sqlite"
+
+    def __init__(self, path, ttl=1800):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._last_sweep = 0.0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS user_states ("
+            "line_user_id TEXT PRIMARY KEY, record TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_user_states_expires ON user_states (expires_at)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, line_user_id: str) -> dict:
+        row = self._conn().execute(
+            "SELECT record FROM user_states WHERE line_user_id = ? AND expires_at > ?",
+            (line_user_id, time.time())
+        ).fetchone()
+        return from_record(json.loads(row[0])) if row else default_state()
+
+    def set(self, line_user_id: str, state: dict):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO user_states (line_user_id, record, expires_at) VALUES (?, ?, ?)",
+            (line_user_id, json.dumps(to_record(state), ensure_ascii=False), now + self.ttl)
+        )
+        if now - self._last_sweep > 60:
+            self._last_sweep = now
+            conn.execute("DELETE FROM user_states WHERE expires_at <= ?", (now,))
+
+    def delete(self, line_user_id: str):
+        self._conn().execute("DELETE FROM user_states WHERE line_user_id = ?", (line_user_id,))
+
+    def stats(self) -> dict:
+        count, total = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(record)), 0) FROM user_states WHERE expires_at > ?",
+            (time.time(),)
+        ).fetchone()
+        return {
+            "backend": self.backend,
+            "path": self.path,
+            "sessions": count,
+            "approx_bytes": total,
+            "bytes_per_session": round(total / count, 1) if count else 0.0,
+            "ttl": self.ttl,
+        }
+
+
+def make_state_store(url: str, ttl=1800, max_entries=10000):
+    """'memory' 또는 'sqlite:///경로'"""
+    if url.startswith("sqlite:///"):
+        return SQLiteStateStore(url[len("sqlite:///"):], ttl=ttl)
+    if url == "memory":
+        return MemoryStateStore(ttl=ttl, max_entries=max_entries)
+    raise ValueError(f"지원하지 않는 STATE_STORE: {url}")
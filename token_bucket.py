@@ -0,0 +1,44 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """초당 rate 개씩 채워지고 최대 burst 개까지 모이는 토큰 버킷 (스레드 안전)
+
+    acquire() 는 토큰을 먼저 예약하고 (잔량이 음수가 될 수 있음) 잠금 밖에서 기다리므로
+    여러 스레드가 동시에 불러도 요청 간격이 1/rate 로 고르게 벌어진다.
+    """
+
+    def __init__(self, rate: float, burst: float = None, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate 는 0보다 커야 합니다")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self._stats = {"acquired": 0, "waits": 0, "wait_total_ms": 0.0}
+
+    def acquire(self, n: float = 1) -> float:
+        """토큰 n 개를 쓸 수 있을 때까지 기다린다. 기다린 초를 돌려준다."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= n
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self._stats["acquired"] += 1
+            if wait:
+                self._stats["waits"] += 1
+                self._stats["wait_total_ms"] += wait * 1000
+        if wait:
+            self._sleep(wait)
+        return wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["wait_total_ms"] = round(stats["wait_total_ms"], 3)
+        return stats
@@ -0,0 +1,98 @@
+import queue
+import threading
+import time
+
+
+class WebhookDispatcher:
+    """웹훅 이벤트를 바운디드 큐에 넣고 워커 스레드에서 처리한다.
+
+    같은 key(LINE user id)는 항상 같은 워커로 가므로 한 사용자의 이벤트 순서는 유지된다.
+    큐가 가득 차면 submit() 이 False 를 반환하고, 호출한 쪽이 직접 처리하도록 한다 (backpressure).
+    """
+
+    def __init__(self, workers=4, queue_size=1000, name="webhook"):
+        self.workers = max(1, workers)
+        per_worker = max(1, queue_size // self.workers)
+        self._queues = [queue.Queue(maxsize=per_worker) for _ in range(self.workers)]
+        self._lock = threading.Lock()
+        self._accepting = True
+        self._stats = {
+            "submitted": 0, "processed": 0, "failed": 0, "rejected": 0,
+            "wait_total_ms": 0.0, "wait_max_ms": 0.0, "run_total_ms": 0.0, "max_depth": 0,
+        }
+        self._threads = [
+            threading.Thread(target=self._run, args=(q,), name=f"{name}-{i}", daemon=True)
+            for i, q in enumerate(self._queues)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, key, fn, *args) -> bool:
+        q = self._queues[hash(key) % self.workers]
+        # drain() 과 같은 잠금 안에서 확인하고 넣어야 종료 표시(None) 뒤에 들어가 버려지는 이벤트가 없음
+        with self._lock:
+            if not self._accepting:
+                return False
+            try:
+                q.put_nowait((fn, args, time.perf_counter()))
+            except queue.Full:
+                self._stats["rejected"] += 1
+                return False
+            self._stats["submitted"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], q.qsize())
+        return True
+
+    def _run(self, q):
+        while True:
+            item = q.get()
+            if item is None:
+                q.task_done()
+                return
+            fn, args, enqueued = item
+            started = time.perf_counter()
+            failed = False
+            try:
+                fn(*args)
+            except Exception as e:
+                failed = True
+                print("❌ 웹훅 처리 오류:", e)
+            finished = time.perf_counter()
+            waited = (started - enqueued) * 1000
+            with self._lock:
+                self._stats["failed" if failed else "processed"] += 1
+                self._stats["wait_total_ms"] += waited
+                self._stats["wait_max_ms"] = max(self._stats["wait_max_ms"], waited)
+                self._stats["run_total_ms"] += (finished - started) * 1000
+            q.task_done()
+
+    def drain(self, timeout=30.0) -> bool:
+        """새 이벤트를 더 받지 않고, 큐에 남은 이벤트를 처리한 뒤 워커를 멈춘다."""
+        with self._lock:
+            if not self._accepting:
+                return True
+            self._accepting = False
+        deadline = time.monotonic() + timeout
+        for q in self._queues:
+            try:
+                # 큐가 가득 차 있어도 timeout 을 넘겨 기다리지 않음 (넣지 못한 워커는 아래에서 시간 초과로 보고)
+                q.put(None, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                pass
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+        drained = not any(t.is_alive() for t in self._threads)
+        print("✅ 웹훅 큐 정리 완료" if drained else f"⚠️ 웹훅 큐 정리 시간 초과 ({timeout}초)")
+        return drained
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        done = stats["processed"] + stats["failed"]
+        stats["workers"] = self.workers
+        stats["depth"] = sum(q.qsize() for q in self._queues)
+        stats["capacity"] = sum(q.maxsize for q in self._queues)
+        stats["wait_avg_ms"] = round(stats["wait_total_ms"] / done, 3) if done else 0.0
+        stats["run_avg_ms"] = round(stats["run_total_ms"] / done, 3) if done else 0.0
+        for key in ("wait_total_ms", "wait_max_ms", "run_total_ms"):
+            stats[key] = round(stats[key], 3)
+        return stats